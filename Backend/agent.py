@@ -9,19 +9,28 @@ import os
 from pydantic_ai import Agent, ModelRetry, RunContext
 from pydantic_ai.models.openai import OpenAIModel
 from openai import AsyncOpenAI
-from supabase import create_client, Client
+from supabase import AsyncClient
 from typing import List
 
+# Module settings below are read from the environment at import, so load .env first
 load_dotenv()
 
+from embedding_batcher import EMBEDDING_MODEL, EMBEDDING_DIMENSIONS, embedding_options
+from embedding_cache import get_embedding_cache, close_embedding_cache
+from db import get_supabase, close_supabase
+from query_scope import infer_scope
+
 llm = os.getenv('LLM_MODEL', 'gpt-4o-mini')
+# Optional per-query vector index search settings (HNSW candidate list size / ivfflat lists probed)
+vector_ef_search = os.getenv('VECTOR_EF_SEARCH')
+vector_probes = os.getenv('VECTOR_PROBES')
 model = OpenAIModel(llm)
 
 logfire.configure(send_to_logfire='if-token-present')
 
 @dataclass
 class FinancialAnalystDeps:
-    supabase: Client
+    supabase: AsyncClient
     openai_client: AsyncOpenAI
 
 system_prompt = """
@@ -48,16 +57,23 @@ financial_analyst_agent = Agent(
 )
 
 async def get_embedding(text: str, openai_client: AsyncOpenAI) -> List[float]:
-    """Get embedding vector from OpenAI."""
+    """Get embedding vector from OpenAI, or from the embedding cache for a query asked before."""
+    cache = get_embedding_cache()
+    cached = await cache.get(EMBEDDING_MODEL, EMBEDDING_DIMENSIONS, text)
+    if cached is not None:
+        return cached
     try:
         response = await openai_client.embeddings.create(
-            model="text-embedding-3-small",
-            input=text
+            model=EMBEDDING_MODEL,
+            input=text,
+            **embedding_options()
         )
-        return response.data[0].embedding
+        embedding = response.data[0].embedding
     except Exception as e:
         print(f"Error getting embedding: {e}")
-        return [0] * 1536  # Return zero vector on error
+        return [0] * EMBEDDING_DIMENSIONS  # Return zero vector on error
+    await cache.put(EMBEDDING_MODEL, EMBEDDING_DIMENSIONS, text, embedding)
+    return embedding
 
 @financial_analyst_agent.tool
 async def retrieve_relevant_stock_info(ctx: RunContext[FinancialAnalystDeps], user_query: str) -> str:
@@ -75,15 +91,26 @@ async def retrieve_relevant_stock_info(ctx: RunContext[FinancialAnalystDeps], us
         # Get the embedding for the query
         query_embedding = await get_embedding(user_query, ctx.deps.openai_client)
 
-        # Query Supabase for relevant documents
-        result = ctx.deps.supabase.rpc(
-            'match_stock_info',
-            {
+        # Query Supabase for relevant documents, scoped to the companies and sections the query
+        # mentions; the scope is widened step by step if it matches nothing
+        scope = infer_scope(user_query)
+        for symbols, sections in scope.widening():
+            params = {
                 'query_embedding': query_embedding,
                 'match_count': 5,
-                'filter': {} # You can add filters if needed, e.g., {'metadata': {'company_symbol': 'AAPL'}}
+                'filter': {}
             }
-        ).execute()
+            if symbols:
+                params['symbols'] = symbols
+            if sections:
+                params['sections'] = sections
+            if vector_ef_search:
+                params['ef_search'] = int(vector_ef_search)
+            if vector_probes:
+                params['probes'] = int(vector_probes)
+            result = await ctx.deps.supabase.rpc('match_stock_info', params).execute()
+            if result.data:
+                break
 
         if not result.data:
             return "No relevant stock information found in the database for your query."
@@ -115,7 +142,7 @@ async def list_stock_data_sections(ctx: RunContext[FinancialAnalystDeps]) -> Lis
     """
     try:
         # Query Supabase for unique URLs from the stock_info table
-        result = ctx.deps.supabase.from_('stock_info') \
+        result = await ctx.deps.supabase.from_('stock_info') \
             .select('url') \
             .execute()
 
@@ -144,7 +171,7 @@ async def get_stock_data_section_content(ctx: RunContext[FinancialAnalystDeps],
     """
     try:
         # Query Supabase for all chunks of this URL, ordered by chunk_number
-        result = ctx.deps.supabase.from_('stock_info') \
+        result = await ctx.deps.supabase.from_('stock_info') \
             .select('title, content, chunk_number, url') \
             .eq('url', section_url) \
             .order('chunk_number') \
@@ -169,10 +196,7 @@ async def get_stock_data_section_content(ctx: RunContext[FinancialAnalystDeps],
         return f"Error retrieving stock data section content: {str(e)}"
 
 async def main():
-    supabase_client: Client = create_client(
-        os.getenv("SUPABASE_URL"),
-        os.getenv("SUPABASE_SERVICE_KEY")
-    )
+    supabase_client: AsyncClient = await get_supabase()
     openai_client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
     deps = FinancialAnalystDeps(supabase=supabase_client, openai_client=openai_client)
@@ -181,8 +205,10 @@ async def main():
     financial_analyst_agent.tools = [list_stock_data_sections, get_stock_data_section_content, retrieve_relevant_stock_info]
 
     while True:
-        user_query = input("User Query: ")
+        user_query = await asyncio.to_thread(input, "User Query: ")
         if user_query.lower() == 'exit':
+            await close_embedding_cache()
+            await close_supabase()
             break
 
         try:
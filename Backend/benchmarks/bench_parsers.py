@@ -0,0 +1,287 @@
+"""
+Micro-benchmarks for every section parser over a corpus of recorded screener.in pages.
+
+Fixtures live in a directory with one sub-directory per symbol:
+
+    <fixtures>/<SYMBOL>/page.html            static company page (plain HTTP fetch)
+    <fixtures>/<SYMBOL>/page.rendered.html   browser-rendered page (for needs_js sections), optional
+    <fixtures>/<SYMBOL>/<section_name>.md    saved section markdown, optional (derived from the HTML if missing)
+
+benchmarks/fixtures holds a small committed corpus (three companies in screener.in's page
+markup, including one with no documents or concalls), so runs are repeatable without
+scraping. Build a larger one from a page archive recorded with `python crawl_main.py --record ARCHIVE`:
+
+    python benchmarks/bench_parsers.py --export ARCHIVE --fixtures benchmarks/fixtures
+
+Then run, optionally comparing against a saved baseline:
+
+    python benchmarks/bench_parsers.py --fixtures benchmarks/fixtures --save baseline.json
+    python benchmarks/bench_parsers.py --fixtures benchmarks/fixtures --baseline baseline.json --threshold 0.2
+
+For each parser it reports median and p95 latency per call, bytes allocated per call
+(tracemalloc) and the share of fixtures it failed on (None, empty or an exception). With
+--baseline, the run exits non-zero if any parser got slower by more than --threshold or
+fails on more fixtures than before. A baseline records the machine it was measured on;
+latencies are only compared against a baseline from the same machine (failure rates
+always are), so save one per machine.
+"""
+import argparse
+import glob
+import importlib.util
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Dict, List
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from section_parsers import COMPANY_SECTIONS, company_url, extract_section_markdown  # noqa: E402
+from dom_parsers import parse_html, select_first  # noqa: E402
+from page_archive import PageArchive  # noqa: E402
+
+# Prototype parsers in sectioned/, by the section they parse
+SECTIONED_PARSERS = {
+    "basicdata.py": ("parse_basic_data", "basic_data"),
+    "quaterlyResults.py": ("parse_quarterly_results", "quarterly_results"),
+    "balanceSheet.py": ("parse_balance_sheet", "balance_sheet"),
+    "peer_comparison.py": ("parse_peer_comparison", "peer_comparison"),
+    "profitLoss.py": ("parse_profit_loss", "profit_loss"),
+    "cashflow.py": ("parse_cash_flow", "cash_flow"),
+    "ratios.py": ("parse_ratios", "ratios"),
+    "shareholding.py": ("parse_shareholding", "shareholding_pattern"),
+    "documents.py": ("parse_documents", "documents"),
+}
+
+
+@dataclass
+class Fixture:
+    symbol: str
+    section_name: str
+    markdown: str
+    html: str
+
+
+@dataclass
+class Result:
+    parser: str
+    calls: int
+    median_us: float
+    p95_us: float
+    alloc_bytes: float
+    failure_rate: float
+
+
+def fixture_html(symbol_dir: str, section_name: str) -> str:
+    rendered = os.path.join(symbol_dir, "page.rendered.html")
+    path = rendered if COMPANY_SECTIONS[section_name].needs_js and os.path.exists(rendered) else os.path.join(symbol_dir, "page.html")
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def load_fixtures(fixtures_dir: str) -> List[Fixture]:
+    """Loads every (symbol, section) fixture, deriving section markdown from the page if not saved."""
+    fixtures = []
+    for symbol_dir in sorted(glob.glob(os.path.join(fixtures_dir, "*", ""))):
+        symbol = os.path.basename(os.path.normpath(symbol_dir))
+        if not os.path.exists(os.path.join(symbol_dir, "page.html")):
+            continue
+        for section_name, spec in COMPANY_SECTIONS.items():
+            html = fixture_html(symbol_dir, section_name)
+            markdown_path = os.path.join(symbol_dir, f"{section_name}.md")
+            if os.path.exists(markdown_path):
+                with open(markdown_path, encoding="utf-8") as f:
+                    markdown = f.read()
+            else:
+                markdown = extract_section_markdown(html, spec.selector, company_url(symbol))
+            fixtures.append(Fixture(symbol, section_name, markdown, html))
+    return fixtures
+
+
+def export_fixtures(archive_path: str, fixtures_dir: str):
+    """Writes the company pages in a page archive out as a fixture directory."""
+    archive = PageArchive(archive_path, "replay")
+    prefix = company_url("")
+    for page in archive.pages():
+        if page.selector or not page.url.startswith(prefix):
+            continue
+        rendered = page.url.endswith("#rendered")
+        symbol = page.url[len(prefix):].split("/")[0]
+        symbol_dir = os.path.join(fixtures_dir, symbol)
+        os.makedirs(symbol_dir, exist_ok=True)
+        with open(os.path.join(symbol_dir, "page.rendered.html" if rendered else "page.html"), "w", encoding="utf-8") as f:
+            f.write(page.body)
+        for section_name, spec in COMPANY_SECTIONS.items():
+            if spec.needs_js == rendered:
+                with open(os.path.join(symbol_dir, f"{section_name}.md"), "w", encoding="utf-8") as f:
+                    f.write(extract_section_markdown(page.body, spec.selector, company_url(symbol)))
+    archive.close()
+
+
+def load_sectioned_parsers() -> Dict[str, Callable]:
+    """Imports the parse_* functions from the sectioned/ prototype scripts."""
+    parsers = {}
+    for filename, (function_name, section_name) in SECTIONED_PARSERS.items():
+        path = os.path.join(BACKEND_DIR, "sectioned", filename)
+        spec = importlib.util.spec_from_file_location(f"sectioned_{filename[:-3]}", path)
+        module = importlib.util.module_from_spec(spec)
+        try:
+            spec.loader.exec_module(module)
+        except Exception as e:
+            print(f"Skipping sectioned/{filename}: {e}")
+            continue
+        parsers[f"sectioned/{filename}:{function_name}"] = (section_name, getattr(module, function_name))
+    return parsers
+
+
+def failed(output: Any) -> bool:
+    # Parsed pages (lxml elements) are judged by presence, not by truthiness (their child count)
+    if output is None or not isinstance(output, (dict, list)):
+        return output is None
+    return not output or (isinstance(output, dict) and "error" in output)
+
+
+def bench(name: str, call: Callable[[Any], Any], inputs: List[Any], repeat: int) -> Result:
+    """Times `call` over every input `repeat` times, then measures its allocations once per input."""
+    timings = []
+    failures = 0
+    for value in inputs:
+        try:
+            failures += failed(call(value))
+        except Exception:
+            failures += 1
+        for _ in range(repeat):
+            start = time.perf_counter_ns()
+            try:
+                call(value)
+            except Exception:
+                pass
+            timings.append((time.perf_counter_ns() - start) / 1000)
+
+    tracemalloc.start()
+    allocated = 0
+    for value in inputs:
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        try:
+            call(value)
+        except Exception:
+            pass
+        allocated += tracemalloc.get_traced_memory()[1] - before
+    tracemalloc.stop()
+
+    timings.sort()
+    return Result(
+        parser=name,
+        calls=len(timings),
+        median_us=statistics.median(timings) if timings else 0.0,
+        p95_us=timings[int(len(timings) * 0.95)] if timings else 0.0,
+        alloc_bytes=allocated / len(inputs) if inputs else 0.0,
+        failure_rate=failures / len(inputs) if inputs else 0.0,
+    )
+
+
+def run(fixtures: List[Fixture], repeat: int) -> List[Result]:
+    by_section: Dict[str, List[Fixture]] = {}
+    for fixture in fixtures:
+        by_section.setdefault(fixture.section_name, []).append(fixture)
+
+    results = []
+    pages = list({id(f.html): f.html for f in fixtures}.values())
+    results.append(bench("dom_parsers.parse_html", parse_html, pages, repeat))
+
+    for section_name, spec in COMPANY_SECTIONS.items():
+        section_fixtures = by_section.get(section_name, [])
+        markdowns = [f.markdown for f in section_fixtures]
+        results.append(bench(f"section_parsers:{spec.parser.__name__}", spec.parser, markdowns, repeat))
+
+        elements = []
+        for fixture in section_fixtures:
+            element = select_first(parse_html(fixture.html), spec.selector)
+            elements.append(element)
+        dom_parser = lambda element, parse=spec.dom_parser: parse(element) if element is not None else None
+        results.append(bench(f"dom:{section_name}", dom_parser, elements, repeat))
+
+    for name, (section_name, parser) in load_sectioned_parsers().items():
+        markdowns = [f.markdown for f in by_section.get(section_name, [])]
+        results.append(bench(name, parser, markdowns, repeat))
+    return results
+
+
+def machine() -> Dict[str, Any]:
+    """Identifies the machine and interpreter a run was timed on."""
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "system": platform.system(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpus": os.cpu_count(),
+        "node": platform.node(),
+    }
+
+
+def regressions(results: List[Result], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """
+    Compares a run against a saved baseline. Latencies are only compared when the baseline was
+    measured on this machine; failure rates don't depend on the machine and always are.
+    """
+    same_machine = baseline.get("machine") == machine()
+    if not same_machine:
+        print(f"\nBaseline is from another machine ({baseline.get('machine')}); comparing failure rates only.")
+    problems = []
+    for result in results:
+        before = baseline.get("results", {}).get(result.parser)
+        if not before:
+            continue
+        if same_machine and before["median_us"] and result.median_us > before["median_us"] * (1 + threshold):
+            problems.append(f"{result.parser}: median {before['median_us']:.1f}us -> {result.median_us:.1f}us")
+        if result.failure_rate > before["failure_rate"]:
+            problems.append(f"{result.parser}: failure rate {before['failure_rate']:.0%} -> {result.failure_rate:.0%}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the screener.in section parsers.")
+    parser.add_argument("--fixtures", default=os.path.join(BACKEND_DIR, "benchmarks", "fixtures"))
+    parser.add_argument("--export", metavar="ARCHIVE", help="Write fixtures from a recorded page archive and exit")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed calls per fixture")
+    parser.add_argument("--save", metavar="FILE", help="Save the results as a baseline")
+    parser.add_argument("--baseline", metavar="FILE", help="Compare against a saved baseline")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed median slowdown (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    if args.export:
+        export_fixtures(args.export, args.fixtures)
+        print(f"Wrote fixtures to {args.fixtures}")
+        return
+
+    fixtures = load_fixtures(args.fixtures)
+    if not fixtures:
+        sys.exit(f"No fixtures in {args.fixtures}; create them with --export ARCHIVE")
+    print(f"{len(fixtures)} fixtures from {len({f.symbol for f in fixtures})} companies, {args.repeat} calls each\n")
+
+    results = run(fixtures, args.repeat)
+    print(f"{'parser':<58}{'median us':>11}{'p95 us':>11}{'alloc B':>11}{'fail':>7}")
+    for r in results:
+        print(f"{r.parser:<58}{r.median_us:>11.1f}{r.p95_us:>11.1f}{r.alloc_bytes:>11.0f}{r.failure_rate:>7.0%}")
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"machine": machine(), "results": {r.parser: asdict(r) for r in results}}, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            problems = regressions(results, json.load(f), args.threshold)
+        if problems:
+            print("\nRegressions:\n  " + "\n  ".join(problems))
+            sys.exit(1)
+        print("\nNo regressions against baseline.")
+
+
+if __name__ == "__main__":
+    main()
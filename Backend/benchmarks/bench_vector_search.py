@@ -0,0 +1,111 @@
+"""
+Recall@k vs latency of the stock_info vector index, measured on the rows actually stored.
+
+Query vectors are sampled from stored embeddings (each query's own row is excluded from its
+results). Exact neighbours come from a sequential scan with index scans disabled; each
+index setting is then timed and scored against them:
+
+    python benchmarks/bench_vector_search.py --queries 200 --k 5
+    python benchmarks/bench_vector_search.py --ef-search 20 40 80 160   # HNSW
+    python benchmarks/bench_vector_search.py --probes 1 5 10 20          # ivfflat
+
+Build or rebuild the index being measured with `python vector_index.py build --type ...`.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from typing import List, Sequence, Set, Tuple
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import asyncpg  # noqa: E402
+from pgvector.asyncpg import register_vector  # noqa: E402
+
+from vector_index import VECTOR_INDEX  # noqa: E402
+
+SEARCH_SQL = "select id from stock_info where id <> $2 order by embedding <=> $1 limit $3"
+
+
+async def sample_queries(conn: asyncpg.Connection, count: int) -> List[Tuple[int, object]]:
+    return [(row["id"], row["embedding"]) for row in await conn.fetch(
+        "select id, embedding from stock_info where embedding is not null order by random() limit $1", count
+    )]
+
+
+async def search(conn: asyncpg.Connection, settings: Sequence[str], query, exclude_id: int, k: int) -> Tuple[Set[int], float]:
+    """Runs one k-NN query under `settings` (SET LOCAL statements); returns (ids, seconds)."""
+    async with conn.transaction():
+        for setting in settings:
+            await conn.execute(setting)
+        start = time.perf_counter()
+        rows = await conn.fetch(SEARCH_SQL, query, exclude_id, k)
+        elapsed = time.perf_counter() - start
+    return {row["id"] for row in rows}, elapsed
+
+
+def summarize(label: str, recalls: List[float], latencies: List[float]) -> str:
+    latencies = sorted(latencies)
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    return (f"{label:<22}{statistics.mean(recalls):>10.3f}"
+            f"{statistics.median(latencies) * 1000:>12.2f}{p95 * 1000:>12.2f}")
+
+
+async def run(dsn: str, query_count: int, k: int, ef_search: List[int], probes: List[int]):
+    conn = await asyncpg.connect(dsn)
+    await register_vector(conn)
+    try:
+        indexdef = await conn.fetchval("select indexdef from pg_indexes where indexname = $1", VECTOR_INDEX)
+        print(indexdef or f"No {VECTOR_INDEX}: only the exact scan is measured")
+        index_type = "hnsw" if indexdef and " hnsw " in indexdef else "ivfflat" if indexdef else None
+
+        queries = await sample_queries(conn, query_count)
+        if not queries:
+            sys.exit("stock_info has no embeddings to sample queries from")
+
+        exact_settings = ["set local enable_indexscan = off", "set local enable_bitmapscan = off"]
+        truth, exact_latencies = [], []
+        for query_id, query in queries:
+            ids, elapsed = await search(conn, exact_settings, query, query_id, k)
+            truth.append(ids)
+            exact_latencies.append(elapsed)
+
+        print(f"\n{len(queries)} queries, recall@{k}\n")
+        print(f"{'setting':<22}{'recall':>10}{'p50 ms':>12}{'p95 ms':>12}")
+        print(summarize("exact scan", [1.0] * len(queries), exact_latencies))
+
+        if index_type == "hnsw":
+            variants = [(f"hnsw.ef_search={v}", [f"set local hnsw.ef_search = {v}"]) for v in ef_search]
+        elif index_type == "ivfflat":
+            variants = [(f"ivfflat.probes={v}", [f"set local ivfflat.probes = {v}"]) for v in probes]
+        else:
+            variants = []
+        for label, settings in variants:
+            recalls, latencies = [], []
+            for (query_id, query), expected in zip(queries, truth):
+                ids, elapsed = await search(conn, settings, query, query_id, k)
+                recalls.append(len(ids & expected) / len(expected) if expected else 1.0)
+                latencies.append(elapsed)
+            print(summarize(label, recalls, latencies))
+    finally:
+        await conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark recall@k vs latency of the stock_info vector index.")
+    parser.add_argument("--dsn", default=os.environ.get("DATABASE_URL"), help="Postgres connection string (default: DATABASE_URL)")
+    parser.add_argument("--queries", type=int, default=100, help="Number of sampled query vectors")
+    parser.add_argument("--k", type=int, default=5, help="Neighbours per query (the agent asks for 5)")
+    parser.add_argument("--ef-search", type=int, nargs="+", default=[10, 20, 40, 80, 160])
+    parser.add_argument("--probes", type=int, nargs="+", default=[1, 2, 5, 10, 20])
+    args = parser.parse_args()
+    if not args.dsn:
+        parser.error("no database: set DATABASE_URL or pass --dsn")
+    asyncio.run(run(args.dsn, args.queries, args.k, args.ef_search, args.probes))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+import argparse
+import asyncio
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+import asyncpg
+from pgvector.asyncpg import register_vector
+
+from chunk_writer import BufferedWriter, PendingRow
+from vector_index import build_index, drop_index
+
+DATABASE_URL = os.environ.get("DATABASE_URL")
+BULK_LOAD_BATCH_ROWS = int(os.environ.get("BULK_LOAD_BATCH_ROWS", "5000"))
+BULK_LOAD_FLUSH_SECONDS = float(os.environ.get("BULK_LOAD_FLUSH_SECONDS", "5"))
+
+STAGING_TABLE = "stock_info_staging"
+COLUMNS = ["url", "chunk_number", "title", "summary", "content", "metadata", "embedding"]
+
+
+async def connect_pool(dsn: Optional[str] = None) -> asyncpg.Pool:
+    """Opens a direct Postgres pool with the pgvector codec registered (vectors travel as binary)."""
+    return await asyncpg.create_pool(dsn or DATABASE_URL, min_size=1, max_size=4, init=register_vector)
+
+
+def copy_record(row: Dict[str, Any]) -> tuple:
+    """A chunk row as a COPY record, in COLUMNS order (metadata as JSON text for the jsonb column)."""
+    return (row["url"], row["chunk_number"], row["title"], row["summary"], row["content"],
+            json.dumps(row["metadata"]), row["embedding"])
+
+
+def merge_sql() -> str:
+    """Upserts the staging table into stock_info, keeping the newest staged row per (url, chunk_number)."""
+    update = ", ".join(f"{column} = excluded.{column}" for column in COLUMNS[2:])
+    return (
+        f"insert into stock_info ({', '.join(COLUMNS)})"
+        f" select distinct on (url, chunk_number) {', '.join(COLUMNS)}"
+        f" from {STAGING_TABLE} order by url, chunk_number, id desc"
+        f" on conflict (url, chunk_number) do update set {update}, created_at = now()"
+    )
+
+
+class BulkLoader(BufferedWriter):
+    """
+    Loads chunk rows into stock_info by streaming them over binary COPY into an unlogged
+    staging table, then merging the staging table into stock_info in one statement.
+
+    It is a BufferedWriter like ChunkWriter, so ingestion can be pointed at it unchanged
+    (crawl_main.set_chunk_writer). A row's result is ok once it is staged; `finish()` merges
+    everything staged, newest row per (url, chunk_number) winning, and drops the staging table.
+    """
+
+    def __init__(self, pool: asyncpg.Pool, batch_rows: int = BULK_LOAD_BATCH_ROWS,
+                 flush_seconds: float = BULK_LOAD_FLUSH_SECONDS):
+        super().__init__(batch_rows, flush_seconds)
+        self.pool = pool
+
+    async def prepare(self):
+        """
+        Creates an empty staging table shaped like stock_info is now. A table left by an earlier
+        run is dropped first: its rows belong to an aborted backfill, and its embedding column may
+        predate a vector_schema migration.
+        """
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute(f"drop table if exists {STAGING_TABLE}")
+                await conn.execute(f"create unlogged table {STAGING_TABLE} (like stock_info including defaults)")
+
+    async def _write_batch(self, batch: List[PendingRow]):
+        # Rows with the same key may all be staged; the merge keeps the newest
+        try:
+            async with self.pool.acquire() as conn:
+                await conn.copy_records_to_table(
+                    STAGING_TABLE, records=[copy_record(p.row) for p in batch], columns=COLUMNS
+                )
+        except Exception as e:
+            print(f"Error copying {len(batch)} rows into {STAGING_TABLE}: {e}")
+            for pending in batch:
+                self._resolve(pending, False, str(e))
+            return
+        for pending in batch:
+            self._resolve(pending, True)
+
+    async def finish(self) -> int:
+        """Merges the staging table into stock_info and drops it. Returns the number of rows merged."""
+        await self.flush()
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                status = await conn.execute(merge_sql())
+                await conn.execute(f"drop table {STAGING_TABLE}")
+        return int(status.rsplit(" ", 1)[-1])
+
+
+async def backfill(symbols: List[str], rebuild_index: bool = False, dsn: Optional[str] = None):
+    """
+    Ingests `symbols` with every chunk routed through a BulkLoader instead of PostgREST.
+
+    With `rebuild_index`, the vector index is dropped before the merge and built once over
+    the loaded table afterwards (as VECTOR_INDEX_TYPE), instead of being maintained row by row.
+    """
+    # Imported here so the loader itself doesn't pull in the ingestion clients
+    from crawl_main import ingest_many, ingestion_clients, set_chunk_writer
+
+    pool = await connect_pool(dsn)
+    try:
+        # The shared teardown flushes the loader too, so the pool is closed after it
+        async with ingestion_clients():
+            loader = BulkLoader(pool)
+            await loader.prepare()
+            set_chunk_writer(loader)
+            started = time.monotonic()
+            async for result in ingest_many(symbols, force=True):
+                if "error" in result:
+                    print(f"{result['symbol']}: {result['error']}")
+            if rebuild_index:
+                async with pool.acquire() as conn:
+                    await drop_index(conn)
+            merged = await loader.finish()
+            print(f"Merged {merged} rows ({loader.failed} failed to stage) in {time.monotonic() - started:.0f}s")
+            if rebuild_index:
+                async with pool.acquire() as conn:
+                    definition = await build_index(conn)
+                print(f"Rebuilt {definition} after {time.monotonic() - started:.0f}s")
+    finally:
+        await pool.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill stock_info over binary COPY, bypassing PostgREST.")
+    parser.add_argument("symbols_file", help="File with one screener.in symbol per line")
+    parser.add_argument("--rebuild-index", action="store_true", help="Drop the vector index for the load and rebuild it after")
+    parser.add_argument("--dsn", help="Postgres connection string (default: DATABASE_URL)")
+    args = parser.parse_args()
+    with open(args.symbols_file) as f:
+        symbols = [line.strip().upper() for line in f if line.strip()]
+    asyncio.run(backfill(symbols, rebuild_index=args.rebuild_index, dsn=args.dsn))
@@ -0,0 +1,136 @@
+import asyncio
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from postgrest.types import ReturnMethod
+
+from db import get_supabase
+
+STOCK_INFO_FLUSH_ROWS = int(os.environ.get("STOCK_INFO_FLUSH_ROWS", "200"))
+STOCK_INFO_FLUSH_SECONDS = float(os.environ.get("STOCK_INFO_FLUSH_SECONDS", "2"))
+
+CONFLICT_COLUMNS = "url,chunk_number"
+
+
+@dataclass
+class WriteResult:
+    url: str
+    chunk_number: int
+    ok: bool
+    error: Optional[str] = None
+
+
+@dataclass
+class PendingRow:
+    row: Dict[str, Any]
+    future: asyncio.Future
+
+    @property
+    def key(self) -> Tuple[str, int]:
+        return self.row["url"], self.row["chunk_number"]
+
+
+class BufferedWriter:
+    """
+    Write buffer that groups chunk rows into batches.
+
+    `await writer.write(row)` queues the row and returns its WriteResult once the batch it
+    landed in is written. A batch is sent when it holds `flush_rows` rows or `flush_seconds`
+    after its first row, so rows from many sections and symbols share one request. Subclasses
+    implement `_write_batch`, resolving every row of the batch with `_resolve`.
+    """
+
+    def __init__(self, flush_rows: int, flush_seconds: float):
+        self.flush_rows = flush_rows
+        self.flush_seconds = flush_seconds
+        self.written = 0
+        self.failed = 0
+        self._pending: List[PendingRow] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._in_flight = set()
+
+    async def write(self, row: Dict[str, Any]) -> WriteResult:
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append(PendingRow(row, future))
+        if len(self._pending) >= self.flush_rows:
+            self._send()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.flush_seconds, self._send)
+        return await future
+
+    def _send(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        task = asyncio.ensure_future(self._write_batch(batch))
+        self._in_flight.add(task)
+        task.add_done_callback(self._in_flight.discard)
+
+    def _resolve(self, pending: PendingRow, ok: bool, error: Optional[str] = None):
+        url, chunk_number = pending.key
+        if ok:
+            self.written += 1
+        else:
+            self.failed += 1
+        if not pending.future.done():
+            pending.future.set_result(WriteResult(url, chunk_number, ok, error))
+
+    async def _write_batch(self, batch: List[PendingRow]):
+        raise NotImplementedError
+
+    async def flush(self):
+        """Writes anything still queued and waits for every in-flight batch."""
+        self._send()
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight)
+
+
+class ChunkWriter(BufferedWriter):
+    """
+    BufferedWriter that stores chunk rows as multi-row upserts on (url, chunk_number).
+
+    Upserting means a re-ingested chunk replaces the stored one instead of failing on the
+    unique key. If a batch is rejected, its rows are retried one by one so a single bad row
+    only fails itself. A row overtaken by a newer row with the same key in the same batch
+    reports "superseded".
+    """
+
+    def __init__(self, table: str = "stock_info", flush_rows: int = STOCK_INFO_FLUSH_ROWS,
+                 flush_seconds: float = STOCK_INFO_FLUSH_SECONDS):
+        super().__init__(flush_rows, flush_seconds)
+        self.table = table
+
+    async def _upsert(self, rows: List[Dict[str, Any]]):
+        supabase = await get_supabase()
+        await supabase.table(self.table) \
+            .upsert(rows, on_conflict=CONFLICT_COLUMNS, returning=ReturnMethod.minimal) \
+            .execute()
+
+    async def _write_batch(self, batch: List[PendingRow]):
+        # Postgres rejects an upsert that touches the same key twice, so only the newest row per key is sent
+        latest: Dict[Tuple[str, int], PendingRow] = {}
+        for pending in batch:
+            superseded = latest.get(pending.key)
+            if superseded is not None:
+                self._resolve(superseded, False, "superseded")
+            latest[pending.key] = pending
+        rows = list(latest.values())
+
+        try:
+            await self._upsert([pending.row for pending in rows])
+        except Exception as e:
+            print(f"Error upserting {len(rows)} chunks, retrying one by one: {e}")
+            for pending in rows:
+                try:
+                    await self._upsert([pending.row])
+                except Exception as row_error:
+                    self._resolve(pending, False, str(row_error))
+                else:
+                    self._resolve(pending, True)
+            return
+        for pending in rows:
+            self._resolve(pending, True)
@@ -0,0 +1,147 @@
+import json
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+import tiktoken
+
+from embedding_batcher import get_encoding
+
+CHUNK_MAX_TOKENS = int(os.environ.get("CHUNK_MAX_TOKENS", "800"))
+
+PERIOD_KEYS = ("Years", "Quarters")
+
+_encoding: Optional[tiktoken.Encoding] = None
+
+
+def _encode(text: str) -> List[int]:
+    global _encoding
+    if _encoding is None:
+        _encoding = get_encoding()
+    return _encoding.encode(text, disallowed_special=())
+
+
+def count_tokens(text: str) -> int:
+    """Counts tokens the way the embedding model will."""
+    return len(_encode(text))
+
+
+def _tokens(obj: Any) -> int:
+    return count_tokens(json.dumps(obj))
+
+
+def _pack(items: List[Any], costs: List[int], budget: int) -> List[List[Any]]:
+    """Greedily groups consecutive items so each group's summed cost stays within `budget`."""
+    groups, current, used = [], [], 0
+    for item, cost in zip(items, costs):
+        if current and used + cost > budget:
+            groups.append(current)
+            current, used = [], 0
+        current.append(item)
+        used += cost + 1  # separator
+    if current:
+        groups.append(current)
+    return groups
+
+
+def _split_table(context: Dict[str, Any], data: Dict[str, Any], periods_key: str, max_tokens: int) -> List[Dict[str, Any]]:
+    """
+    Splits a {periods_key: [...], metric: [values...]} table into groups of metric rows, each
+    repeating the period header. If even one row with every period is too big, the columns
+    are cut into period windows first.
+    """
+    periods = data[periods_key]
+    rows: List[Tuple[str, list]] = [(k, v) for k, v in data.items() if k != periods_key and isinstance(v, list)]
+    # Short scalar fields (e.g. "Upcoming result date") travel with every chunk
+    extras = {k: v for k, v in data.items() if k != periods_key and not isinstance(v, (list, dict))}
+    nested = {k: v for k, v in data.items() if isinstance(v, dict)}
+
+    parts = []
+    window = max(1, len(periods))
+    while True:
+        windows = [(start, start + window) for start in range(0, max(1, len(periods)), window)]
+        header_costs = [_tokens({**context, "data": {**extras, periods_key: periods[a:b]}}) for a, b in windows]
+        row_costs = [[_tokens({metric: values[a:b]}) for metric, values in rows] for a, b in windows]
+        if window == 1 or all(header + max(costs, default=0) <= max_tokens
+                              for header, costs in zip(header_costs, row_costs)):
+            break
+        window = (window + 1) // 2
+
+    for (a, b), header, costs in zip(windows, header_costs, row_costs):
+        for group in _pack(rows, costs, max_tokens - header):
+            table = {**extras, periods_key: periods[a:b]}
+            table.update((metric, values[a:b]) for metric, values in group)
+            parts.append({**context, "data": table})
+
+    for key, value in nested.items():
+        parts.extend(_split({**context, "table": key}, value, max_tokens))
+    return parts
+
+
+def _split(context: Dict[str, Any], data: Any, max_tokens: int) -> List[Dict[str, Any]]:
+    whole = {**context, "data": data}
+    if _tokens(whole) <= max_tokens:
+        return [whole]
+
+    header = _tokens({**context, "data": []})
+    if isinstance(data, list):
+        # Document, concall and peer lists: split by entry
+        costs = [_tokens(entry) for entry in data]
+        return [{**context, "data": group} for group in _pack(data, costs, max_tokens - header)]
+
+    if isinstance(data, dict):
+        periods_key = next((key for key in PERIOD_KEYS if isinstance(data.get(key), list)), None)
+        if periods_key:
+            return _split_table(context, data, periods_key, max_tokens)
+        if all(isinstance(value, (list, dict)) for value in data.values()):
+            # A section made of named tables or lists (shareholding, documents)
+            parts = []
+            for key, value in data.items():
+                parts.extend(_split({**context, "table": key}, value, max_tokens))
+            return parts
+        # Flat name/value pairs (basic data)
+        items = list(data.items())
+        costs = [_tokens({k: v}) for k, v in items]
+        return [{**context, "data": dict(group)} for group in _pack(items, costs, max_tokens - header)]
+
+    # A single oversized value; the embedder truncates it
+    return [whole]
+
+
+def chunk_section(company_symbol: str, section_name: str, section_data: Any,
+                  max_tokens: int = CHUNK_MAX_TOKENS) -> List[str]:
+    """
+    Splits a parsed section into JSON chunks of at most `max_tokens` tokens (tiktoken counts).
+
+    Every chunk is {"company_symbol", "section", ["table"], "data"}, so it can be read and
+    embedded on its own. Tables are split into groups of metric rows that each repeat the
+    period header (and into period windows if a single row is too long), lists such as
+    documents and concalls by entry, and sections of several tables table by table. A
+    section that fits is one chunk.
+    """
+    context = {"company_symbol": company_symbol, "section": section_name}
+    return [json.dumps(part) for part in _split(context, section_data, max_tokens)]
+
+
+def _split_long(text: str, max_tokens: int) -> List[str]:
+    """Cuts text with no usable breaks into max_tokens-sized token slices."""
+    tokens = _encode(text)
+    return [_encoding.decode(tokens[i:i + max_tokens]) for i in range(0, len(tokens), max_tokens)]
+
+
+def chunk_text(text: str, max_tokens: int = CHUNK_MAX_TOKENS) -> List[str]:
+    """Splits free text into chunks of at most `max_tokens` tokens, breaking at paragraphs, then lines."""
+    pieces = []
+    for paragraph in text.split("\n\n"):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if count_tokens(paragraph) <= max_tokens:
+            pieces.append(paragraph)
+            continue
+        for line in paragraph.split("\n"):
+            line = line.strip()
+            if line:
+                pieces.extend([line] if count_tokens(line) <= max_tokens else _split_long(line, max_tokens))
+
+    costs = [count_tokens(piece) for piece in pieces]
+    return ["\n\n".join(group) for group in _pack(pieces, costs, max_tokens)]
@@ -1,24 +1,51 @@
+import argparse
 import asyncio
 import os
 import json
-import re
-from crawl4ai import AsyncWebCrawler, CrawlerRunConfig, CacheMode
+from crawl4ai import CrawlerRunConfig, CacheMode
 from dotenv import load_dotenv
-from supabase import create_client, Client  # Import Supabase library
 from openai import AsyncOpenAI # Import OpenAI library
+from contextlib import asynccontextmanager
 from dataclasses import dataclass
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from urllib.parse import urlparse
 from datetime import datetime, timezone
 
+# Module settings below are read from the environment at import, so load .env first
 load_dotenv()
+
+from crawler_pool import get_crawler_pool, close_crawler_pool
+from snapshot_cache import SnapshotCache, content_hash
+from http_fetch import fetch_html, close_http_client
+from symbol_index import get_symbol_index
+from page_archive import configure_archive, get_page_archive
+from normalize import normalize_batch, frame_to_json
+from parquet_store import FinancialsStore
+from embedding_batcher import EmbeddingBatcher
+from embedding_cache import get_embedding_cache, close_embedding_cache
+from chunking import chunk_section
+from db import get_supabase, close_supabase
+from chunk_writer import ChunkWriter, WriteResult
+from dom_parsers import parse_html
+from section_parsers import COMPANY_SECTIONS, company_url, extract_section, parse_max_age
+
 openai_api_key = os.environ.get("OPENAI_API_KEY")
 
-# Initialize OpenAI and Supabase clients
+# Initialize OpenAI client; the async Supabase client is shared through db.get_supabase
 openai_client = AsyncOpenAI(api_key=openai_api_key)
-supabase_url: str = os.environ.get("SUPABASE_URL")
-supabase_service_key: str = os.environ.get("SUPABASE_SERVICE_KEY")
-supabase: Client = create_client(supabase_url, supabase_service_key)
+
+INGEST_CONCURRENCY = int(os.environ.get("INGEST_CONCURRENCY", "8"))
+# ingest_many normalizes finished symbols in groups of this many, bounding what it holds in memory
+NORMALIZE_GROUP_SIZE = int(os.environ.get("NORMALIZE_GROUP_SIZE", "50"))
+
+# Rendered company pages, so parsers can re-run without re-crawling
+snapshot_cache = SnapshotCache()
+# Columnar copy of every parsed financial time series
+financials_store = FinancialsStore()
+# Collects embedding inputs from concurrent chunks into multi-input requests
+embedding_batcher = EmbeddingBatcher(openai_client, cache=get_embedding_cache())
+# Buffers stored chunks into multi-row upserts on (url, chunk_number)
+chunk_writer = ChunkWriter()
 
 
 @dataclass
@@ -33,733 +60,432 @@ class ProcessedChunk:
 
 async def find_stock_symbol(user_input):
     """
-    Finds stock exchange and name based on user input from Google Search.
-    """
-    async with AsyncWebCrawler() as crawler:
-        result = await crawler.arun(
-            url=f"https://www.google.com/search?q={user_input}+stock+price",
-            css_selector="[class^='loJjTe']"
-        )
-        if result.markdown:
-            exchange, stock_name = result.markdown.split(": ")
-            return {"exchange": exchange, "stock_name": stock_name}
-        return None
+    Finds stock exchange and name based on user input.
 
-def parse_basic_data(markdown_text):
-    """Parses basic data markdown text into a JSON object."""
-    basic_data_json = {}
-    try:
-        lines = markdown_text.strip().split('\n')
-        for line in lines:
-            line = line.strip()
-            if line.startswith("* "):
-                parts = line[2:].split('  ', 1)
-                if len(parts) == 2:
-                    key = parts[0].strip()
-                    value = parts[1].strip()
-                    basic_data_json[key] = value
-        return basic_data_json
-    except Exception:
-        return None
+    Resolved from the local exchange listing index first; Google Search is only used when the
+    listing is unavailable or has no match. Input that matches several listings (e.g. "tata")
+    returns {"candidates": [...]} for the caller to choose from.
+    """
+    index = get_symbol_index()
+    matches = index.lookup(user_input) if index else []
+    if len(matches) == 1:
+        return {"exchange": matches[0].exchange, "stock_name": matches[0].symbol}
+    if matches:
+        return {"candidates": [
+            {"exchange": listing.exchange, "stock_name": listing.symbol, "name": listing.name} for listing in matches
+        ]}
+
+    search_url = f"https://www.google.com/search?q={user_input}+stock+price"
+    search_selector = "[class^='loJjTe']"
+    archive = get_page_archive()
+    if archive and archive.replaying:
+        page = archive.lookup(search_url, search_selector)
+        markdown_text = page.body if page else None
+    else:
+        async with get_crawler_pool().crawler() as crawler:
+            result = await crawler.arun(url=search_url, css_selector=search_selector)
+        markdown_text = result.markdown
+        if archive and markdown_text:
+            archive.record(search_url, markdown_text, search_selector)
+
+    if markdown_text:
+        exchange, stock_name = markdown_text.split(": ")
+        return {"exchange": exchange, "stock_name": stock_name}
+    return None
 
 async def fetch_basic_data(company_symbol):
     """Fetches and parses basic data from screener.in."""
-    async with AsyncWebCrawler() as crawler:
-        config = CrawlerRunConfig(css_selector="#top-ratios", cache_mode=CacheMode.BYPASS)
-        result = await crawler.arun(
-            url=f"https://www.screener.in/company/{company_symbol}/",
-            config=config
-        )
-        if result.markdown:
-            parsed_json = parse_basic_data(result.markdown)
-            if parsed_json:
-                return parsed_json
-            else:
-                return {"error": "Unable to parse basic data", "plain_text": result.markdown}
-        else:
-            return {"error": "No basic data found"}
-
-def parse_quarterly_results(text):
-    """Parses quarterly results markdown text into a JSON object."""
-    lines = text.strip().split('\n')
-    quarters = []
-    data_values = {}
-    upcoming_result_date = ""
-    try:
-        for i, line in enumerate(lines):
-            line = line.strip()
-            if i == 3:
-                quarters = [q.strip() for q in line.split('|') if q.strip()]
-            elif i > 4 and "Upcoming result date:" not in line and line and "---" not in line:
-                parts = [part.strip() for part in line.split('|')]
-                if len(parts) > 1:
-                    metric_name = parts[0]
-                    values = parts[1:]
-                    data_values[metric_name] = values
-            elif "Upcoming result date:" in line:
-                upcoming_result_date = line.split(": **")[1][:-2]
-
-        quarterly_json = {}
-        for metric, values in data_values.items():
-            quarterly_json[metric] = values
-        quarterly_json["Quarters"] = quarters
-        if upcoming_result_date:
-            quarterly_json["Upcoming result date"] = upcoming_result_date
-        return quarterly_json
-    except Exception:
-        return None
+    return await fetch_section(company_symbol, "basic_data")
 
 async def fetch_quarterly_results(company_symbol):
     """Fetches and parses quarterly results from screener.in."""
-    async with AsyncWebCrawler() as crawler:
-        config = CrawlerRunConfig(css_selector="#quarters", cache_mode=CacheMode.BYPASS)
-        result = await crawler.arun(
-            url=f"https://www.screener.in/company/{company_symbol}/",
-            config=config
-        )
-        if result.markdown:
-            parsed_json = parse_quarterly_results(result.markdown)
-            if parsed_json:
-                return parsed_json
-            else:
-                return {"error": "Unable to parse quarterly results", "plain_text": result.markdown}
-        else:
-            return {"error": "No quarterly results data found."}
-
-def parse_balance_sheet(markdown_text):
-    """Parses balance sheet markdown text into a JSON object."""
-    try:
-        lines = [line for line in markdown_text.strip().split('\n') if line.strip()]
-        if len(lines) < 3:
-            return None
-
-        header_line_index = -1
-        for i, line in enumerate(lines):
-            if "Mar 2013" in line:
-                header_line_index = i
-                break
-
-        if header_line_index == -1:
-            return None
-
-        headers = [h.strip() for h in lines[header_line_index].split('|') if h.strip()]
-        year_headers = headers
-        balance_sheet_data = {"Years": year_headers}
-        start_parsing = False
-
-        for i in range(header_line_index + 1, len(lines)):
-            line = lines[i].strip()
-            if line == '---|---|---|---|---|---|---|---|---|---|---|---|---|---|---':
-                start_parsing = True
-                continue
-            if start_parsing and line and "Total Assets" not in line:
-                parts = [part.strip() for part in line.split('|')]
-                if parts and parts[0]:
-                    metric_name = parts[0]
-                    values = parts[1:] if len(parts) > 1 else []
-                    balance_sheet_data[metric_name] = values
-        return balance_sheet_data
-    except Exception as e:
-        print(f"Parsing error in balance sheet: {e}")
-        return None
+    return await fetch_section(company_symbol, "quarterly_results")
 
 async def fetch_balance_sheet(company_symbol):
     """Fetches and parses balance sheet data from screener.in."""
-    async with AsyncWebCrawler() as crawler:
-        config = CrawlerRunConfig(css_selector="#balance-sheet", cache_mode=CacheMode.BYPASS)
-        result = await crawler.arun(
-            url=f"https://www.screener.in/company/{company_symbol}/",
-            config=config
-        )
-        if result.markdown:
-            parsed_json = parse_balance_sheet(result.markdown)
-            if parsed_json:
-                return parsed_json
-            else:
-                return {"error": "Unable to parse balance sheet data", "plain_text": result.markdown}
-        else:
-            return {"error": "No balance sheet data found."}
-
-def parse_peer_comparison(markdown_text):
-    """Parses peer comparison markdown text into a JSON object."""
-    try:
-        lines = [line for line in markdown_text.strip().split('\n') if line.strip()]
-        if len(lines) < 3:
-            return None
-
-        separator_line_index = -1
-        for i, line in enumerate(lines):
-            if '---' in line:
-                separator_line_index = i
-                break
-
-        if separator_line_index == -1 or separator_line_index == 0:
-            return None
-
-        header_line = lines[separator_line_index - 1]
-        headers = [h.strip() for h in header_line.split('|') if h.strip()]
-
-        if not headers:
-            return None
-
-        peer_list = []
-
-        for i in range(separator_line_index + 1, len(lines)):
-            line = lines[i].strip()
-            if not line or line.startswith("Detailed Comparison with:"):
-                continue
-
-            parts = [part.strip() for part in line.split('|')]
-            if len(parts) == len(headers):
-                peer_data = {}
-                for j, header in enumerate(headers):
-                    peer_data[header] = parts[j]
-                peer_list.append(peer_data)
-            elif line.startswith("Median:"):
-                median_parts = [part.replace("Median:","").strip() for part in line.split('|')]
-                median_parts = [part.strip() for part in median_parts]
-                if len(median_parts) == len(headers):
-                    median_data = {}
-                    for j, header in enumerate(headers):
-                        median_data[header] = median_parts[j]
-                    peer_list.append(median_data)
-        return peer_list
-    except Exception:
-        return None
+    return await fetch_section(company_symbol, "balance_sheet")
 
 async def fetch_peer_comparison(company_symbol):
     """Fetches and parses peer comparison data from screener.in."""
-    async with AsyncWebCrawler() as crawler:
-        config = CrawlerRunConfig(css_selector="#peers", cache_mode=CacheMode.BYPASS)
-        result = await crawler.arun(
-            url=f"https://www.screener.in/company/{company_symbol}/",
-            config=config
-        )
-        if result.markdown:
-            parsed_json = parse_peer_comparison(result.markdown)
-            if parsed_json:
-                return parsed_json
-            else:
-                return {"error": "Unable to parse peer comparison data", "plain_text": result.markdown}
-        else:
-            return {"error": "No peer comparison data found."}
-
-def parse_cash_flow(markdown_text):
-    """Parses cash flow markdown text into a JSON object."""
-    try:
-        lines = [line for line in markdown_text.strip().split('\n') if line.strip()]
-        if len(lines) < 3:
-            return None
-
-        header_line_index = -1
-        for i, line in enumerate(lines):
-            if "Mar 2013" in line:
-                header_line_index = i
-                break
-
-        if header_line_index == -1:
-            return None
-
-        headers = [h.strip() for h in lines[header_line_index].split('|') if h.strip()]
-        cash_flow_data = {}
-        start_parsing = False
-
-        for i in range(header_line_index + 1, len(lines)):
-            line = lines[i].strip()
-            if line == '---|---|---|---|---|---|---|---|---|---|---|---|---|---|---':
-                start_parsing = True
-                continue
-            if start_parsing and line and "Net Cash Flow" not in line:
-                parts = [part.strip() for part in line.split('|')]
-                if parts and parts[0]:
-                    metric_name = parts[0]
-                    values = parts[1:] if len(parts) > 1 else []
-                    cash_flow_data[metric_name] = values
-        return cash_flow_data
-    except Exception:
-        return None
+    return await fetch_section(company_symbol, "peer_comparison")
 
 async def fetch_cash_flow(company_symbol):
     """Fetches and parses cash flow data from screener.in."""
-    async with AsyncWebCrawler() as crawler:
-        config = CrawlerRunConfig(css_selector="#cash-flow", cache_mode=CacheMode.BYPASS)
-        result = await crawler.arun(
-            url=f"https://www.screener.in/company/{company_symbol}/",
-            config=config
-        )
-        if result.markdown:
-            parsed_json = parse_cash_flow(result.markdown)
-            if parsed_json:
-                return parsed_json
-            else:
-                return {"error": "Unable to parse cash flow data", "plain_text": result.markdown}
-        else:
-            return {"error": "No cash flow data found."}
-
-def parse_profit_loss(markdown_text):
-    """Parses profit & loss markdown text into a JSON object."""
-    try:
-        lines = [line for line in markdown_text.strip().split('\n') if line.strip()]
-        if len(lines) < 3:
-            return None
+    return await fetch_section(company_symbol, "cash_flow")
 
-        header_line_index = -1
-        for i, line in enumerate(lines):
-            if "Mar 2013" in line:
-                header_line_index = i
-                break
+async def fetch_profit_loss(company_symbol):
+    """Fetches and parses profit & loss data from screener.in."""
+    return await fetch_section(company_symbol, "profit_loss")
 
-        if header_line_index == -1:
-            return None
+async def fetch_ratios(company_symbol):
+    """Fetches and parses ratios data from screener.in."""
+    return await fetch_section(company_symbol, "ratios")
 
-        headers = [h.strip() for h in lines[header_line_index].split('|') if h.strip()]
-        year_headers = headers
-        profit_loss_data = {"Years": year_headers, "Growth Ratios": {}}
-        start_parsing_metrics = False
-        current_growth_section = None
+async def fetch_shareholding_pattern(company_symbol):
+    """Fetches and parses shareholding pattern data from screener.in."""
+    return await fetch_section(company_symbol, "shareholding_pattern")
 
-        for i in range(header_line_index + 1, len(lines)):
-            line = lines[i].strip()
-            if line == '---|---|---|---|---|---|---|---|---|---|---|---|---|---|---':
-                start_parsing_metrics = True
-                continue
+async def fetch_documents(company_symbol):
+    """Fetches and parses documents data from screener.in (excluding concalls)."""
+    return await fetch_section(company_symbol, "documents")
 
-            if start_parsing_metrics:
-                if "Compounded Sales Growth" in line:
-                    current_growth_section = "Compounded Sales Growth"
-                    profit_loss_data["Growth Ratios"][current_growth_section] = {}
-                    continue
-                elif "Compounded Profit Growth" in line:
-                    current_growth_section = "Compounded Profit Growth"
-                    profit_loss_data["Growth Ratios"][current_growth_section] = {}
-                    continue
-                elif "Stock Price CAGR" in line:
-                    current_growth_section = "Stock Price CAGR"
-                    profit_loss_data["Growth Ratios"][current_growth_section] = {}
-                    continue
-                elif "Return on Equity" in line:
-                    current_growth_section = "Return on Equity"
-                    profit_loss_data["Growth Ratios"][current_growth_section] = {}
-                    continue
-                elif current_growth_section:
-                    if ":" in line:
-                        ratio_parts = [part.strip() for part in line.split(':')]
-                        if len(ratio_parts) == 2:
-                            time_period = ratio_parts[0]
-                            value = ratio_parts[1]
-                            profit_loss_data["Growth Ratios"][current_growth_section][time_period] = value
-                    elif not line:
-                        current_growth_section = None
-                elif line and "Compounded Sales Growth" not in line and "Compounded Profit Growth" not in line and "Stock Price CAGR" not in line and "Return on Equity" not in line:
-                    parts = [part.strip() for part in line.split('|')]
-                    if parts and parts[0]:
-                        metric_name = parts[0]
-                        values = parts[1:] if len(parts) > 1 else []
-                        profit_loss_data[metric_name] = values
-
-        return profit_loss_data
-    except Exception as e:
-        print(f"Parsing error in profit & loss: {e}")
-        return None
+async def fetch_concalls(company_symbol):
+    """Fetches and parses concalls data from screener.in and returns structured JSON."""
+    return await fetch_section(company_symbol, "concalls")
 
-async def fetch_profit_loss(company_symbol):
-    """Fetches and parses profit & loss data from screener.in."""
-    async with AsyncWebCrawler() as crawler:
-        config = CrawlerRunConfig(css_selector="#profit-loss", cache_mode=CacheMode.BYPASS)
-        result = await crawler.arun(
-            url=f"https://www.screener.in/company/{company_symbol}/",
-            config=config
-        )
-        if result.markdown:
-            parsed_json = parse_profit_loss(result.markdown)
-            if parsed_json:
-                return parsed_json
-            else:
-                return {"error": "Unable to parse profit & loss data", "plain_text": result.markdown}
-        else:
-            return {"error": "No profit & loss data found."}
-
-def parse_ratios(markdown_text):
-    """Parses ratios markdown text into a JSON object."""
-    try:
-        lines = [line for line in markdown_text.strip().split('\n') if line.strip()]
-        if len(lines) < 3:
-            return None
+async def fetch_company_page(company_symbol, max_age=None, render_js=False):
+    """
+    Returns the HTML of the screener.in company page.
 
-        header_line_index = -1
-        for i, line in enumerate(lines):
-            if "Mar 2013" in line:
-                header_line_index = i
-                break
+    Unless `render_js` is set, the page is fetched over plain keep-alive HTTP, falling back to
+    the headless browser if that fails. The on-disk snapshot is reused when it is younger than
+    `max_age` seconds (default: the snapshot cache TTL); otherwise it is refreshed.
 
-        if header_line_index == -1:
+    When a page archive is active the snapshot cache is bypassed: in replay mode the page
+    comes from the archive, and in record mode every fetched page is written to it.
+    """
+    url = company_url(company_symbol)
+    cache_key = f"{url}#rendered" if render_js else url
+    archive = get_page_archive()
+    if archive and archive.replaying:
+        page = archive.lookup(cache_key)
+        if page is None:
+            print(f"{cache_key} is not in the page archive")
             return None
+        return page.body
+
+    snapshot = None if archive else snapshot_cache.get(cache_key, max_age)
+    if snapshot:
+        return snapshot.html
+
+    html = None if render_js else await fetch_html(url)
+    if html is None:
+        async with get_crawler_pool().crawler() as crawler:
+            page = await crawler.arun(url=url, config=CrawlerRunConfig(cache_mode=CacheMode.BYPASS))
+        if not page.success or not page.html:
+            print(f"Unable to load company page for {company_symbol}: {page.error_message}")
+            return None
+        html = page.html
+    snapshot_cache.put(cache_key, html)
+    if archive:
+        archive.record(cache_key, html)
+    return html
 
-        headers = [h.strip() for h in lines[header_line_index].split('|') if h.strip()]
-        year_headers = headers
-        ratios_data = {"Years": year_headers}
-        start_parsing = False
+async def fetch_company_sections(company_symbol, section_names=None, max_age=None):
+    """
+    Loads the screener.in company page once and extracts every requested section from it.
 
-        for i in range(header_line_index + 1, len(lines)):
-            line = lines[i].strip()
-            if line == '---|---|---|---|---|---|---|---|---|---|---|---|---|---|---':
-                start_parsing = True
+    Static sections come from a single plain HTTP fetch; sections marked `needs_js` come from
+    a single browser render. Each page is parsed into a DOM once and every section is read
+    from its element in that tree.
+    `max_age` maps section names to the oldest cached page (in seconds) that section will
+    accept; a page is re-fetched if any section that reads it needs fresher data.
+    """
+    section_names = list(section_names or COMPANY_SECTIONS)
+    max_age = max_age or {}
+    url = company_url(company_symbol)
+
+    sections = {}
+    for render_js in (False, True):
+        names = [name for name in section_names if COMPANY_SECTIONS[name].needs_js == render_js]
+        if not names:
+            continue
+        page_max_age = min(max_age.get(name, snapshot_cache.ttl) for name in names)
+        html = await fetch_company_page(company_symbol, page_max_age, render_js=render_js)
+        root = parse_html(html, url) if html else None
+        for section_name in names:
+            if root is None:
+                sections[section_name] = {"error": f"No {COMPANY_SECTIONS[section_name].label} found."}
                 continue
-            if start_parsing and line:
-                parts = [part.strip() for part in line.split('|')]
-                if parts and parts[0]:
-                    metric_name = parts[0]
-                    values = parts[1:] if len(parts) > 1 else []
-                    ratios_data[metric_name] = values
-        return ratios_data
-    except Exception as e:
-        print(f"Parsing error in ratios: {e}")
-        return None
+            sections[section_name] = extract_section(section_name, root, html, url)
+    return {name: sections[name] for name in section_names}
 
-async def fetch_ratios(company_symbol):
-    """Fetches and parses ratios data from screener.in."""
-    async with AsyncWebCrawler() as crawler:
-        config = CrawlerRunConfig(css_selector="#ratios", cache_mode=CacheMode.BYPASS)
-        result = await crawler.arun(
-            url=f"https://www.screener.in/company/{company_symbol}/",
-            config=config
-        )
-        if result.markdown:
-            parsed_json = parse_ratios(result.markdown)
-            if parsed_json:
-                return parsed_json
-            else:
-                return {"error": "Unable to parse ratios data", "plain_text": result.markdown}
-        else:
-            return {"error": "No ratios data found."}
-
-def parse_shareholding(markdown_text):
-    """Parses shareholding pattern markdown text into a JSON object."""
-    try:
-        lines = [line for line in markdown_text.strip().split('\n') if line.strip()]
-        if len(lines) < 5:
-            return None
+async def fetch_section(company_symbol, section_name):
+    """Fetches and parses a single section of the screener.in company page."""
+    sections = await fetch_company_sections(company_symbol, [section_name])
+    return sections[section_name]
 
-        quarterly_data = {}
-        yearly_data = {}
-        current_section = None
-
-        for i, line in enumerate(lines):
-            line = line.strip()
+async def get_embedding(text: str) -> Optional[List[float]]:
+    """
+    Get embedding vector from OpenAI, or None if it could not be fetched.
 
-            if "Quarterly" in line:
-                current_section = "Quarterly"
-                quarterly_data["Quarters"] = []
-                continue
-            elif "Yearly" in line:
-                current_section = "Yearly"
-                yearly_data["Years"] = []
-                continue
-            elif "---" in line:
-                continue
-            elif i > 2 and current_section == "Quarterly":
-                if not quarterly_data.get("Quarters"):
-                    quarterly_headers = [h.strip() for h in lines[i-1].split('|') if h.strip()]
-                    quarterly_data["Quarters"] = quarterly_headers
-                else:
-                    parts = [part.strip() for part in line.split('|')]
-                    if parts and parts[0]:
-                        metric_name = parts[0]
-                        values = parts[1:] if len(parts) > 1 else []
-                        quarterly_data[metric_name] = values
-            elif i > 7 and current_section == "Yearly":
-                if not yearly_data.get("Years"):
-                    yearly_headers = [h.strip() for h in lines[i-1].split('|') if h.strip()]
-                    yearly_data["Years"] = yearly_headers
-                else:
-                    parts = [part.strip() for part in line.split('|')]
-                    if parts and parts[0]:
-                        metric_name = parts[0]
-                        values = parts[1:] if len(parts) > 1 else []
-                        yearly_data[metric_name] = values
-
-        shareholding_data = {}
-        if quarterly_data:
-            shareholding_data["Quarterly Shareholding"] = quarterly_data
-        if yearly_data:
-            shareholding_data["Yearly Shareholding"] = yearly_data
-        return shareholding_data
-    except Exception as e:
-        print(f"Parsing error in shareholding: {e}")
-        return None
+    Concurrent calls (e.g. every section of every symbol in ingest_many) are batched into
+    multi-input requests by the shared EmbeddingBatcher, and text embedded before is served
+    from the persistent embedding cache.
+    """
+    return await embedding_batcher.embed(text)
 
-async def fetch_shareholding_pattern(company_symbol):
-    """Fetches and parses shareholding pattern data from screener.in."""
-    async with AsyncWebCrawler() as crawler:
-        config = CrawlerRunConfig(css_selector="#shareholding", cache_mode=CacheMode.BYPASS)
-        result = await crawler.arun(
-            url=f"https://www.screener.in/company/{company_symbol}/",
-            config=config
-        )
-        if result.markdown:
-            parsed_json = parse_shareholding(result.markdown)
-            if parsed_json:
-                return parsed_json
-            else:
-                return {"error": "Unable to parse shareholding data", "plain_text": result.markdown}
-        else:
-            return {"error": "No shareholding data found."}
-
-def parse_documents(markdown_text):
-    """Parses documents, EXCLUDING concalls, markdown text into a JSON object."""
-    try:
-        documents_data = {}
-        current_section = None
-        lines = markdown_text.strip().split('\n')
-
-        for line in lines:
-            line = line.strip()
-            if line.startswith("### Announcements"):
-                current_section = "Announcements"
-                documents_data[current_section] = []
-            elif line.startswith("### Annual reports"):
-                current_section = "Annual Reports"
-                documents_data[current_section] = []
-            elif line.startswith("### Credit ratings"):
-                current_section = "Credit Ratings"
-                documents_data[current_section] = []
-            elif line.startswith("### Concalls"):
-                current_section = "Concalls"
-                continue # Skip Concalls section
-
-            elif line.startswith("*"):
-                if current_section == "Credit Ratings":
-                    parts = line[1:].strip()
-                    link_match = parts.rsplit('](', 1)
-                    if len(link_match) == 2:
-                        text_part = link_match[0].strip()
-                        url_part = link_match[1].strip(')>')
-                        description = text_part
-                        documents_data[current_section].append({
-                            "description": description,
-                            "url": url_part
-                        })
-                elif current_section == "Announcements":
-                    parts = line[1:].strip()
-                    link_match = parts.rsplit('](', 1)
-                    if len(link_match) == 2:
-                        text_part = link_match[0].strip()
-                        url_part = link_match[1].strip(')>')
-                        date_match = re.search(r'^(.*?)\s*(\d+\s?\w+\s?\d{4}|\d+\s?\w+|\d+h)\s*-\s*(.*)$', text_part, re.IGNORECASE)
-                        if date_match:
-                            description_prefix = date_match.group(1).strip('- ').strip()
-                            date_info = date_match.group(2).strip()
-                            description_suffix = date_match.group(3).strip('- ').strip()
-                            description = (description_prefix + " - " + description_suffix).strip('- ').strip() if description_suffix else description_prefix
-                        else:
-                            description = text_part
-                            date_info = None
-                        documents_data[current_section].append({
-                            "description": description,
-                            "date": date_info,
-                            "url": url_part
-                        })
-                elif current_section == "Annual Reports":
-                    parts = line[1:].strip()
-                    link_match = parts.rsplit('](', 1)
-                    if len(link_match) == 2:
-                        text_part = link_match[0].strip()
-                        url_part = link_match[1].strip(')>')
-                        description_parts = text_part.rsplit('from', 1)
-                        if len(description_parts) == 2:
-                            description = description_parts[0].strip()
-                            source_info = description_parts[1].strip()
-                        else:
-                            description = text_part
-                            source_info = None
-                        documents_data[current_section].append({
-                            "description": description,
-                            "source": source_info,
-                            "url": url_part
-                        })
-        return documents_data
-    except Exception as e:
-        print(f"Parsing error in documents: {e}")
-        return None
+def set_chunk_writer(writer):
+    """Routes stored chunks to another writer with ChunkWriter's interface, e.g. bulk_load.BulkLoader."""
+    global chunk_writer
+    chunk_writer = writer
 
-async def fetch_documents(company_symbol):
-    """Fetches and parses documents data from screener.in (excluding concalls)."""
-    async with AsyncWebCrawler() as crawler:
-        config = CrawlerRunConfig(css_selector="#documents", cache_mode=CacheMode.BYPASS)
-        result = await crawler.arun(
-            url=f"https://www.screener.in/company/{company_symbol}/",
-            config=config
-        )
-        if result.markdown:
-            parsed_json = parse_documents(result.markdown)
-            if parsed_json:
-                return parsed_json
-            else:
-                return {"error": "Unable to parse documents data", "plain_text": result.markdown}
-        else:
-            return {"error": "No documents data found."}
-
-def parse_concalls(markdown_text):
-    """Parses concalls markdown text into a JSON object."""
-    concalls_data = []
-    entries = markdown_text.split('* ') # Split by each concall entry
-    for entry in entries:
-        entry = entry.strip()
-        if not entry or entry.startswith("### Concalls") or entry.startswith("Add Missing"):
-            continue
+async def insert_chunk(chunk: ProcessedChunk) -> WriteResult:
+    """
+    Insert (or replace) a processed chunk in Supabase.
 
-        lines = entry.split('\n')
-        date = lines[0].strip()
-
-        concall_entry = {"Date": date}
-        for line in lines[1:]:
-            line = line.strip()
-            if line.startswith("[ Transcript ]"):
-                transcript_match = re.search(r'\[ Transcript \] ?\((.*?)\)', line)
-                if transcript_match:
-                    url_with_prefix = transcript_match.group(1)
-                    url = url_with_prefix.split("<")[-1].split(">")[0] if "<" in url_with_prefix else url_with_prefix
-                    concall_entry["Transcript"] = url.strip('"')
-            elif line.startswith("Notes"):
-                concall_entry["Notes"] = True # Simply mark presence of notes
-            elif line.startswith("[ PPT ]"):
-                ppt_match = re.search(r'\[ PPT \] ?\((.*?)\)', line)
-                if ppt_match:
-                    url_with_prefix = ppt_match.group(1)
-                    url = url_with_prefix.split("<")[-1].split(">")[0] if "<" in url_with_prefix else url_with_prefix
-                    concall_entry["PPT"] = url.strip('"')
-            elif line.startswith("[ REC ]"):
-                rec_match = re.search(r'\[ REC \] ?\((.*?)\)', line)
-                if rec_match:
-                    url_with_prefix = rec_match.group(1)
-                    url = url_with_prefix.split("<")[-1].split(">")[0] if "<" in url_with_prefix else url_with_prefix
-                    concall_entry["REC"] = url.strip('"')
-        concalls_data.append(concall_entry)
-    return concalls_data
+    The row goes through the shared ChunkWriter, which upserts it together with other
+    concurrently stored chunks; the returned WriteResult says whether this row was written.
+    """
+    data = {
+        "url": chunk.url,
+        "chunk_number": chunk.chunk_number,
+        "title": chunk.title,
+        "summary": chunk.summary,
+        "content": chunk.content,
+        "metadata": chunk.metadata,
+        "embedding": chunk.embedding
+    }
+    result = await chunk_writer.write(data)
+    if result.ok:
+        print(f"Stored chunk {chunk.chunk_number} for {chunk.url} - {chunk.title}")
+    else:
+        print(f"Error storing chunk {chunk.chunk_number} for {chunk.url}: {result.error}")
+    return result
+
+def section_url(company_symbol, section_name):
+    """Returns the stored chunk URL of a section: the screener URL with the section as fragment."""
+    return f"{company_url(company_symbol)}#{section_name}"
+
+def section_hash(section_data):
+    """Hashes the canonical JSON of a section, so key order and whitespace don't count as changes."""
+    return content_hash(json.dumps(section_data, sort_keys=True, separators=(",", ":")))
+
+async def fetch_stored_hashes(company_symbol):
+    """
+    Returns {chunk url: content hash} for the sections already stored for a symbol.
 
-async def fetch_concalls(company_symbol):
-    """Fetches and parses concalls data from screener.in and returns structured JSON."""
-    async with AsyncWebCrawler() as crawler:
-        config = CrawlerRunConfig(css_selector=".concalls", cache_mode=CacheMode.BYPASS)
-        result = await crawler.arun(
-            url=f"https://www.screener.in/company/{company_symbol}/",
-            config=config
-        )
-        if result.markdown:
-            parsed_json = parse_concalls(result.markdown) # Parse markdown here
-            if parsed_json:
-                return parsed_json
-            else:
-                return {"error": "Unable to parse concalls data", "plain_text": result.markdown}
-        else:
-            return {"error": "No concalls data found."}
-
-async def get_embedding(text: str) -> List[float]:
-    """Get embedding vector from OpenAI."""
+    A section only counts as stored if all of its chunks are there and carry the same hash;
+    one left incomplete by a failed write gets no hash, so the next ingest stores it again.
+    """
     try:
-        response = await openai_client.embeddings.create(
-            model="text-embedding-3-small", # Using small embedding model for cost efficiency
-            input=text
-        )
-        return response.data[0].embedding
+        supabase = await get_supabase()
+        result = await supabase.table("stock_info") \
+            .select("url, content_hash:metadata->>content_hash, chunk_count:metadata->>chunk_count") \
+            .like("url", f"{company_url(company_symbol)}#%") \
+            .execute()
+        sections = {}
+        for row in result.data:
+            sections.setdefault(row["url"], []).append(row)
+        stored = {}
+        for url, rows in sections.items():
+            hashes = {row["content_hash"] for row in rows}
+            chunk_counts = {row["chunk_count"] for row in rows}
+            if len(hashes) == 1 and chunk_counts == {str(len(rows))}:
+                stored[url] = hashes.pop()
+        return stored
     except Exception as e:
-        print(f"Error getting embedding: {e}")
-        return [0] * 1536  # Return zero vector on error, adjust dimension if needed
+        print(f"Error fetching stored hashes for {company_symbol}: {e}")
+        return {}
 
-async def insert_chunk(chunk: ProcessedChunk):
-    """Insert a processed chunk into Supabase."""
+async def delete_stale_chunks(url, chunk_count):
+    """Deletes chunks of `url` numbered above `chunk_count`, left over from a longer earlier version."""
     try:
-        data = {
-            "url": chunk.url,
-            "chunk_number": chunk.chunk_number,
-            "title": chunk.title,
-            "summary": chunk.summary,
-            "content": chunk.content,
-            "metadata": chunk.metadata,
-            "embedding": chunk.embedding
-        }
-
-        result = supabase.table("stock_info").insert(data).execute() # Changed table name to "stock_info"
-        print(f"Inserted chunk {chunk.chunk_number} for {chunk.url} - {chunk.title}") # Added title to print output
-        return result
+        supabase = await get_supabase()
+        await supabase.table("stock_info").delete().eq("url", url).gt("chunk_number", chunk_count).execute()
     except Exception as e:
-        print(f"Error inserting chunk: {e}")
-        return None
+        print(f"Error deleting stale chunks of {url}: {e}")
 
-async def process_and_store_chunk(company_symbol, section_name, section_data, chunk_number):
-    """Process a single data section and store it as a chunk."""
+async def process_and_store_section(company_symbol, section_name, section_data, stored_hash=None):
+    """
+    Process a single data section and store it as one or more chunks.
+
+    The section is split by chunk_section into pieces that fit the embedding model (each
+    repeating its header context), numbered 1..n under the section's URL. Sections whose
+    canonical JSON hashes to `stored_hash` are unchanged since the last ingest and are
+    skipped before any embedding or database work.
+    """
     if not section_data or "error" in section_data:
         print(f"Skipping {section_name} due to missing or error data.")
         return None
 
-    content_string = json.dumps(section_data) # Convert JSON data to string for content and embedding
+    data_hash = section_hash(section_data)
+    if data_hash == stored_hash:
+        print(f"Skipping {section_name} for {company_symbol}: unchanged since last ingest.")
+        return None
+
+    url = section_url(company_symbol, section_name) # Screener URL with the section name appended for uniqueness
+    title = section_name.replace('_', ' ').title() # Title case, e.g., "Basic Data"
+    contents = chunk_section(company_symbol, section_name, section_data)
 
-    # Generate embedding for the JSON string content
-    embedding = await get_embedding(content_string)
+    # Generate embeddings for every chunk; concurrent calls are batched into one request
+    embeddings = await asyncio.gather(*(get_embedding(content) for content in contents))
+    if any(embedding is None for embedding in embeddings):
+        # Storing the section now would record its hash and skip it on every later run
+        print(f"Skipping {section_name} for {company_symbol}: embedding failed, will retry on the next ingest.")
+        return None
+
+    fetched_at = datetime.now(timezone.utc).isoformat()
+    chunks = []
+    for chunk_number, (content, embedding) in enumerate(zip(contents, embeddings), start=1):
+        # Create metadata; content_hash is the whole section's, for change detection
+        metadata = {
+            "source": "screener.in",
+            "data_type": "stock_data",
+            "company_symbol": company_symbol,
+            "section_name": section_name,
+            "fetched_at": fetched_at,
+            "content_hash": data_hash,
+            "chunk_count": len(contents),
+        }
+        chunks.append(ProcessedChunk(
+            url=url,
+            chunk_number=chunk_number,
+            title=f"{title} - Part {chunk_number}/{len(contents)}" if len(contents) > 1 else title,
+            summary=f"Data chunk for {section_name} of {company_symbol}", # Basic summary, can be improved with LLM if needed
+            content=content,
+            metadata=metadata,
+            embedding=embedding
+        ))
+    # Insert chunks into database; they are written together in the chunk writer's next upsert
+    results = await asyncio.gather(*(insert_chunk(chunk) for chunk in chunks))
+    await delete_stale_chunks(url, len(contents))
+    return results
+
+def store_normalized(companies):
+    """Normalizes many companies' parsed sections in one pass and buffers the rows for the Parquet dataset."""
+    normalized = normalize_batch(companies)
+    financials_store.add(normalized)
+    return normalized
+
+async def ingest_symbol(company_symbol, exchange=None, max_age=None, force=False, section_names=None, normalize=True):
+    """
+    Fetches sections for a screener.in symbol, then embeds and stores the changed ones.
 
-    # Create metadata
-    metadata = {
-        "source": "screener.in",
-        "data_type": "stock_data",
-        "company_symbol": company_symbol,
-        "section_name": section_name,
-        "fetched_at": datetime.now(timezone.utc).isoformat(),
+    `section_names` limits the refresh to some sections (default: all of them). With `force`,
+    every section is re-embedded and stored even if unchanged. Without `normalize`, the
+    sections are left for the caller to normalize (ingest_many does a whole batch at once)
+    and the result has no "normalized" entry.
+    """
+    # Fetch all sections from a single load of the company page
+    company_data_sections = await fetch_company_sections(company_symbol, section_names, max_age=max_age)
+    stored_hashes = {} if force else await fetch_stored_hashes(company_symbol)
+
+    # Process and store chunks; sections are independent so they are embedded concurrently
+    await asyncio.gather(*(
+        process_and_store_section(
+            company_symbol, section_name, section_data,
+            stored_hash=stored_hashes.get(section_url(company_symbol, section_name))
+        )
+        for section_name, section_data in company_data_sections.items()
+    ))
+
+    result = {
+        "symbol": company_symbol,
+        "exchange": exchange,
+        "url": company_url(company_symbol),
+        "data": company_data_sections,
     }
+    if normalize:
+        # Mirror the typed time series into the Parquet dataset for cross-company analysis
+        normalized = await asyncio.to_thread(store_normalized, {company_symbol: company_data_sections})
+        result["normalized"] = frame_to_json(normalized)
+    return result
+
+async def ingest_many(symbols, max_concurrency=INGEST_CONCURRENCY, max_age=None, force=False,
+                      normalize_group_size=NORMALIZE_GROUP_SIZE):
+    """
+    Ingests many screener.in symbols at once, at most `max_concurrency` at a time.
 
-    # Construct URL - using screener URL and appending section name for uniqueness
-    base_url = f"https://www.screener.in/company/{company_symbol}/"
-    chunk_url = f"{base_url}#{section_name}"
-
-    # Create ProcessedChunk object - Removed summary as per request, kept title
-    processed_chunk = ProcessedChunk(
-        url=chunk_url,
-        chunk_number=chunk_number,
-        title=section_name.replace('_', ' ').title(), # Title case, e.g., "Basic Data"
-        summary=f"Data chunk for {section_name} of {company_symbol}", # Basic summary, can be improved with LLM if needed
-        content=content_string, # Store JSON string as content
-        metadata=metadata,
-        embedding=embedding
-    )
-    return await insert_chunk(processed_chunk) # Insert chunk into database
+    This is an async generator: each symbol's result is yielded as soon as that symbol
+    finishes, in completion order. A symbol that raises yields {"symbol", "error"} instead
+    of aborting the rest of the batch.
 
-async def main(user_input=None):
+    Finished symbols' sections are normalized together every `normalize_group_size` symbols
+    (and once more for the remainder when the batch ends), in a worker thread, and handed to
+    the Parquet store, which writes them out on its own row and time limits; the yielded
+    results have no "normalized" entry.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def ingest_bounded(company_symbol):
+        async with semaphore:
+            try:
+                return await ingest_symbol(company_symbol, max_age=max_age, force=force, normalize=False)
+            except Exception as e:
+                print(f"Error ingesting {company_symbol}: {e}")
+                return {"symbol": company_symbol, "error": str(e)}
+
+    completed = {}
+    tasks = [asyncio.create_task(ingest_bounded(symbol)) for symbol in symbols]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            result = await next_done
+            if "data" in result:
+                completed[result["symbol"]] = result["data"]
+                if len(completed) >= normalize_group_size:
+                    group, completed = completed, {}
+                    await asyncio.to_thread(store_normalized, group)
+            yield result
+    finally:
+        for task in tasks:
+            task.cancel()
+        await chunk_writer.flush()
+        await asyncio.to_thread(store_normalized, completed)
+        await asyncio.to_thread(financials_store.flush)
+
+@asynccontextmanager
+async def ingestion_clients():
+    """
+    Flushes pending writes and closes every shared ingestion client on exit, even if ingestion
+    failed. Every entry point (this CLI, refresh_scheduler, document_ingest, bulk_load) runs inside it.
+    """
+    try:
+        yield
+    finally:
+        await chunk_writer.flush()
+        financials_store.flush()
+        await close_crawler_pool()
+        await close_http_client()
+        await close_embedding_cache()
+        await close_supabase()
+
+def choose_candidate(candidates):
+    """Asks which of several matching listings was meant; returns None if no valid choice is made."""
+    for number, candidate in enumerate(candidates, start=1):
+        print(f"{number}. {candidate['name']} ({candidate['exchange']}: {candidate['stock_name']})")
+    choice = input("Choose a company by number: ").strip()
+    if choice.isdigit() and 1 <= int(choice) <= len(candidates):
+        return candidates[int(choice) - 1]
+    print("No company chosen.")
+    return None
+
+async def main(user_input=None, max_age=None, force=False):
     if user_input is None:
         user_input = input("Enter a stock symbol or company name: ")
         
     stock_info = await find_stock_symbol(user_input)
+    if stock_info and "candidates" in stock_info:
+        stock_info = choose_candidate(stock_info["candidates"])
 
     if stock_info:
         company_symbol = stock_info["stock_name"].replace(" ", "").upper()
-        screener_url = f"https://www.screener.in/company/{company_symbol}/"
-
-        # Fetch data from different sections
-        company_data_sections = {
-            "basic_data": await fetch_basic_data(company_symbol),
-            "quarterly_results": await fetch_quarterly_results(company_symbol),
-            "balance_sheet": await fetch_balance_sheet(company_symbol),
-            "peer_comparison": await fetch_peer_comparison(company_symbol),
-            "profit_loss": await fetch_profit_loss(company_symbol),
-            "cash_flow": await fetch_cash_flow(company_symbol),
-            "ratios": await fetch_ratios(company_symbol),
-            "shareholding_pattern": await fetch_shareholding_pattern(company_symbol),
-            "documents": await fetch_documents(company_symbol),
-            "concalls": await fetch_concalls(company_symbol),
-        }
-
-        # Process and store chunks
-        chunk_number = 1
-        for section_name, section_data in company_data_sections.items():
-            await process_and_store_chunk(company_symbol, section_name, section_data, chunk_number)
-            chunk_number += 1
-
-        return {
-            "symbol": company_symbol,
-            "exchange": stock_info["exchange"],
-            "url": screener_url,
-            "data": company_data_sections
-        }
+        return await ingest_symbol(company_symbol, exchange=stock_info["exchange"], max_age=max_age, force=force)
 
     return None
 
+async def run_cli():
+    parser = argparse.ArgumentParser(description="Scrape a company from screener.in and store it in Supabase.")
+    parser.add_argument("user_input", nargs="?", help="Stock symbol or company name (prompted for if omitted)")
+    parser.add_argument(
+        "--max-age", action="append", default=[], metavar="[SECTION=]SECONDS",
+        help="Reuse a cached company page younger than SECONDS, for all sections or just SECTION (repeatable)"
+    )
+    parser.add_argument("--force", action="store_true", help="Re-embed and store sections even if unchanged")
+    archive_group = parser.add_mutually_exclusive_group()
+    archive_group.add_argument("--record", metavar="ARCHIVE", help="Save every fetched page to this page archive")
+    archive_group.add_argument("--replay", metavar="ARCHIVE", help="Read pages from this page archive instead of the network")
+    args = parser.parse_args()
+    if args.record:
+        configure_archive("record", args.record)
+    elif args.replay:
+        configure_archive("replay", args.replay)
+    try:
+        max_age = parse_max_age(args.max_age)
+    except ValueError as e:
+        parser.error(f"--max-age: {e}")
+    async with ingestion_clients():
+        await main(args.user_input, max_age=max_age, force=args.force)
+
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(run_cli())
\ No newline at end of file
@@ -0,0 +1,124 @@
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Optional
+
+from crawl4ai import AsyncWebCrawler, BrowserConfig
+
+CRAWLER_POOL_SIZE = int(os.environ.get("CRAWLER_POOL_SIZE", "4"))
+CRAWLER_MAX_PAGES = int(os.environ.get("CRAWLER_MAX_PAGES", "200"))
+
+
+@dataclass
+class PooledCrawler:
+    crawler: AsyncWebCrawler
+    pages: int = 0
+
+
+def is_healthy(crawler: AsyncWebCrawler) -> bool:
+    """Checks that the crawler is started and its browser is still connected."""
+    if not getattr(crawler, "ready", True):
+        return False
+    browser_manager = getattr(crawler.crawler_strategy, "browser_manager", None)
+    browser = getattr(browser_manager, "browser", None)
+    return browser is None or browser.is_connected()
+
+
+class CrawlerPool:
+    """
+    A fixed-size pool of long-lived AsyncWebCrawler instances.
+
+    Callers borrow a warm crawler with `async with pool.crawler() as crawler:` and give it
+    back when the block exits. A crawler is recycled (closed and relaunched on next use)
+    once it has served `max_pages` borrows or fails its health check, which keeps Chromium
+    memory growth bounded on long ingestion runs.
+    """
+
+    def __init__(self, size: int = CRAWLER_POOL_SIZE, max_pages: int = CRAWLER_MAX_PAGES,
+                 browser_config: Optional[BrowserConfig] = None):
+        self.size = size
+        self.max_pages = max_pages
+        self.browser_config = browser_config
+        self._idle: asyncio.Queue = asyncio.Queue()
+        self._slots = asyncio.Semaphore(size)
+        self._live = set()
+        self._closed = False
+
+    async def start(self):
+        """Launches every slot up front so the first fetches don't pay browser startup."""
+        missing = self.size - len(self._live)
+        launched = await asyncio.gather(*(self._launch() for _ in range(missing)))
+        for pooled in launched:
+            self._idle.put_nowait(pooled)
+
+    async def close(self):
+        """Closes every crawler owned by the pool."""
+        self._closed = True
+        while not self._idle.empty():
+            self._idle.get_nowait()
+        for pooled in list(self._live):
+            await self._retire(pooled)
+
+    async def _launch(self) -> PooledCrawler:
+        crawler = AsyncWebCrawler(config=self.browser_config) if self.browser_config else AsyncWebCrawler()
+        await crawler.start()
+        pooled = PooledCrawler(crawler)
+        self._live.add(pooled)
+        return pooled
+
+    async def _retire(self, pooled: PooledCrawler):
+        self._live.discard(pooled)
+        try:
+            await pooled.crawler.close()
+        except Exception as e:
+            print(f"Error closing crawler: {e}")
+
+    async def _checkout(self) -> PooledCrawler:
+        while not self._idle.empty():
+            pooled = self._idle.get_nowait()
+            if is_healthy(pooled.crawler):
+                return pooled
+            await self._retire(pooled)
+        return await self._launch()
+
+    async def _checkin(self, pooled: PooledCrawler):
+        pooled.pages += 1
+        if self._closed or pooled.pages >= self.max_pages or not is_healthy(pooled.crawler):
+            await self._retire(pooled)
+        else:
+            self._idle.put_nowait(pooled)
+
+    @asynccontextmanager
+    async def crawler(self):
+        """Borrows a warm crawler from the pool for the duration of the block."""
+        if self._closed:
+            raise RuntimeError("Crawler pool is closed")
+        await self._slots.acquire()
+        try:
+            pooled = await self._checkout()
+            try:
+                yield pooled.crawler
+            finally:
+                await self._checkin(pooled)
+        finally:
+            self._slots.release()
+
+
+_default_pool: Optional[CrawlerPool] = None
+
+
+def get_crawler_pool() -> CrawlerPool:
+    """Returns the process-wide crawler pool, creating it on first use."""
+    global _default_pool
+    if _default_pool is None or _default_pool._closed:
+        _default_pool = CrawlerPool()
+    return _default_pool
+
+
+async def close_crawler_pool():
+    """Closes the process-wide crawler pool, if one was created."""
+    global _default_pool
+    if _default_pool is not None:
+        await _default_pool.close()
+        _default_pool = None
@@ -0,0 +1,30 @@
+import asyncio
+import os
+from typing import Optional
+
+from supabase import AsyncClient, acreate_client
+
+_client: Optional[AsyncClient] = None
+_lock = asyncio.Lock()
+
+
+async def get_supabase() -> AsyncClient:
+    """
+    Returns the process-wide async Supabase client, creating it on first use.
+
+    Queries on it are awaited instead of blocking the event loop, and all of them share the
+    client's single keep-alive HTTP connection pool to PostgREST.
+    """
+    global _client
+    async with _lock:
+        if _client is None:
+            _client = await acreate_client(os.environ.get("SUPABASE_URL"), os.environ.get("SUPABASE_SERVICE_KEY"))
+    return _client
+
+
+async def close_supabase():
+    """Closes the process-wide Supabase client's HTTP connections, if one was created."""
+    global _client
+    if _client is not None:
+        await _client.postgrest.aclose()
+        _client = None
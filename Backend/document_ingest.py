@@ -0,0 +1,284 @@
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import psutil
+
+from crawl_main import (
+    ProcessedChunk, get_embedding, insert_chunk, delete_stale_chunks, ingest_symbol, content_hash,
+    ingestion_clients,
+)
+from chunk_writer import WriteResult
+from db import get_supabase
+from document_store import get_document_store, close_document_store
+from pdf_text import count_pages, extract_pages
+from chunking import chunk_text
+
+DOCUMENT_WORKERS = int(os.environ.get("DOCUMENT_WORKERS", str(max(1, (os.cpu_count() or 2) - 1))))
+DOCUMENT_CONCURRENCY = int(os.environ.get("DOCUMENT_CONCURRENCY", "4"))
+DOCUMENT_PAGE_BATCH = int(os.environ.get("DOCUMENT_PAGE_BATCH", "20"))
+DOCUMENT_MAX_BYTES = int(os.environ.get("DOCUMENT_MAX_BYTES", str(100 * 1024 * 1024)))
+DOCUMENT_MIN_FREE_MB = int(os.environ.get("DOCUMENT_MIN_FREE_MB", "512"))
+
+# Worker processes are replaced after this many extraction tasks, returning whatever
+# memory pypdf's object cache grew to on a large report
+WORKER_TASKS_PER_CHILD = 50
+
+# Linked documents that are only downloaded, not embedded, by their section heading
+DOWNLOAD_ONLY_DOCUMENTS = {"Announcements": "Announcement", "Credit Ratings": "Credit Rating"}
+
+
+@dataclass
+class DocumentLink:
+    symbol: str
+    url: str
+    section_name: str  # "concalls" or "documents"
+    document_type: str  # "Transcript", "PPT", "Annual Report", "Announcement" or "Credit Rating"
+    label: str  # Concall date or document description
+
+
+def document_links(company_symbol: str, sections: Dict[str, Any], download_only: bool = False) -> List[DocumentLink]:
+    """
+    Collects the transcript, PPT and annual report URLs from parsed concalls and documents.
+    With `download_only`, announcement and credit rating links are included too.
+    """
+    links = []
+    for concall in sections.get("concalls") or []:
+        for document_type in ("Transcript", "PPT"):
+            if concall.get(document_type):
+                links.append(DocumentLink(company_symbol, concall[document_type], "concalls",
+                                          document_type, concall.get("Date", "")))
+    documents = sections.get("documents")
+    if isinstance(documents, dict):
+        for report in documents.get("Annual Reports", []):
+            if report.get("url"):
+                links.append(DocumentLink(company_symbol, report["url"], "documents",
+                                          "Annual Report", report.get("description", "")))
+        if download_only:
+            for heading, document_type in DOWNLOAD_ONLY_DOCUMENTS.items():
+                for entry in documents.get(heading, []):
+                    if entry.get("url"):
+                        links.append(DocumentLink(company_symbol, entry["url"], "documents",
+                                                  document_type, entry.get("description", "")))
+    return links
+
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def get_pdf_executor() -> ProcessPoolExecutor:
+    """Returns the process-wide PDF extraction pool, creating it on first use."""
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=DOCUMENT_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+            max_tasks_per_child=WORKER_TASKS_PER_CHILD,
+        )
+    return _executor
+
+
+def close_pdf_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(cancel_futures=True)
+        _executor = None
+
+
+async def wait_for_memory():
+    """Holds off starting more extraction work while the machine is low on free memory."""
+    while psutil.virtual_memory().available < DOCUMENT_MIN_FREE_MB * 1024 * 1024:
+        await asyncio.sleep(1)
+
+
+async def fetch_ingested_hash(url: str) -> Optional[str]:
+    """Returns the content hash of the document last ingested completely from `url`, if any."""
+    try:
+        supabase = await get_supabase()
+        result = await supabase.table("stock_info") \
+            .select("document_hash:metadata->>document_hash") \
+            .eq("url", url) \
+            .eq("chunk_number", 1) \
+            .execute()
+        return result.data[0]["document_hash"] if result.data else None
+    except Exception as e:
+        print(f"Error fetching the ingested hash of {url}: {e}")
+        return None
+
+
+async def store_document_chunk(link: DocumentLink, chunk_number: int, content: str, pages: str,
+                               document_hash: Optional[str] = None) -> WriteResult:
+    embedding = await get_embedding(content)
+    if embedding is None:
+        return WriteResult(link.url, chunk_number, False, "embedding failed")
+    metadata = {
+        "source": link.url,
+        "data_type": "document",
+        "company_symbol": link.symbol,
+        "section_name": link.section_name,
+        "document_type": link.document_type,
+        "document_label": link.label,
+        "pages": pages,
+        "fetched_at": datetime.now(timezone.utc).isoformat(),
+        "content_hash": content_hash(content),
+    }
+    if document_hash:
+        metadata["document_hash"] = document_hash
+    return await insert_chunk(ProcessedChunk(
+        url=link.url,
+        chunk_number=chunk_number,
+        title=f"{link.document_type} - {link.label}" if link.label else link.document_type,
+        summary=f"{link.document_type} of {link.symbol}, pages {pages}",
+        content=content,
+        metadata=metadata,
+        embedding=embedding,
+    ))
+
+
+def is_pdf(path: str) -> bool:
+    with open(path, "rb") as f:
+        return f.read(4) == b"%PDF"
+
+
+async def ingest_document(link: DocumentLink, force: bool = False) -> int:
+    """
+    Downloads one PDF and embeds and stores its text. Returns the number of chunks stored.
+
+    The PDF comes from the document store, so an unchanged document isn't re-downloaded.
+    Chunk 1 records the hash of the PDF it was made from and is written last, only once every
+    other chunk was stored, so a document whose hash matches it was ingested completely and
+    is not re-embedded (unless `force`). A download-only refresh or a run that failed part
+    way leaves the document to be embedded next time.
+
+    Text is extracted in the process pool DOCUMENT_PAGE_BATCH pages at a time, and each
+    window is chunked and stored before the next is extracted, so memory stays flat however
+    long the report is.
+    """
+    download = await get_document_store().fetch(link.url, max_bytes=DOCUMENT_MAX_BYTES, force=force)
+    if download is None:
+        return 0
+    if not force and download.content_hash == await fetch_ingested_hash(link.url):
+        print(f"Skipping {link.document_type} {link.url}: unchanged since last ingest.")
+        return 0
+    if not is_pdf(download.path):
+        print(f"Skipping {link.url}: not a PDF")
+        return 0
+
+    loop = asyncio.get_running_loop()
+    executor = get_pdf_executor()
+    try:
+        page_count = await loop.run_in_executor(executor, count_pages, download.path)
+    except Exception as e:
+        print(f"Error reading {link.url}: {e}")
+        return 0
+
+    chunk_number = 0
+    first_chunk = None
+    failures = 0
+    for start in range(0, page_count, DOCUMENT_PAGE_BATCH):
+        stop = min(start + DOCUMENT_PAGE_BATCH, page_count)
+        await wait_for_memory()
+        try:
+            texts = await loop.run_in_executor(executor, extract_pages, download.path, start, stop)
+        except Exception as e:
+            print(f"Error extracting pages {start + 1}-{stop} of {link.url}: {e}")
+            failures += 1
+            continue
+        chunks = chunk_text("\n\n".join(texts))
+        pages = f"{start + 1}-{stop}"
+        if chunk_number == 0 and chunks:
+            first_chunk = (chunks[0], pages)
+        results = await asyncio.gather(*(
+            store_document_chunk(link, chunk_number + i + 1, chunk, pages)
+            for i, chunk in enumerate(chunks) if chunk_number + i > 0
+        ))
+        failures += sum(not result.ok for result in results)
+        chunk_number += len(chunks)
+    if first_chunk:
+        await store_document_chunk(link, 1, *first_chunk,
+                                   document_hash=None if failures else download.content_hash)
+    if not failures:
+        # A shorter new version of the document leaves the old version's higher-numbered chunks behind
+        await delete_stale_chunks(link.url, chunk_number)
+    print(f"Stored {chunk_number} chunks from {link.document_type} {link.url} ({page_count} pages)")
+    return chunk_number
+
+
+async def ingest_documents(company_symbol: str, sections: Dict[str, Any],
+                           max_concurrency: int = DOCUMENT_CONCURRENCY, force: bool = False) -> Dict[str, int]:
+    """Ingests every transcript, PPT and annual report linked from a company's parsed sections."""
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def ingest_bounded(link):
+        async with semaphore:
+            try:
+                return await ingest_document(link, force=force)
+            except Exception as e:
+                print(f"Error ingesting document {link.url}: {e}")
+                return 0
+
+    links = document_links(company_symbol, sections)
+    counts = await asyncio.gather(*(ingest_bounded(link) for link in links))
+    return {link.url: count for link, count in zip(links, counts)}
+
+
+async def refresh_documents(company_symbol: str, sections: Dict[str, Any],
+                            max_concurrency: int = DOCUMENT_CONCURRENCY) -> Dict[str, int]:
+    """
+    Brings the local copy of every document linked from a company's sections up to date,
+    without embedding. Returns {url: bytes transferred}; unchanged documents transfer 0.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def fetch_bounded(link):
+        async with semaphore:
+            try:
+                download = await get_document_store().fetch(link.url)
+            except Exception as e:
+                print(f"Error downloading document {link.url}: {e}")
+                return 0
+            return download.bytes_transferred if download else 0
+
+    links = document_links(company_symbol, sections, download_only=True)
+    transferred = await asyncio.gather(*(fetch_bounded(link) for link in links))
+    return {link.url: count for link, count in zip(links, transferred)}
+
+
+async def run_cli():
+    parser = argparse.ArgumentParser(description="Ingest concall transcripts and annual reports for screener.in symbols.")
+    parser.add_argument("symbols", nargs="*", help="screener.in symbols")
+    parser.add_argument("--watchlist", metavar="FILE", help="Also read symbols (one per line) from FILE")
+    parser.add_argument("--download-only", action="store_true",
+                        help="Only refresh the local copies of all linked documents, without embedding")
+    parser.add_argument("--force", action="store_true", help="Re-download and re-embed documents even if unchanged")
+    args = parser.parse_args()
+    symbols = list(args.symbols)
+    if args.watchlist:
+        with open(args.watchlist) as f:
+            symbols.extend(line.strip() for line in f if line.strip())
+    if not symbols:
+        parser.error("no symbols given")
+    async with ingestion_clients():
+        try:
+            for symbol in symbols:
+                result = await ingest_symbol(symbol.upper(), section_names=["documents", "concalls"])
+                if args.download_only:
+                    transferred = await refresh_documents(symbol.upper(), result["data"])
+                    print(f"{symbol.upper()}: {sum(1 for n in transferred.values() if n)} of {len(transferred)} "
+                          f"documents re-downloaded, {sum(transferred.values())} bytes transferred")
+                else:
+                    counts = await ingest_documents(symbol.upper(), result["data"], force=args.force)
+                    print(json.dumps({"symbol": symbol.upper(), "chunks": counts}, indent=2))
+        finally:
+            close_pdf_executor()
+            await close_document_store()
+
+
+if __name__ == "__main__":
+    asyncio.run(run_cli())
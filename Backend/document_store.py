@@ -0,0 +1,241 @@
+import asyncio
+import json
+import os
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+import httpx
+import xxhash
+
+from http_fetch import DEFAULT_HEADERS, HTTP_TIMEOUT
+from snapshot_cache import write_atomic
+
+DOCUMENT_DIR = os.environ.get("DOCUMENT_DIR", ".documents")
+DOWNLOAD_CONNECTIONS_PER_HOST = int(os.environ.get("DOWNLOAD_CONNECTIONS_PER_HOST", "4"))
+
+DOWNLOAD_CHUNK_BYTES = 64 * 1024
+HASH_CHUNK_BYTES = 1024 * 1024
+
+
+@dataclass
+class Download:
+    url: str
+    path: str  # Blob holding the document's current content
+    content_hash: str
+    size: int
+    changed: bool  # False when the server or the content hash says nothing changed since the last fetch
+    bytes_transferred: int
+
+
+def file_hash(path: str) -> str:
+    """Returns the xxh3-128 hex digest of a file, read in blocks."""
+    hasher = xxhash.xxh3_128()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_CHUNK_BYTES), b""):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+
+def _read_json(path: str) -> Optional[dict]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+class DocumentStore:
+    """
+    Downloads linked documents (filings, annual reports, transcripts) into a local,
+    content-addressed store and only transfers what changed.
+
+    Layout under `root`:
+        index/<url hash>.json      -> {"url", "etag", "last_modified", "content_hash", "size", "fetched_at"}
+        blobs/<hh>/<hash>           -> document body, stored once per distinct content hash
+        partial/<url hash>.part     -> an interrupted download, resumed with a Range request
+        partial/<url hash>.json     -> the validators the partial body was fetched under
+
+    A URL fetched before is re-requested with If-None-Match / If-Modified-Since, so an
+    unchanged document costs one 304. A partial download is resumed with Range + If-Range,
+    falling back to a full download if the server sends the whole file. Bodies are requested
+    without content coding, so resume offsets count the same bytes that are on disk. Each host gets its
+    own keep-alive connection pool, since a watchlist's documents come from a handful of
+    exchange and rating-agency hosts.
+    """
+
+    def __init__(self, root: str = DOCUMENT_DIR, connections_per_host: int = DOWNLOAD_CONNECTIONS_PER_HOST,
+                 transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.root = root
+        self.connections_per_host = connections_per_host
+        self.transport = transport  # Replaces the network for every host (tests use httpx.MockTransport)
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._lock_users: Dict[str, int] = {}
+
+    def _index_path(self, url: str) -> str:
+        return os.path.join(self.root, "index", f"{xxhash.xxh64_hexdigest(url)}.json")
+
+    def _partial_path(self, url: str) -> str:
+        return os.path.join(self.root, "partial", f"{xxhash.xxh64_hexdigest(url)}.part")
+
+    def blob_path(self, digest: str) -> str:
+        return os.path.join(self.root, "blobs", digest[:2], digest)
+
+    def client(self, url: str) -> httpx.AsyncClient:
+        """Returns the keep-alive client for the URL's host, creating it on first use."""
+        host = urlparse(url).netloc
+        client = self._clients.get(host)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                headers={**DEFAULT_HEADERS, "Accept": "*/*", "Accept-Encoding": "identity"},
+                timeout=HTTP_TIMEOUT,
+                follow_redirects=True,
+                http2=True,
+                transport=self.transport,
+                limits=httpx.Limits(
+                    max_connections=self.connections_per_host,
+                    max_keepalive_connections=self.connections_per_host,
+                ),
+            )
+            self._clients[host] = client
+        return client
+
+    def lookup(self, url: str) -> Optional[dict]:
+        """Returns the index entry of the last completed download of `url`, if its blob still exists."""
+        entry = _read_json(self._index_path(url))
+        if not entry or entry.get("url") != url or not os.path.exists(self.blob_path(entry["content_hash"])):
+            return None
+        return entry
+
+    async def fetch(self, url: str, max_bytes: Optional[int] = None, force: bool = False) -> Optional[Download]:
+        """
+        Brings the stored copy of `url` up to date. Returns None if the download failed
+        (a partial body is kept for the next attempt) or exceeded `max_bytes`.
+        With `force`, conditional headers are skipped and the document is fetched again.
+        """
+        # One lock per URL while anyone is using it, so the dict only holds in-progress downloads
+        lock = self._locks.setdefault(url, asyncio.Lock())
+        self._lock_users[url] = self._lock_users.get(url, 0) + 1
+        try:
+            async with lock:
+                return await self._fetch(url, max_bytes, force)
+        finally:
+            self._lock_users[url] -= 1
+            if not self._lock_users[url]:
+                del self._lock_users[url]
+                del self._locks[url]
+
+    async def _fetch(self, url: str, max_bytes: Optional[int], force: bool) -> Optional[Download]:
+        entry = self.lookup(url)
+        part_path = self._partial_path(url)
+        part_meta_path = part_path[:-len(".part")] + ".json"
+        part_meta = _read_json(part_meta_path) if os.path.exists(part_path) else None
+        resume_from = os.path.getsize(part_path) if part_meta else 0
+
+        headers = {}
+        validator = part_meta and (part_meta.get("etag") or part_meta.get("last_modified"))
+        if resume_from and validator:
+            headers["Range"] = f"bytes={resume_from}-"
+            headers["If-Range"] = validator
+        elif entry and not force:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        elif force:
+            headers["Cache-Control"] = "no-cache"
+
+        transferred = 0
+        try:
+            async with self.client(url).stream("GET", url, headers=headers) as response:
+                if response.status_code == 304 and entry:
+                    self._discard_partial(part_path, part_meta_path)
+                    entry["fetched_at"] = time.time()
+                    write_atomic(self._index_path(url), json.dumps(entry).encode("utf-8"))
+                    return Download(url, self.blob_path(entry["content_hash"]), entry["content_hash"],
+                                    entry["size"], changed=False, bytes_transferred=0)
+                if response.status_code == 304:
+                    # Not modified, but there is no stored copy (e.g. a cache in between answered)
+                    self._discard_partial(part_path, part_meta_path)
+                    if force:
+                        print(f"Document download failed for {url}: 304 with no stored copy")
+                        return None
+                    await response.aclose()
+                    return await self._fetch(url, max_bytes, force=True)
+                if response.status_code not in (200, 206):
+                    print(f"Document download failed for {url}: status {response.status_code}")
+                    return None
+
+                # aiter_raw yields the bytes as sent, so the size on disk is a valid Range offset.
+                # A server that encodes anyway gets its body decoded and is never resumed.
+                encoded = response.headers.get("Content-Encoding", "identity").lower() != "identity"
+                appending = response.status_code == 206 and resume_from > 0
+                if encoded and appending:
+                    print(f"Document download failed for {url}: encoded partial response")
+                    self._discard_partial(part_path, part_meta_path)
+                    return None
+                validators = {
+                    "etag": response.headers.get("ETag"),
+                    "last_modified": response.headers.get("Last-Modified"),
+                }
+                write_atomic(part_meta_path, json.dumps({} if encoded else validators).encode("utf-8"))
+                size = resume_from if appending else 0
+                blocks = response.aiter_bytes(DOWNLOAD_CHUNK_BYTES) if encoded else response.aiter_raw(DOWNLOAD_CHUNK_BYTES)
+                with open(part_path, "ab" if appending else "wb") as f:
+                    async for block in blocks:
+                        size += len(block)
+                        transferred += len(block)
+                        if max_bytes is not None and size > max_bytes:
+                            print(f"Skipping {url}: larger than {max_bytes} bytes")
+                            self._discard_partial(part_path, part_meta_path)
+                            return None
+                        f.write(block)
+        except httpx.HTTPError as e:
+            print(f"Document download failed for {url} after {transferred} bytes: {e}")
+            return None
+
+        digest = await asyncio.to_thread(file_hash, part_path)
+        blob_path = self.blob_path(digest)
+        if os.path.exists(blob_path):
+            os.remove(part_path)
+        else:
+            os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+            os.replace(part_path, blob_path)
+        os.remove(part_meta_path)
+
+        new_entry = {"url": url, **validators, "content_hash": digest, "size": size, "fetched_at": time.time()}
+        write_atomic(self._index_path(url), json.dumps(new_entry).encode("utf-8"))
+        changed = entry is None or entry["content_hash"] != digest
+        return Download(url, blob_path, digest, size, changed=changed, bytes_transferred=transferred)
+
+    @staticmethod
+    def _discard_partial(part_path: str, part_meta_path: str):
+        for path in (part_path, part_meta_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    async def close(self):
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
+
+
+_store: Optional[DocumentStore] = None
+
+
+def get_document_store() -> DocumentStore:
+    """Returns the process-wide document store, creating it on first use."""
+    global _store
+    if _store is None:
+        _store = DocumentStore()
+    return _store
+
+
+async def close_document_store():
+    """Closes the per-host connection pools of the process-wide document store."""
+    global _store
+    if _store is not None:
+        await _store.close()
+        _store = None
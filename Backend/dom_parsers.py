@@ -0,0 +1,182 @@
+import re
+from typing import Any, Dict, List, Optional
+
+from lxml import html as lxml_html
+from lxml.html import HtmlElement
+
+from table_parser import TableSpec
+
+# Documents sub-sections by their <h3> heading; concalls have their own section
+DOCUMENT_HEADINGS = {
+    "announcements": "Announcements",
+    "annual reports": "Annual Reports",
+    "credit ratings": "Credit Ratings",
+}
+CONCALL_LINKS = ("Transcript", "PPT", "REC")
+
+_ANNOUNCEMENT_DATE = re.compile(r"^(\d+\s?\w+\s?\d{4}|\d+\s?\w+|\d+h)\s*-\s*(.*)$")
+
+
+def parse_html(html_text: str, base_url: Optional[str] = None) -> HtmlElement:
+    """Parses a whole page once so every section can be read from the same tree."""
+    root = lxml_html.fromstring(html_text)
+    if base_url:
+        root.make_links_absolute(base_url)
+    return root
+
+
+def select_first(root: HtmlElement, selector: str) -> Optional[HtmlElement]:
+    matches = root.cssselect(selector)
+    return matches[0] if matches else None
+
+
+def text_of(element: HtmlElement) -> str:
+    """Returns the element's text with whitespace (including &nbsp;) collapsed."""
+    return " ".join(element.text_content().split())
+
+
+def table_rows(table: HtmlElement):
+    """Returns (non-empty header cells, [row cells...]) for a screener.in data table."""
+    header_cells = table.cssselect("thead th")
+    if not header_cells:
+        first_row = table.cssselect("tr")[:1]
+        header_cells = first_row[0].cssselect("th") if first_row else []
+    headers = [text_of(th) for th in header_cells]
+    rows = [[text_of(td) for td in tr.cssselect("td")] for tr in table.cssselect("tr")]
+    return [h for h in headers if h], [cells for cells in rows if cells]
+
+
+def parse_basic_data_dom(section: HtmlElement) -> Dict[str, str]:
+    """Reads the top ratios list (name/value pairs)."""
+    basic_data_json = {}
+    for item in section.cssselect("li"):
+        name = item.cssselect(".name")
+        value = item.cssselect(".value")
+        if name and value:
+            basic_data_json[text_of(name[0])] = text_of(value[0])
+    return basic_data_json
+
+
+def parse_table_dom(section: HtmlElement, spec: TableSpec) -> Optional[Dict[str, Any]]:
+    """Reads a year-wise data table (and any growth ratio tables) described by a TableSpec."""
+    table = select_first(section, "table.data-table")
+    if table is None:
+        return None
+    periods, rows = table_rows(table)
+    data: Dict[str, Any] = {spec.periods_key: periods}
+    for cells in rows:
+        metric_name = cells[0]
+        if metric_name and not any(excluded in metric_name for excluded in spec.exclude_rows):
+            data[metric_name] = cells[1:]
+
+    if spec.group_titles:
+        groups = {}
+        for ranges in section.cssselect("table.ranges-table"):
+            title = text_of(ranges.cssselect("th")[0]) if ranges.cssselect("th") else ""
+            if title in spec.group_titles:
+                groups[title] = {
+                    cells[0].rstrip(":"): cells[1]
+                    for cells in ([text_of(td) for td in tr.cssselect("td")] for tr in ranges.cssselect("tr"))
+                    if len(cells) == 2
+                }
+        data[spec.groups_key] = groups
+    return data
+
+
+def parse_quarterly_results_dom(section: HtmlElement) -> Optional[Dict[str, Any]]:
+    """Reads the quarterly results table and the upcoming result date, if announced."""
+    quarterly_json = parse_table_dom(section, TableSpec(periods_key="Quarters"))
+    if quarterly_json is None:
+        return None
+    labels = section.xpath('.//*[contains(text(), "Upcoming result date")]')
+    if labels:
+        value = labels[0].cssselect("strong")
+        date_text = text_of(value[0]) if value else text_of(labels[0]).split(":", 1)[-1].strip()
+        if date_text:
+            quarterly_json["Upcoming result date"] = date_text
+    return quarterly_json
+
+
+def parse_peer_comparison_dom(section: HtmlElement) -> Optional[List[Dict[str, str]]]:
+    """Reads the peer table, including its median footer row, as one dict per row."""
+    table = select_first(section, "table.data-table")
+    if table is None:
+        return None
+    headers = [text_of(th) for th in table.cssselect("tr th")]
+    headers = [h for h in headers if h]
+    peer_list = []
+    for tr in table.cssselect("tr"):
+        cells = [text_of(td) for td in tr.cssselect("td")]
+        if cells and len(cells) == len(headers):
+            peer_list.append(dict(zip(headers, cells)))
+    return peer_list
+
+
+def parse_shareholding_dom(section: HtmlElement) -> Optional[Dict[str, Any]]:
+    """Reads the quarterly and yearly shareholding tables."""
+    shareholding_data = {}
+    for selector, key, periods_key in (
+        ("#quarterly-shp", "Quarterly Shareholding", "Quarters"),
+        ("#yearly-shp", "Yearly Shareholding", "Years"),
+    ):
+        tab = select_first(section, selector)
+        parsed = parse_table_dom(tab, TableSpec(periods_key=periods_key)) if tab is not None else None
+        if parsed:
+            shareholding_data[key] = parsed
+    return shareholding_data or None
+
+
+def parse_documents_dom(section: HtmlElement) -> Dict[str, List[Dict[str, Any]]]:
+    """Reads announcements, annual reports and credit ratings (concalls are parsed separately)."""
+    documents_data = {}
+    for block in section.cssselect("div.documents"):
+        heading = block.cssselect("h3")
+        current_section = DOCUMENT_HEADINGS.get(text_of(heading[0]).lower()) if heading else None
+        if not current_section:
+            continue
+        entries = documents_data.setdefault(current_section, [])
+        for link in block.cssselect("li a"):
+            url = link.get("href")
+            if not url:
+                continue
+            if current_section == "Announcements":
+                details = link.cssselect("div")
+                description = " ".join((link.text or "").split())
+                date_info = None
+                if details:
+                    date_match = _ANNOUNCEMENT_DATE.match(text_of(details[0]))
+                    if date_match:
+                        date_info = date_match.group(1)
+                        if date_match.group(2):
+                            description = f"{description} - {date_match.group(2)}" if description else date_match.group(2)
+                    elif not description:
+                        description = text_of(details[0])
+                entries.append({"description": description or text_of(link), "date": date_info, "url": url})
+            elif current_section == "Annual Reports":
+                text_part = text_of(link)
+                description_parts = text_part.rsplit('from', 1)
+                if len(description_parts) == 2:
+                    description, source_info = description_parts[0].strip(), description_parts[1].strip()
+                else:
+                    description, source_info = text_part, None
+                entries.append({"description": description, "source": source_info, "url": url})
+            else:
+                entries.append({"description": text_of(link), "url": url})
+    return documents_data
+
+
+def parse_concalls_dom(section: HtmlElement) -> List[Dict[str, Any]]:
+    """Reads one entry per concall: its date plus transcript/PPT/recording links and notes flag."""
+    concalls_data = []
+    for item in section.cssselect("li"):
+        date = item.cssselect("div")
+        concall_entry: Dict[str, Any] = {"Date": text_of(date[0]) if date else ""}
+        for element in item.iter("a", "button"):
+            label = text_of(element)
+            if label in CONCALL_LINKS and element.get("href"):
+                concall_entry[label] = element.get("href")
+            elif label == "Notes":
+                concall_entry["Notes"] = True
+        if concall_entry["Date"]:
+            concalls_data.append(concall_entry)
+    return concalls_data
@@ -0,0 +1,145 @@
+import asyncio
+import os
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import tiktoken
+from openai import AsyncOpenAI
+
+from embedding_cache import EmbeddingCache
+
+EMBEDDING_MODEL = os.environ.get("EMBEDDING_MODEL", "text-embedding-3-small")
+EMBEDDING_DIMENSIONS = int(os.environ.get("EMBEDDING_DIMENSIONS", "1536"))
+EMBEDDING_BATCH_SIZE = int(os.environ.get("EMBEDDING_BATCH_SIZE", "256"))
+EMBEDDING_BATCH_TOKENS = int(os.environ.get("EMBEDDING_BATCH_TOKENS", "100000"))
+EMBEDDING_BATCH_DELAY = float(os.environ.get("EMBEDDING_BATCH_DELAY", "0.05"))
+EMBEDDING_MAX_REQUESTS = int(os.environ.get("EMBEDDING_MAX_REQUESTS", "4"))
+
+# Longest input the embedding models accept, in tokens
+MAX_INPUT_TOKENS = 8191
+
+
+@dataclass
+class PendingEmbedding:
+    text: str
+    tokens: int
+    future: asyncio.Future
+
+
+def embedding_options(model: str = EMBEDDING_MODEL, dimensions: int = EMBEDDING_DIMENSIONS) -> dict:
+    """Extra embeddings.create arguments: text-embedding-3 models can return shortened vectors."""
+    return {"dimensions": dimensions} if model.startswith("text-embedding-3") else {}
+
+
+def get_encoding(model: str = EMBEDDING_MODEL) -> tiktoken.Encoding:
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+
+class EmbeddingBatcher:
+    """
+    Coalesces concurrent embedding calls into multi-input embeddings requests.
+
+    `await batcher.embed(text)` queues the text and returns its vector once the batch it
+    landed in comes back. A batch is sent as soon as it holds `max_inputs` texts or would
+    exceed `max_tokens` (counted with tiktoken), or `delay` seconds after its first text
+    arrived, whichever comes first. At most `max_requests` batches are in flight at once.
+
+    Texts longer than the model's input limit are truncated rather than failing the whole
+    batch. If a batch is rejected, its texts are retried one by one so a single bad input
+    only fails itself; a text that still fails resolves its caller with None, so it can tell
+    a missing embedding apart from a real one and leave the text to be embedded on a later run.
+    With a `cache`, texts embedded before are answered from it and never queued.
+    """
+
+    def __init__(self, client: AsyncOpenAI, model: str = EMBEDDING_MODEL, dimensions: int = EMBEDDING_DIMENSIONS,
+                 max_inputs: int = EMBEDDING_BATCH_SIZE, max_tokens: int = EMBEDDING_BATCH_TOKENS,
+                 delay: float = EMBEDDING_BATCH_DELAY, max_requests: int = EMBEDDING_MAX_REQUESTS,
+                 cache: Optional[EmbeddingCache] = None):
+        self.client = client
+        self.model = model
+        self.dimensions = dimensions
+        self.cache = cache
+        self.max_inputs = max_inputs
+        self.max_tokens = max_tokens
+        self.delay = delay
+        self.encoding = get_encoding(model)
+        self._requests = asyncio.Semaphore(max_requests)
+        self._pending: List[PendingEmbedding] = []
+        self._pending_tokens = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._in_flight = set()
+
+    async def embed(self, text: str) -> Optional[List[float]]:
+        """Returns the embedding of `text`, sent together with whatever else is queued, or None if the request failed."""
+        if self.cache:
+            cached = await self.cache.get(self.model, self.dimensions, text)
+            if cached is not None:
+                return cached
+
+        tokens = self.encoding.encode(text, disallowed_special=())
+        request_text = text
+        if len(tokens) > MAX_INPUT_TOKENS:
+            print(f"Truncating embedding input from {len(tokens)} to {MAX_INPUT_TOKENS} tokens")
+            tokens = tokens[:MAX_INPUT_TOKENS]
+            request_text = self.encoding.decode(tokens)
+
+        if self._pending and self._pending_tokens + len(tokens) > self.max_tokens:
+            self._send()
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append(PendingEmbedding(request_text, len(tokens), future))
+        self._pending_tokens += len(tokens)
+        if len(self._pending) >= self.max_inputs:
+            self._send()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.delay, self._send)
+
+        vector = await future
+        if vector is None:
+            return None
+        if self.cache:
+            await self.cache.put(self.model, self.dimensions, text, vector)
+        return vector
+
+    def _send(self):
+        """Takes the queued texts as one batch and sends it in the background."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        batch, self._pending, self._pending_tokens = self._pending, [], 0
+        task = asyncio.ensure_future(self._request(batch))
+        self._in_flight.add(task)
+        task.add_done_callback(self._in_flight.discard)
+
+    async def _create(self, texts: List[str]) -> Dict[int, List[float]]:
+        response = await self.client.embeddings.create(
+            model=self.model, input=texts, **embedding_options(self.model, self.dimensions)
+        )
+        return {item.index: item.embedding for item in response.data}
+
+    async def _request(self, batch: List[PendingEmbedding]):
+        async with self._requests:
+            try:
+                vectors = await self._create([p.text for p in batch])
+            except Exception as e:
+                print(f"Error getting embeddings for a batch of {len(batch)}: {e}")
+                vectors = {}
+                # Retried one by one, so a single bad input only fails itself
+                for i, pending in enumerate(batch if len(batch) > 1 else []):
+                    try:
+                        vectors[i] = (await self._create([pending.text]))[0]
+                    except Exception as text_error:
+                        print(f"Error getting embedding: {text_error}")
+        for i, pending in enumerate(batch):
+            if not pending.future.done():
+                pending.future.set_result(vectors.get(i))
+
+    async def flush(self):
+        """Sends anything still queued and waits for every in-flight batch."""
+        self._send()
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight)
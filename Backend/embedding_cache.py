@@ -0,0 +1,134 @@
+import asyncio
+import os
+import time
+from array import array
+from typing import List, Optional
+
+import aiosqlite
+
+from snapshot_cache import content_hash
+
+EMBEDDING_CACHE_PATH = os.environ.get("EMBEDDING_CACHE_PATH", "embedding_cache.sqlite")
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.environ.get("EMBEDDING_CACHE_MAX_ENTRIES", "500000"))
+
+# Eviction runs once per this many inserts rather than on every one
+EVICT_EVERY = 1000
+
+
+def pack_vector(vector: List[float]) -> bytes:
+    return array("f", vector).tobytes()
+
+
+def unpack_vector(blob: bytes) -> List[float]:
+    vector = array("f")
+    vector.frombytes(blob)
+    return vector.tolist()
+
+
+class EmbeddingCache:
+    """
+    Persistent cache of embedding vectors, keyed by (model, dimensions, content hash of the text).
+
+    Vectors are stored as float32 blobs in one SQLite file. Every hit refreshes the entry's
+    last-used time, and once the cache holds more than `max_entries` the least recently used
+    entries are deleted. `hits` and `misses` count lookups since the cache was opened.
+    """
+
+    def __init__(self, path: str = EMBEDDING_CACHE_PATH, max_entries: int = EMBEDDING_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._db: Optional[aiosqlite.Connection] = None
+        self._opening = asyncio.Lock()
+        self._inserts = 0
+
+    async def open(self):
+        async with self._opening:
+            if self._db is not None:
+                return
+            db = await aiosqlite.connect(self.path)
+            await db.execute("pragma journal_mode=wal")
+            await db.execute(
+                "create table if not exists embeddings ("
+                " model text not null, dimensions integer not null, content_hash text not null,"
+                " vector blob not null, last_used real not null,"
+                " primary key (model, dimensions, content_hash))"
+            )
+            await db.execute("create index if not exists embeddings_last_used on embeddings (last_used)")
+            await db.commit()
+            self._db = db
+
+    async def get(self, model: str, dimensions: int, text: str) -> Optional[List[float]]:
+        """Returns the cached embedding of `text`, or None."""
+        await self.open()
+        key = (model, dimensions, content_hash(text))
+        async with self._db.execute(
+            "select vector from embeddings where model = ? and dimensions = ? and content_hash = ?", key
+        ) as cursor:
+            row = await cursor.fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        await self._db.execute(
+            "update embeddings set last_used = ? where model = ? and dimensions = ? and content_hash = ?",
+            (time.time(), *key),
+        )
+        await self._db.commit()
+        return unpack_vector(row[0])
+
+    async def put(self, model: str, dimensions: int, text: str, vector: List[float]):
+        """Stores the embedding of `text`, evicting least recently used entries when over capacity."""
+        await self.open()
+        await self._db.execute(
+            "insert or replace into embeddings (model, dimensions, content_hash, vector, last_used)"
+            " values (?, ?, ?, ?, ?)",
+            (model, dimensions, content_hash(text), pack_vector(vector), time.time()),
+        )
+        self._inserts += 1
+        if self._inserts % EVICT_EVERY == 0:
+            await self.evict()
+        await self._db.commit()
+
+    async def evict(self):
+        """Deletes the least recently used entries beyond `max_entries`."""
+        async with self._db.execute("select count(*) from embeddings") as cursor:
+            (count,) = await cursor.fetchone()
+        if count > self.max_entries:
+            await self._db.execute(
+                "delete from embeddings where rowid in"
+                " (select rowid from embeddings order by last_used limit ?)",
+                (count - self.max_entries,),
+            )
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / lookups if lookups else 0.0}
+
+    async def close(self):
+        if self._db is not None:
+            await self._db.close()
+            self._db = None
+
+
+_cache: Optional[EmbeddingCache] = None
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Returns the process-wide embedding cache, creating it on first use."""
+    global _cache
+    if _cache is None:
+        _cache = EmbeddingCache()
+    return _cache
+
+
+async def close_embedding_cache():
+    """Closes the process-wide embedding cache, printing its hit rate."""
+    global _cache
+    if _cache is not None:
+        stats = _cache.stats()
+        if stats["hits"] or stats["misses"]:
+            print(f"Embedding cache: {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.0%} hit rate)")
+        await _cache.close()
+        _cache = None
@@ -0,0 +1,56 @@
+import os
+from typing import Optional
+
+import httpx
+
+HTTP_MAX_CONNECTIONS = int(os.environ.get("HTTP_MAX_CONNECTIONS", "20"))
+HTTP_TIMEOUT = float(os.environ.get("HTTP_TIMEOUT", "20"))
+
+DEFAULT_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/132.0.0.0 Safari/537.36"
+    ),
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Returns the process-wide keep-alive HTTP client, creating it on first use."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            headers=DEFAULT_HEADERS,
+            timeout=HTTP_TIMEOUT,
+            follow_redirects=True,
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_CONNECTIONS,
+            ),
+        )
+    return _client
+
+
+async def fetch_html(url: str) -> Optional[str]:
+    """Fetches a server-rendered page over plain HTTP. Returns None on any failure."""
+    try:
+        response = await get_http_client().get(url)
+    except httpx.HTTPError as e:
+        print(f"HTTP fetch failed for {url}: {e}")
+        return None
+    if response.status_code != 200:
+        print(f"HTTP fetch failed for {url}: status {response.status_code}")
+        return None
+    return response.text
+
+
+async def close_http_client():
+    """Closes the process-wide HTTP client, if one was created."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
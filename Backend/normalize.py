@@ -0,0 +1,149 @@
+import math
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+
+# Sections holding numeric tables, with the unit their plain numbers are quoted in
+NUMERIC_SECTIONS = {
+    "basic_data": None,
+    "quarterly_results": "Cr",
+    "balance_sheet": "Cr",
+    "profit_loss": "Cr",
+    "cash_flow": "Cr",
+    "ratios": None,
+    # Holdings are tagged "%" from their values; "No. of Shareholders" is a plain count
+    "shareholding_pattern": None,
+}
+PERIOD_KEYS = ("Years", "Quarters")
+
+COLUMNS = ["symbol", "section", "table", "metric", "period_label", "raw"]
+
+_NUMBER = r"(-?[\d,]*\.?\d+)"
+
+
+def _table_rows(symbol: str, section_name: str, table: str, data: Dict[str, Any]) -> List[tuple]:
+    """Flattens one {"Years"/"Quarters": [...], metric: [values...]} table into raw rows."""
+    periods = next((data[key] for key in PERIOD_KEYS if isinstance(data.get(key), list)), [])
+    rows = []
+    for metric, values in data.items():
+        if metric in PERIOD_KEYS or not isinstance(values, list):
+            continue
+        for i, raw in enumerate(values):
+            rows.append((symbol, section_name, table, metric, periods[i] if i < len(periods) else "", raw))
+    return rows
+
+
+def section_rows(symbol: str, section_name: str, data: Any) -> List[tuple]:
+    """Flattens a parsed section into (symbol, section, table, metric, period_label, raw) rows."""
+    if section_name not in NUMERIC_SECTIONS or not isinstance(data, dict) or "error" in data:
+        return []
+    if section_name == "basic_data":
+        return [(symbol, section_name, "", metric, "", raw) for metric, raw in data.items()]
+    if section_name == "shareholding_pattern":
+        return [row for table, table_data in data.items() if isinstance(table_data, dict)
+                for row in _table_rows(symbol, section_name, table, table_data)]
+
+    rows = _table_rows(symbol, section_name, "", data)
+    for group, ratios in (data.get("Growth Ratios") or {}).items():
+        rows.extend((symbol, section_name, "Growth Ratios", group, label, raw) for label, raw in ratios.items())
+    return rows
+
+
+def normalize_frame(raw: pd.DataFrame) -> pd.DataFrame:
+    """
+    Turns raw string rows into typed values, vectorized over the whole frame.
+
+    Adds `value` (float64, NaN when blank or non-numeric), `unit` ("%", "Cr", "Rs", "days" or
+    the section default) and `period` (month-end timestamp; NaT for TTM and non-date labels).
+    Metric names lose screener's trailing " +" expander marker. Values like "₹ 1,234 / 567"
+    under a "High / Low" metric are split into one row per part.
+    """
+    df = raw.astype({"raw": "string", "metric": "string", "period_label": "string"}).copy()
+    # Units are read from the unsplit value, so "Low" in "₹ 300 / 150" keeps its currency
+    df["unit_source"] = df["raw"].fillna("")
+
+    paired = df["metric"].str.contains("/", regex=False) & df["raw"].str.contains("/", regex=False)
+    if paired.any():
+        pairs = df[paired].assign(
+            metric=df.loc[paired, "metric"].str.split(r"\s*/\s*", regex=True),
+            raw=df.loc[paired, "raw"].str.split(r"\s*/\s*", regex=True),
+        )
+        pairs = pairs[pairs["metric"].str.len() == pairs["raw"].str.len()].explode(["metric", "raw"])
+        df = pd.concat([df[~paired], pairs.astype({"metric": "string", "raw": "string"})], ignore_index=True)
+
+    df["metric"] = df["metric"].str.replace(r"\s*\+$", "", regex=True).str.strip()
+    raw_values = df["raw"].fillna("").str.strip()
+    df["value"] = pd.to_numeric(
+        raw_values.str.extract(_NUMBER, expand=False).str.replace(",", "", regex=False),
+        errors="coerce",
+    ).astype("float64")
+
+    default_unit = df["section"].map(NUMERIC_SECTIONS).astype("object")
+    metric_lower = df["metric"].str.lower()
+    unit_source = df["unit_source"].astype("string")
+    df["unit"] = np.select(
+        [
+            unit_source.str.contains("%", regex=False) | df["metric"].str.endswith("%"),
+            unit_source.str.contains("Cr", regex=False),
+            unit_source.str.contains("₹", regex=False) | metric_lower.str.contains(r"\bin rs\b", regex=True),
+            metric_lower.str.endswith("days"),
+            df["table"] == "Growth Ratios",
+        ],
+        ["%", "Cr", "Rs", "days", "%"],
+        default=None,
+    )
+    df["unit"] = df["unit"].where(df["unit"].notna(), default_unit)
+    df["unit"] = df["unit"].astype("object").where(df["unit"].notna(), None)
+    df = df.drop(columns="unit_source")
+
+    df["period"] = pd.to_datetime(df["period_label"], format="%b %Y", errors="coerce") + pd.offsets.MonthEnd(0)
+    return df
+
+
+def normalize_batch(companies: Dict[str, Dict[str, Any]]) -> pd.DataFrame:
+    """
+    Normalizes the parsed sections of many companies at once.
+
+    `companies` maps symbol -> {section_name: parsed section}; the result has one row per
+    (symbol, section, table, metric, period).
+    """
+    rows = [row for symbol, sections in companies.items()
+            for section_name, data in sections.items()
+            for row in section_rows(symbol, section_name, data)]
+    return normalize_frame(pd.DataFrame(rows, columns=COLUMNS))
+
+
+def _json_float(value: float):
+    return None if math.isnan(value) else float(value)
+
+
+def normalize_company(sections: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Returns typed versions of one company's numeric sections, ready for JSON (see frame_to_json)."""
+    return frame_to_json(normalize_batch({"": sections}))
+
+
+def frame_to_json(df: pd.DataFrame) -> Dict[str, Dict[str, Any]]:
+    """
+    Converts one company's normalized rows into typed arrays:
+        {section: {table: {"period_labels": [...], "periods": [iso date | None],
+                           "metrics": {metric: {"unit": ..., "values": [float | None]}}}}}
+    The main table of a section is under the "" table key.
+    """
+    normalized: Dict[str, Dict[str, Any]] = {}
+    for (section_name, table), table_df in df.groupby(["section", "table"], sort=False):
+        labels = list(dict.fromkeys(table_df["period_label"].tolist()))
+        periods = table_df.drop_duplicates("period_label").set_index("period_label")["period"]
+        metrics = {}
+        for metric, metric_df in table_df.groupby("metric", sort=False):
+            by_label = dict(zip(metric_df["period_label"], metric_df["value"]))
+            metrics[metric] = {
+                "unit": metric_df["unit"].iloc[0],
+                "values": [_json_float(by_label.get(label, math.nan)) for label in labels],
+            }
+        normalized.setdefault(section_name, {})[table] = {
+            "period_labels": labels,
+            "periods": [None if pd.isna(periods[label]) else periods[label].date().isoformat() for label in labels],
+            "metrics": metrics,
+        }
+    return normalized
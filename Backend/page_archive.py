@@ -0,0 +1,103 @@
+import os
+import sqlite3
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+CRAWL_ARCHIVE_MODE = os.environ.get("CRAWL_ARCHIVE_MODE", "off")  # off | record | replay
+CRAWL_ARCHIVE_PATH = os.environ.get("CRAWL_ARCHIVE_PATH", "crawl_archive.sqlite")
+
+ARCHIVE_MODES = ("off", "record", "replay")
+
+
+@dataclass
+class ArchivedPage:
+    url: str
+    selector: str
+    fetched_at: float
+    body: str
+
+
+class PageArchive:
+    """
+    A single-file archive of fetched pages, keyed by (url, selector).
+
+    In record mode every page the crawler fetches is saved (zlib-compressed, with its fetch
+    time); in replay mode the fetch functions read pages from here instead of the network,
+    which makes ingestion runs deterministic and network-free on the crawling side.
+    `selector` is empty for whole pages and holds the css_selector for pages that were only
+    fetched through one (such as the Google symbol lookup).
+    """
+
+    def __init__(self, path: str, mode: str):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown archive mode: {mode}")
+        if mode == "replay" and not os.path.exists(path):
+            raise FileNotFoundError(f"No page archive at {path}")
+        self.path = path
+        self.mode = mode
+        self._db = sqlite3.connect(path)
+        self._db.execute(
+            "create table if not exists pages ("
+            " url text not null, selector text not null, fetched_at real not null, body blob not null,"
+            " primary key (url, selector))"
+        )
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == "record"
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    def record(self, url: str, body: str, selector: str = ""):
+        """Saves a fetched page, replacing any earlier recording of the same (url, selector)."""
+        with self._db:
+            self._db.execute(
+                "insert or replace into pages (url, selector, fetched_at, body) values (?, ?, ?, ?)",
+                (url, selector, time.time(), zlib.compress(body.encode("utf-8"))),
+            )
+
+    def lookup(self, url: str, selector: str = "") -> Optional[ArchivedPage]:
+        """Returns the recorded page for (url, selector), or None."""
+        row = self._db.execute(
+            "select fetched_at, body from pages where url = ? and selector = ?", (url, selector)
+        ).fetchone()
+        if row is None:
+            return None
+        return ArchivedPage(url=url, selector=selector, fetched_at=row[0], body=zlib.decompress(row[1]).decode("utf-8"))
+
+    def pages(self) -> Iterator[ArchivedPage]:
+        """Iterates over every recorded page."""
+        for url, selector, fetched_at, body in self._db.execute(
+            "select url, selector, fetched_at, body from pages order by url, selector"
+        ):
+            yield ArchivedPage(url=url, selector=selector, fetched_at=fetched_at, body=zlib.decompress(body).decode("utf-8"))
+
+    def close(self):
+        self._db.close()
+
+
+_archive: Optional[PageArchive] = None
+_configured = False
+
+
+def configure_archive(mode: str, path: str = CRAWL_ARCHIVE_PATH) -> Optional[PageArchive]:
+    """Switches the process between live ("off"), "record" and "replay" crawling."""
+    global _archive, _configured
+    if mode not in ARCHIVE_MODES:
+        raise ValueError(f"Unknown archive mode: {mode}")
+    if _archive is not None:
+        _archive.close()
+    _archive = None if mode == "off" else PageArchive(path, mode)
+    _configured = True
+    return _archive
+
+
+def get_page_archive() -> Optional[PageArchive]:
+    """Returns the active page archive, or None when crawling live."""
+    if not _configured:
+        configure_archive(CRAWL_ARCHIVE_MODE)
+    return _archive
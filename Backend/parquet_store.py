@@ -0,0 +1,109 @@
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import List, Optional, Sequence
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+PARQUET_DIR = os.environ.get("PARQUET_DIR", "data/financials")
+PARQUET_FLUSH_ROWS = int(os.environ.get("PARQUET_FLUSH_ROWS", "200000"))
+PARQUET_FLUSH_SECONDS = float(os.environ.get("PARQUET_FLUSH_SECONDS", "300"))
+
+SCHEMA = pa.schema([
+    ("symbol", pa.string()),
+    ("table", pa.string()),
+    ("metric", pa.string()),
+    ("period_label", pa.string()),
+    ("period", pa.timestamp("us")),
+    ("value", pa.float64()),
+    ("unit", pa.string()),
+    ("fetched_at", pa.timestamp("us", tz="UTC")),
+    ("section", pa.string()),
+    ("fetch_date", pa.string()),
+])
+PARTITIONING = ds.partitioning(pa.schema([("section", pa.string()), ("fetch_date", pa.string())]), flavor="hive")
+KEY_COLUMNS = ["symbol", "section", "table", "metric", "period_label"]
+
+
+class FinancialsStore:
+    """
+    Partitioned Parquet dataset of normalized financial time series.
+
+    Layout: <root>/section=<section>/fetch_date=<YYYY-MM-DD>/part-*.parquet, one row per
+    (symbol, table, metric, period). Rows are buffered and written as a few large files per
+    flush (every `flush_rows` rows or `flush_seconds`, whichever comes first), so bulk
+    ingestion doesn't produce one tiny file per company. `add` and `flush` may be called from
+    worker threads (ingestion runs them off the event loop).
+    """
+
+    def __init__(self, root: str = PARQUET_DIR, flush_rows: int = PARQUET_FLUSH_ROWS,
+                 flush_seconds: float = PARQUET_FLUSH_SECONDS):
+        self.root = root
+        self.flush_rows = flush_rows
+        self.flush_seconds = flush_seconds
+        self._pending: List[pd.DataFrame] = []
+        self._pending_rows = 0
+        self._last_flush = time.monotonic()
+        self._lock = threading.RLock()
+
+    def add(self, normalized: pd.DataFrame, fetched_at: Optional[datetime] = None):
+        """Buffers rows from normalize.normalize_batch, flushing once enough have accumulated."""
+        if normalized.empty:
+            return
+        fetched_at = fetched_at or datetime.now(timezone.utc)
+        frame = normalized.assign(fetched_at=pd.Timestamp(fetched_at), fetch_date=fetched_at.date().isoformat())
+        with self._lock:
+            self._pending.append(frame[SCHEMA.names])
+            self._pending_rows += len(frame)
+            if self._pending_rows >= self.flush_rows or time.monotonic() - self._last_flush >= self.flush_seconds:
+                self.flush()
+
+    def flush(self):
+        """Writes every buffered row to the dataset."""
+        with self._lock:
+            self._last_flush = time.monotonic()
+            if not self._pending:
+                return
+            frame = pd.concat(self._pending, ignore_index=True)
+            self._pending, self._pending_rows = [], 0
+        table = pa.Table.from_pandas(frame, schema=SCHEMA, preserve_index=False)
+        ds.write_dataset(
+            table,
+            self.root,
+            format="parquet",
+            partitioning=PARTITIONING,
+            basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+            existing_data_behavior="overwrite_or_ignore",
+        )
+
+    def dataset(self) -> ds.Dataset:
+        return ds.dataset(self.root, format="parquet", partitioning=PARTITIONING, schema=SCHEMA)
+
+    def read(self, metrics: Optional[Sequence[str]] = None, sections: Optional[Sequence[str]] = None,
+             symbols: Optional[Sequence[str]] = None, latest_only: bool = True) -> pd.DataFrame:
+        """
+        Scans the dataset with partition and column filters pushed down, e.g.
+        `store.read(metrics=["ROCE %"], sections=["ratios"])` for ROCE across every company.
+
+        With `latest_only`, a value refetched on several days keeps only its newest row.
+        """
+        conditions = []
+        if metrics:
+            conditions.append(ds.field("metric").isin(list(metrics)))
+        if sections:
+            conditions.append(ds.field("section").isin(list(sections)))
+        if symbols:
+            conditions.append(ds.field("symbol").isin(list(symbols)))
+        condition = None
+        for c in conditions:
+            condition = c if condition is None else condition & c
+        if not os.path.isdir(self.root):
+            return pd.DataFrame(columns=SCHEMA.names)
+        frame = self.dataset().to_table(filter=condition).to_pandas()
+        if latest_only and not frame.empty:
+            frame = frame.sort_values("fetched_at").drop_duplicates(KEY_COLUMNS, keep="last")
+        return frame.reset_index(drop=True)
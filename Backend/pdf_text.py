@@ -0,0 +1,22 @@
+# PDF text extraction, run in worker processes by document_ingest. Kept in its own module so
+# spawned workers import only pypdf, not the crawler and database clients.
+from typing import List
+
+from pypdf import PdfReader
+
+
+def count_pages(path: str) -> int:
+    return len(PdfReader(path).pages)
+
+
+def extract_pages(path: str, start: int, stop: int) -> List[str]:
+    """Extracts the text of pages [start, stop). pypdf reads pages lazily, so only this window is parsed."""
+    reader = PdfReader(path)
+    texts = []
+    for page in reader.pages[start:stop]:
+        try:
+            texts.append(page.extract_text() or "")
+        except Exception as e:
+            print(f"Error extracting page text from {path}: {e}")
+            texts.append("")
+    return texts
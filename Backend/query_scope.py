@@ -0,0 +1,101 @@
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+from symbol_index import get_symbol_index, normalize_name
+
+MAX_SCOPED_SYMBOLS = 5
+# Longest company name (in normalized words) looked up as one phrase
+MAX_NAME_WORDS = 4
+
+# Words and phrases that point a question at one of section_parsers.COMPANY_SECTIONS (or a
+# document_ingest section). Matched on word boundaries in the lowercased query.
+SECTION_KEYWORDS = {
+    "basic_data": ("market cap", "current price", "stock p/e", "p/e", "pe ratio", "book value",
+                   "dividend yield", "face value", "52 week", "high / low", "roce", "roe"),
+    "quarterly_results": ("quarter", "quarterly", "quarters", "q1", "q2", "q3", "q4", "qoq"),
+    "balance_sheet": ("balance sheet", "borrowings", "debt", "reserves", "total assets", "liabilities",
+                      "fixed assets", "cwip", "equity capital"),
+    "peer_comparison": ("peer", "peers", "competitor", "competitors", "industry comparison"),
+    "profit_loss": ("profit", "loss", "revenue", "sales", "net profit", "eps", "earnings", "opm",
+                    "operating margin", "annual results", "dividend payout", "compounded"),
+    "cash_flow": ("cash flow", "cash flows", "operating cash", "free cash", "capex"),
+    "ratios": ("ratio", "ratios", "roce", "debtor days", "inventory days", "days payable",
+               "working capital", "cash conversion"),
+    "shareholding_pattern": ("shareholding", "promoter", "promoters", "fii", "fiis", "dii", "diis",
+                             "shareholders", "pledge", "pledged"),
+    "documents": ("annual report", "annual reports", "announcement", "announcements", "credit rating",
+                  "filing", "filings", "document", "documents"),
+    "concalls": ("concall", "concalls", "conference call", "earnings call", "transcript", "transcripts",
+                 "management commentary", "guidance"),
+}
+
+_SECTION_PATTERNS = {
+    section: re.compile(r"(?<![a-z0-9])(" + "|".join(re.escape(k) for k in keywords) + r")(?![a-z0-9])")
+    for section, keywords in SECTION_KEYWORDS.items()
+}
+_KEYWORDS = {keyword for keywords in SECTION_KEYWORDS.values() for keyword in keywords}
+# Exchange symbols as users type them: INFY, HDFCBANK, M&M, BAJAJ-AUTO
+_SYMBOL_TOKEN = re.compile(r"\b[A-Z][A-Z0-9&-]+")
+
+
+@dataclass
+class QueryScope:
+    symbols: List[str] = field(default_factory=list)
+    sections: List[str] = field(default_factory=list)
+
+    def widening(self) -> List[Tuple[Optional[List[str]], Optional[List[str]]]]:
+        """
+        (symbols, sections) filters to try in order: the full scope, then symbols only, then
+        the whole corpus. A wrongly inferred section (or a company that was never ingested)
+        then costs an extra query instead of an empty answer.
+        """
+        attempts = []
+        for attempt in ((self.symbols or None, self.sections or None), (self.symbols or None, None), (None, None)):
+            if attempt not in attempts:
+                attempts.append(attempt)
+        return attempts
+
+
+def infer_sections(query: str) -> List[str]:
+    """Returns the section names whose keywords appear in the query."""
+    text = query.lower()
+    return [section for section, pattern in _SECTION_PATTERNS.items() if pattern.search(text)]
+
+
+def infer_symbols(query: str) -> List[str]:
+    """
+    Returns the listed symbols the query mentions.
+
+    Upper-case tokens are matched against exchange symbols ("INFY"), and runs of words
+    against full normalized company names ("infosys", "hdfc bank"), longest run first.
+    Only exact matches count: a wrong company would hide the right chunks, whereas a missed
+    one just leaves the search unscoped. Without a symbol listing nothing is inferred.
+    """
+    index = get_symbol_index()
+    if index is None:
+        return []
+    found = []
+    for match in _SYMBOL_TOKEN.finditer(query):
+        token = match.group().rstrip("&-")
+        listing = index.by_symbol.get(token)
+        if listing and token.lower() not in _KEYWORDS:
+            found.append(listing.symbol)
+
+    words = normalize_name(query).split()
+    i = 0
+    while i < len(words):
+        for n in range(min(MAX_NAME_WORDS, len(words) - i), 0, -1):
+            phrase = " ".join(words[i:i + n])
+            listing = index.by_name.get(phrase)
+            if listing and phrase not in _KEYWORDS:
+                found.append(listing.symbol)
+                i += n
+                break
+        else:
+            i += 1
+    return list(dict.fromkeys(found))[:MAX_SCOPED_SYMBOLS]
+
+
+def infer_scope(query: str) -> QueryScope:
+    return QueryScope(symbols=infer_symbols(query), sections=infer_sections(query))
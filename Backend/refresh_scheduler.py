@@ -0,0 +1,214 @@
+import asyncio
+import heapq
+import os
+import sys
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from section_parsers import COMPANY_SECTIONS
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+CRAWL_BUDGET_PER_HOUR = int(os.environ.get("CRAWL_BUDGET_PER_HOUR", "600"))
+REFRESH_CONCURRENCY = int(os.environ.get("REFRESH_CONCURRENCY", "4"))
+
+# How often each section is refreshed outside of results season
+SECTION_INTERVALS: Dict[str, float] = {
+    "basic_data": 1 * DAY,
+    "quarterly_results": 7 * DAY,
+    "balance_sheet": 30 * DAY,
+    "peer_comparison": 7 * DAY,
+    "profit_loss": 30 * DAY,
+    "cash_flow": 30 * DAY,
+    "ratios": 30 * DAY,
+    "shareholding_pattern": 14 * DAY,
+    "documents": 1 * DAY,
+    "concalls": 7 * DAY,
+}
+
+# Sections that change when a company publishes results, and how often to refresh them
+# while inside RESULTS_WINDOW of its upcoming result date
+RESULT_SECTIONS = {"basic_data", "quarterly_results", "profit_loss", "ratios", "documents", "concalls"}
+RESULTS_WINDOW = timedelta(days=3)
+RESULTS_SEASON_INTERVAL = 6 * HOUR
+
+# Sections that failed to fetch or parse are retried after this long
+RETRY_INTERVAL = 1 * HOUR
+
+# A section coming due within this long of one being refreshed rides along on the same page fetch
+COALESCE_WINDOW = 12 * HOUR
+
+RESULT_DATE_FORMATS = ("%d %b %Y", "%d %B %Y", "%b %d, %Y", "%B %d, %Y", "%Y-%m-%d")
+
+
+def parse_result_date(text: str) -> Optional[datetime]:
+    """Parses screener.in's "Upcoming result date" value, e.g. "12 Feb 2025"."""
+    for fmt in RESULT_DATE_FORMATS:
+        try:
+            return datetime.strptime(text.strip(), fmt)
+        except ValueError:
+            continue
+    return None
+
+
+class RefreshScheduler:
+    """
+    Decides which (symbol, section) pairs to refresh next.
+
+    Entries sit in a heap ordered by their next-due time. Sections that change with results are
+    refreshed every RESULTS_SEASON_INTERVAL around a company's upcoming result date and on their
+    normal SECTION_INTERVALS otherwise, but never scheduled past the start of that window. Each
+    refresh of a symbol is one page crawl (two when it includes a section that needs the page
+    rendered), and crawls are capped at `budget_per_hour` over a sliding one-hour window.
+    """
+
+    def __init__(self, budget_per_hour: int = CRAWL_BUDGET_PER_HOUR,
+                 intervals: Optional[Dict[str, float]] = None):
+        self.budget_per_hour = budget_per_hour
+        self.intervals = intervals or SECTION_INTERVALS
+        self.result_dates: Dict[str, datetime] = {}
+        self._queue: List[Tuple[float, str, str]] = []
+        self._crawls: deque = deque()
+
+    def __len__(self):
+        return len(self._queue)
+
+    def add_symbol(self, symbol: str, due_at: Optional[float] = None):
+        """Schedules every section of a symbol, due immediately unless `due_at` is given."""
+        due_at = time.time() if due_at is None else due_at
+        for section_name in self.intervals:
+            heapq.heappush(self._queue, (due_at, symbol, section_name))
+
+    def interval(self, symbol: str, section_name: str, now: float) -> float:
+        """Returns how long until a just-refreshed section is due again."""
+        interval = self.intervals[section_name]
+        result_date = self.result_dates.get(symbol)
+        if result_date and section_name in RESULT_SECTIONS:
+            if abs(datetime.fromtimestamp(now) - result_date) <= RESULTS_WINDOW:
+                return RESULTS_SEASON_INTERVAL
+            # Come due by the time the results window opens rather than skipping over it
+            window_opens = (result_date - RESULTS_WINDOW).timestamp()
+            if window_opens > now:
+                return min(interval, window_opens - now)
+        return interval
+
+    @staticmethod
+    def crawl_cost(section_names: List[str]) -> int:
+        """Page crawls a refresh of these sections takes: one static fetch and/or one browser render."""
+        needs_js = {COMPANY_SECTIONS[name].needs_js for name in section_names if name in COMPANY_SECTIONS}
+        return max(1, len(needs_js))
+
+    def record_refresh(self, symbol: str, section_names: List[str], sections_data: Optional[Dict] = None,
+                       now: Optional[float] = None):
+        """
+        Reschedules refreshed sections, picking up a new result date from quarterly results.
+        Sections missing from `sections_data` or holding an error are retried sooner.
+        """
+        now = time.time() if now is None else now
+        sections_data = sections_data or {}
+        quarterly = sections_data.get("quarterly_results")
+        if isinstance(quarterly, dict):
+            result_date = parse_result_date(quarterly.get("Upcoming result date", ""))
+            if result_date:
+                self.result_dates[symbol] = result_date
+        for section_name in section_names:
+            data = sections_data.get(section_name)
+            # An empty list or dict (no concalls yet) is a successful refresh, not a failure
+            if data is None or (isinstance(data, dict) and "error" in data):
+                delay = RETRY_INTERVAL
+            else:
+                delay = self.interval(symbol, section_name, now)
+            heapq.heappush(self._queue, (now + delay, symbol, section_name))
+
+    def pop_due(self, now: Optional[float] = None) -> Optional[Tuple[str, List[str]]]:
+        """
+        Removes and returns the most overdue symbol with every section of it due soon, or None
+        if nothing is due yet.
+        """
+        now = time.time() if now is None else now
+        if not self._queue or self._queue[0][0] > now:
+            return None
+        _, symbol, section_name = heapq.heappop(self._queue)
+        section_names = [section_name]
+        remaining = []
+        for entry in self._queue:
+            if entry[1] == symbol and entry[0] <= now + COALESCE_WINDOW:
+                section_names.append(entry[2])
+            else:
+                remaining.append(entry)
+        if len(remaining) != len(self._queue):
+            heapq.heapify(remaining)
+            self._queue = remaining
+        return symbol, section_names
+
+    def seconds_until_next(self, now: Optional[float] = None) -> float:
+        """Returns how long to wait before pop_due can return something and the budget allows a crawl."""
+        now = time.time() if now is None else now
+        while self._crawls and self._crawls[0] <= now - HOUR:
+            self._crawls.popleft()
+        wait = max(0.0, self._queue[0][0] - now) if self._queue else HOUR
+        if len(self._crawls) >= self.budget_per_hour:
+            wait = max(wait, self._crawls[0] + HOUR - now)
+        return wait
+
+    async def run(self, refresh: Callable[[str, List[str]], Awaitable[Optional[Dict]]],
+                  max_concurrency: int = REFRESH_CONCURRENCY):
+        """
+        Refreshes due sections forever, calling `refresh(symbol, section_names)`, which should
+        return the freshly parsed {section_name: data} dict (or None on failure).
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+        in_flight = set()
+
+        async def refresh_bounded(symbol, section_names):
+            try:
+                sections_data = await refresh(symbol, section_names)
+            except Exception as e:
+                print(f"Error refreshing {symbol}: {e}")
+                sections_data = None
+            finally:
+                semaphore.release()
+            self.record_refresh(symbol, section_names, sections_data)
+
+        while True:
+            wait = self.seconds_until_next()
+            if wait > 0:
+                await asyncio.sleep(min(wait, 60))
+                continue
+            await semaphore.acquire()
+            due = self.pop_due()
+            if due is None:
+                semaphore.release()
+                continue
+            self._crawls.extend([time.time()] * self.crawl_cost(due[1]))
+            task = asyncio.create_task(refresh_bounded(*due))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+
+
+async def run_watchlist(path: str):
+    """Keeps every symbol listed (one per line) in `path` refreshed."""
+    # Imported here so the scheduler itself doesn't pull in the ingestion clients
+    from crawl_main import ingest_symbol, ingestion_clients
+
+    async def refresh(symbol, section_names):
+        # The scheduler has already decided these sections are stale, so skip the snapshot cache
+        result = await ingest_symbol(symbol, section_names=section_names, max_age=dict.fromkeys(section_names, 0))
+        return result["data"]
+
+    scheduler = RefreshScheduler()
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                scheduler.add_symbol(line.strip().upper())
+    async with ingestion_clients():
+        await scheduler.run(refresh)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        sys.exit("Usage: python refresh_scheduler.py WATCHLIST_FILE")
+    asyncio.run(run_watchlist(sys.argv[1]))
@@ -0,0 +1,397 @@
+# The screener.in company page sections and their parsers. Kept free of import-time setup
+# (no OpenAI, Supabase or cache clients), so benchmarks can use the parsers without credentials.
+import re
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, Callable, Dict
+
+from table_parser import TableSpec, parse_markdown_table
+from dom_parsers import (
+    HtmlElement, select_first, parse_basic_data_dom, parse_quarterly_results_dom, parse_table_dom,
+    parse_peer_comparison_dom, parse_shareholding_dom, parse_documents_dom, parse_concalls_dom,
+)
+
+# Layouts of the year-wise financial tables on the screener.in company page
+BALANCE_SHEET_TABLE = TableSpec(exclude_rows=("Total Assets",))
+CASH_FLOW_TABLE = TableSpec(exclude_rows=("Net Cash Flow",))
+PROFIT_LOSS_TABLE = TableSpec(group_titles=(
+    "Compounded Sales Growth", "Compounded Profit Growth", "Stock Price CAGR", "Return on Equity"
+))
+RATIOS_TABLE = TableSpec()
+
+def parse_basic_data(markdown_text):
+    """Parses basic data markdown text into a JSON object."""
+    basic_data_json = {}
+    try:
+        lines = markdown_text.strip().split('\n')
+        for line in lines:
+            line = line.strip()
+            if line.startswith("* "):
+                parts = line[2:].split('  ', 1)
+                if len(parts) == 2:
+                    key = parts[0].strip()
+                    value = parts[1].strip()
+                    basic_data_json[key] = value
+        return basic_data_json
+    except Exception:
+        return None
+
+def parse_quarterly_results(text):
+    """Parses quarterly results markdown text into a JSON object."""
+    lines = text.strip().split('\n')
+    quarters = []
+    data_values = {}
+    upcoming_result_date = ""
+    try:
+        for i, line in enumerate(lines):
+            line = line.strip()
+            if i == 3:
+                quarters = [q.strip() for q in line.split('|') if q.strip()]
+            elif i > 4 and "Upcoming result date:" not in line and line and "---" not in line:
+                parts = [part.strip() for part in line.split('|')]
+                if len(parts) > 1:
+                    metric_name = parts[0]
+                    values = parts[1:]
+                    data_values[metric_name] = values
+            elif "Upcoming result date:" in line:
+                upcoming_result_date = line.split(": **")[1][:-2]
+
+        quarterly_json = {}
+        for metric, values in data_values.items():
+            quarterly_json[metric] = values
+        quarterly_json["Quarters"] = quarters
+        if upcoming_result_date:
+            quarterly_json["Upcoming result date"] = upcoming_result_date
+        return quarterly_json
+    except Exception:
+        return None
+
+def parse_balance_sheet(markdown_text):
+    """Parses balance sheet markdown text into a JSON object."""
+    return parse_markdown_table(markdown_text, BALANCE_SHEET_TABLE)
+
+def parse_peer_comparison(markdown_text):
+    """Parses peer comparison markdown text into a JSON object."""
+    try:
+        lines = [line for line in markdown_text.strip().split('\n') if line.strip()]
+        if len(lines) < 3:
+            return None
+
+        separator_line_index = -1
+        for i, line in enumerate(lines):
+            if '---' in line:
+                separator_line_index = i
+                break
+
+        if separator_line_index == -1 or separator_line_index == 0:
+            return None
+
+        header_line = lines[separator_line_index - 1]
+        headers = [h.strip() for h in header_line.split('|') if h.strip()]
+
+        if not headers:
+            return None
+
+        peer_list = []
+
+        for i in range(separator_line_index + 1, len(lines)):
+            line = lines[i].strip()
+            if not line or line.startswith("Detailed Comparison with:"):
+                continue
+
+            parts = [part.strip() for part in line.split('|')]
+            if len(parts) == len(headers):
+                peer_data = {}
+                for j, header in enumerate(headers):
+                    peer_data[header] = parts[j]
+                peer_list.append(peer_data)
+            elif line.startswith("Median:"):
+                median_parts = [part.replace("Median:","").strip() for part in line.split('|')]
+                median_parts = [part.strip() for part in median_parts]
+                if len(median_parts) == len(headers):
+                    median_data = {}
+                    for j, header in enumerate(headers):
+                        median_data[header] = median_parts[j]
+                    peer_list.append(median_data)
+        return peer_list
+    except Exception:
+        return None
+
+def parse_cash_flow(markdown_text):
+    """Parses cash flow markdown text into a JSON object."""
+    return parse_markdown_table(markdown_text, CASH_FLOW_TABLE)
+
+def parse_profit_loss(markdown_text):
+    """Parses profit & loss markdown text, including the growth ratio blocks, into a JSON object."""
+    return parse_markdown_table(markdown_text, PROFIT_LOSS_TABLE)
+
+def parse_ratios(markdown_text):
+    """Parses ratios markdown text into a JSON object."""
+    return parse_markdown_table(markdown_text, RATIOS_TABLE)
+
+def parse_shareholding(markdown_text):
+    """Parses shareholding pattern markdown text into a JSON object."""
+    try:
+        lines = [line for line in markdown_text.strip().split('\n') if line.strip()]
+        if len(lines) < 5:
+            return None
+
+        quarterly_data = {}
+        yearly_data = {}
+        current_section = None
+
+        for i, line in enumerate(lines):
+            line = line.strip()
+
+            if "Quarterly" in line:
+                current_section = "Quarterly"
+                quarterly_data["Quarters"] = []
+                continue
+            elif "Yearly" in line:
+                current_section = "Yearly"
+                yearly_data["Years"] = []
+                continue
+            elif "---" in line:
+                continue
+            elif i > 2 and current_section == "Quarterly":
+                if not quarterly_data.get("Quarters"):
+                    quarterly_headers = [h.strip() for h in lines[i-1].split('|') if h.strip()]
+                    quarterly_data["Quarters"] = quarterly_headers
+                else:
+                    parts = [part.strip() for part in line.split('|')]
+                    if parts and parts[0]:
+                        metric_name = parts[0]
+                        values = parts[1:] if len(parts) > 1 else []
+                        quarterly_data[metric_name] = values
+            elif i > 7 and current_section == "Yearly":
+                if not yearly_data.get("Years"):
+                    yearly_headers = [h.strip() for h in lines[i-1].split('|') if h.strip()]
+                    yearly_data["Years"] = yearly_headers
+                else:
+                    parts = [part.strip() for part in line.split('|')]
+                    if parts and parts[0]:
+                        metric_name = parts[0]
+                        values = parts[1:] if len(parts) > 1 else []
+                        yearly_data[metric_name] = values
+
+        shareholding_data = {}
+        if quarterly_data:
+            shareholding_data["Quarterly Shareholding"] = quarterly_data
+        if yearly_data:
+            shareholding_data["Yearly Shareholding"] = yearly_data
+        return shareholding_data
+    except Exception as e:
+        print(f"Parsing error in shareholding: {e}")
+        return None
+
+def parse_documents(markdown_text):
+    """Parses documents, EXCLUDING concalls, markdown text into a JSON object."""
+    try:
+        documents_data = {}
+        current_section = None
+        lines = markdown_text.strip().split('\n')
+
+        for line in lines:
+            line = line.strip()
+            if line.startswith("### Announcements"):
+                current_section = "Announcements"
+                documents_data[current_section] = []
+            elif line.startswith("### Annual reports"):
+                current_section = "Annual Reports"
+                documents_data[current_section] = []
+            elif line.startswith("### Credit ratings"):
+                current_section = "Credit Ratings"
+                documents_data[current_section] = []
+            elif line.startswith("### Concalls"):
+                current_section = "Concalls"
+                continue # Skip Concalls section
+
+            elif line.startswith("*"):
+                if current_section == "Credit Ratings":
+                    parts = line[1:].strip()
+                    link_match = parts.rsplit('](', 1)
+                    if len(link_match) == 2:
+                        text_part = link_match[0].strip()
+                        url_part = link_match[1].strip(')>')
+                        description = text_part
+                        documents_data[current_section].append({
+                            "description": description,
+                            "url": url_part
+                        })
+                elif current_section == "Announcements":
+                    parts = line[1:].strip()
+                    link_match = parts.rsplit('](', 1)
+                    if len(link_match) == 2:
+                        text_part = link_match[0].strip()
+                        url_part = link_match[1].strip(')>')
+                        date_match = re.search(r'^(.*?)\s*(\d+\s?\w+\s?\d{4}|\d+\s?\w+|\d+h)\s*-\s*(.*)$', text_part, re.IGNORECASE)
+                        if date_match:
+                            description_prefix = date_match.group(1).strip('- ').strip()
+                            date_info = date_match.group(2).strip()
+                            description_suffix = date_match.group(3).strip('- ').strip()
+                            description = (description_prefix + " - " + description_suffix).strip('- ').strip() if description_suffix else description_prefix
+                        else:
+                            description = text_part
+                            date_info = None
+                        documents_data[current_section].append({
+                            "description": description,
+                            "date": date_info,
+                            "url": url_part
+                        })
+                elif current_section == "Annual Reports":
+                    parts = line[1:].strip()
+                    link_match = parts.rsplit('](', 1)
+                    if len(link_match) == 2:
+                        text_part = link_match[0].strip()
+                        url_part = link_match[1].strip(')>')
+                        description_parts = text_part.rsplit('from', 1)
+                        if len(description_parts) == 2:
+                            description = description_parts[0].strip()
+                            source_info = description_parts[1].strip()
+                        else:
+                            description = text_part
+                            source_info = None
+                        documents_data[current_section].append({
+                            "description": description,
+                            "source": source_info,
+                            "url": url_part
+                        })
+        return documents_data
+    except Exception as e:
+        print(f"Parsing error in documents: {e}")
+        return None
+
+def parse_concalls(markdown_text):
+    """Parses concalls markdown text into a JSON object."""
+    concalls_data = []
+    entries = markdown_text.split('* ') # Split by each concall entry
+    for entry in entries:
+        entry = entry.strip()
+        if not entry or entry.startswith("### Concalls") or entry.startswith("Add Missing"):
+            continue
+
+        lines = entry.split('\n')
+        date = lines[0].strip()
+
+        concall_entry = {"Date": date}
+        for line in lines[1:]:
+            line = line.strip()
+            if line.startswith("[ Transcript ]"):
+                transcript_match = re.search(r'\[ Transcript \] ?\((.*?)\)', line)
+                if transcript_match:
+                    url_with_prefix = transcript_match.group(1)
+                    url = url_with_prefix.split("<")[-1].split(">")[0] if "<" in url_with_prefix else url_with_prefix
+                    concall_entry["Transcript"] = url.strip('"')
+            elif line.startswith("Notes"):
+                concall_entry["Notes"] = True # Simply mark presence of notes
+            elif line.startswith("[ PPT ]"):
+                ppt_match = re.search(r'\[ PPT \] ?\((.*?)\)', line)
+                if ppt_match:
+                    url_with_prefix = ppt_match.group(1)
+                    url = url_with_prefix.split("<")[-1].split(">")[0] if "<" in url_with_prefix else url_with_prefix
+                    concall_entry["PPT"] = url.strip('"')
+            elif line.startswith("[ REC ]"):
+                rec_match = re.search(r'\[ REC \] ?\((.*?)\)', line)
+                if rec_match:
+                    url_with_prefix = rec_match.group(1)
+                    url = url_with_prefix.split("<")[-1].split(">")[0] if "<" in url_with_prefix else url_with_prefix
+                    concall_entry["REC"] = url.strip('"')
+        concalls_data.append(concall_entry)
+    return concalls_data
+
+@dataclass(frozen=True)
+class SectionSpec:
+    selector: str
+    parser: Callable[[str], Any]
+    label: str  # Used in the error messages, e.g. "Unable to parse {label}"
+    dom_parser: Callable[[HtmlElement], Any]  # Reads the section straight from the parsed page
+    needs_js: bool = False  # Only present once the page's scripts have run
+
+# Every section scraped from the screener.in company page, in storage order
+COMPANY_SECTIONS: Dict[str, SectionSpec] = {
+    "basic_data": SectionSpec("#top-ratios", parse_basic_data, "basic data", parse_basic_data_dom),
+    "quarterly_results": SectionSpec("#quarters", parse_quarterly_results, "quarterly results data", parse_quarterly_results_dom),
+    "balance_sheet": SectionSpec("#balance-sheet", parse_balance_sheet, "balance sheet data", partial(parse_table_dom, spec=BALANCE_SHEET_TABLE)),
+    "peer_comparison": SectionSpec("#peers", parse_peer_comparison, "peer comparison data", parse_peer_comparison_dom, needs_js=True),
+    "profit_loss": SectionSpec("#profit-loss", parse_profit_loss, "profit & loss data", partial(parse_table_dom, spec=PROFIT_LOSS_TABLE)),
+    "cash_flow": SectionSpec("#cash-flow", parse_cash_flow, "cash flow data", partial(parse_table_dom, spec=CASH_FLOW_TABLE)),
+    "ratios": SectionSpec("#ratios", parse_ratios, "ratios data", partial(parse_table_dom, spec=RATIOS_TABLE)),
+    "shareholding_pattern": SectionSpec("#shareholding", parse_shareholding, "shareholding data", parse_shareholding_dom),
+    "documents": SectionSpec("#documents", parse_documents, "documents data", parse_documents_dom),
+    "concalls": SectionSpec(".concalls", parse_concalls, "concalls data", parse_concalls_dom),
+}
+
+def company_url(company_symbol):
+    """Returns the screener.in company page URL for a symbol."""
+    return f"https://www.screener.in/company/{company_symbol}/"
+
+def parse_max_age(values):
+    """
+    Parses repeated --max-age options into a {section_name: seconds} dict.
+
+    A bare number applies to every section; "section=seconds" overrides a single section.
+    """
+    max_age = {}
+    overrides = {}
+    for value in values:
+        section_name, _, seconds = value.rpartition("=")
+        if not section_name:
+            max_age = dict.fromkeys(COMPANY_SECTIONS, float(seconds))
+        elif section_name in COMPANY_SECTIONS:
+            overrides[section_name] = float(seconds)
+        else:
+            raise ValueError(f"unknown section '{section_name}'")
+    max_age.update(overrides)
+    return max_age
+
+def build_section_data(section_name, markdown_text):
+    """Runs the section parser over its markdown, returning an error dict on failure."""
+    spec = COMPANY_SECTIONS[section_name]
+    if not markdown_text:
+        return {"error": f"No {spec.label} found."}
+    parsed_json = spec.parser(markdown_text)
+    if parsed_json:
+        return parsed_json
+    return {"error": f"Unable to parse {spec.label}", "plain_text": markdown_text}
+
+def extract_section_markdown(html, css_selector, url):
+    """
+    Converts the part of a page matching css_selector to markdown, without a browser.
+
+    This is the same scraping and markdown generation crawl4ai applies inside arun(), so the
+    parsers see identical markdown whichever way the page was fetched.
+    """
+    # Only the markdown fallback needs crawl4ai, so the parsers import without it
+    from crawl4ai.content_scraping_strategy import WebScrapingStrategy
+    from crawl4ai.markdown_generation_strategy import DefaultMarkdownGenerator
+
+    scraped = WebScrapingStrategy().scrap(url, html, css_selector=css_selector)
+    cleaned_html = scraped.cleaned_html
+    if not cleaned_html:
+        return ""
+    return DefaultMarkdownGenerator().generate_markdown(cleaned_html=cleaned_html, base_url=url).raw_markdown
+
+def extract_section(section_name, root, html, url):
+    """
+    Reads one section from the parsed page with its DOM parser.
+
+    Falls back to the markdown parser when the DOM parser finds nothing (e.g. if screener.in
+    changes its markup), so a layout change degrades to the older path instead of losing data.
+    An empty list or dict (a company with no concalls or documents) is returned as it is.
+    """
+    spec = COMPANY_SECTIONS[section_name]
+    element = select_first(root, spec.selector)
+    if element is None:
+        return {"error": f"No {spec.label} found."}
+    try:
+        try:
+            parsed_json = spec.dom_parser(element)
+        except Exception as e:
+            print(f"DOM parsing error in {spec.label}: {e}")
+            parsed_json = None
+        if parsed_json is not None:
+            return parsed_json
+        return build_section_data(section_name, extract_section_markdown(html, spec.selector, url))
+    except Exception as e:
+        print(f"Error parsing {spec.label}: {e}")
+        return {"error": f"Unable to parse {spec.label}"}
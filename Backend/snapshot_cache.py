@@ -0,0 +1,83 @@
+import gzip
+import json
+import os
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+import xxhash
+
+SNAPSHOT_DIR = os.environ.get("SNAPSHOT_DIR", ".snapshots")
+SNAPSHOT_TTL = float(os.environ.get("SNAPSHOT_TTL", str(6 * 3600)))
+
+
+@dataclass
+class Snapshot:
+    url: str
+    html: str
+    fetched_at: float
+    content_hash: str
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+
+def content_hash(text: str) -> str:
+    """Returns the xxh3-128 hex digest of a string."""
+    return xxhash.xxh3_128_hexdigest(text.encode("utf-8"))
+
+
+def write_atomic(path: str, data: bytes):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class SnapshotCache:
+    """
+    On-disk cache of fetched HTML pages.
+
+    Layout under `root`:
+        index/<url hash>.json   -> {"url", "fetched_at", "content_hash"} for the latest fetch of a URL
+        blobs/<hh>/<hash>.html.gz -> gzipped page body, stored once per distinct content hash
+
+    Because bodies are content-addressed, re-fetching a page that hasn't changed only
+    rewrites its small index entry.
+    """
+
+    def __init__(self, root: str = SNAPSHOT_DIR, ttl: float = SNAPSHOT_TTL):
+        self.root = root
+        self.ttl = ttl
+
+    def _index_path(self, url: str) -> str:
+        return os.path.join(self.root, "index", f"{xxhash.xxh64_hexdigest(url)}.json")
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.root, "blobs", digest[:2], f"{digest}.html.gz")
+
+    def get(self, url: str, max_age: Optional[float] = None) -> Optional[Snapshot]:
+        """Returns the cached snapshot of `url` if it is younger than `max_age` (default: the TTL)."""
+        max_age = self.ttl if max_age is None else max_age
+        try:
+            with open(self._index_path(url), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            if entry["url"] != url or time.time() - entry["fetched_at"] > max_age:
+                return None
+            with gzip.open(self._blob_path(entry["content_hash"]), "rt", encoding="utf-8") as f:
+                html = f.read()
+        except (OSError, ValueError, KeyError):
+            return None
+        return Snapshot(url=url, html=html, fetched_at=entry["fetched_at"], content_hash=entry["content_hash"])
+
+    def put(self, url: str, html: str, fetched_at: Optional[float] = None) -> Snapshot:
+        """Stores a freshly fetched page and returns its snapshot."""
+        snapshot = Snapshot(url=url, html=html, fetched_at=fetched_at or time.time(), content_hash=content_hash(html))
+        blob_path = self._blob_path(snapshot.content_hash)
+        if not os.path.exists(blob_path):
+            write_atomic(blob_path, gzip.compress(html.encode("utf-8")))
+        entry = {"url": url, "fetched_at": snapshot.fetched_at, "content_hash": snapshot.content_hash}
+        write_atomic(self._index_path(url), json.dumps(entry).encode("utf-8"))
+        return snapshot
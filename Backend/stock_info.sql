@@ -2,6 +2,8 @@
 create extension if not exists vector;
 
 -- Create the stock info table
+-- embedding matches the default EMBEDDING_DIMENSIONS=1536 and EMBEDDING_STORAGE=vector; for other
+-- settings (e.g. halfvec(512)) run `python vector_schema.py` and apply the migration it prints
 create table stock_info (
     id bigserial primary key,
     url varchar not null,
@@ -15,17 +17,28 @@ create table stock_info (
     unique(url, chunk_number)
 );
 
--- Create an index for better vector similarity search performance
-create index on stock_info using ivfflat (embedding vector_cosine_ops);
+-- Create an index for better vector similarity search performance. HNSW needs no training
+-- data, so unlike ivfflat it can be created on the empty table and keeps its recall as rows
+-- arrive. vector_index.py rebuilds it (HNSW, or ivfflat sized to the row count) by this name.
+create index stock_info_embedding_idx on stock_info using hnsw (embedding vector_cosine_ops)
+    with (m = 16, ef_construction = 64);
 
 -- Create an index on metadata for faster filtering
 create index idx_stock_info_metadata on stock_info using gin (metadata);
 
+-- Btree index for company- (and section-) scoped searches: match_stock_info finds a company's
+-- chunks through it before ranking them by distance
+create index stock_info_scope_idx on stock_info ((metadata->>'company_symbol'), (metadata->>'section_name'));
+
 -- Create a function to search for stock info chunks
 create function match_stock_info (
     query_embedding vector(1536),
     match_count int default 10,
-    filter jsonb DEFAULT '{}'::jsonb
+    filter jsonb DEFAULT '{}'::jsonb,
+    ef_search int default null,
+    probes int default null,
+    symbols text[] default null,
+    sections text[] default null
 ) returns table (
     id bigint,
     url varchar,
@@ -40,20 +53,55 @@ language plpgsql
 as $$
 #variable_conflict use_column
 begin
-    return query
-    select
-        id,
-        url,
-        chunk_number,
-        title,
-        summary,
-        content,
-        metadata,
-        1 - (stock_info.embedding <=> query_embedding) as similarity
-    from stock_info
-    where metadata @> filter
-    order by stock_info.embedding <=> query_embedding
-    limit match_count;
+    -- Per-query recall/latency trade-off for the vector index; is_local = true keeps the
+    -- setting to this call's transaction
+    if ef_search is not null then
+        perform set_config('hnsw.ef_search', ef_search::text, true);
+    end if;
+    if probes is not null then
+        perform set_config('ivfflat.probes', probes::text, true);
+    end if;
+
+    if symbols is not null then
+        -- A company has only a handful of chunks: look them up through stock_info_scope_idx
+        -- and rank them exactly, rather than filtering the vector index's nearest neighbours
+        -- (which, across the whole corpus, rarely include the company's chunks)
+        return query
+        with scoped as materialized (
+            select * from stock_info
+            where metadata->>'company_symbol' = any(symbols)
+                and (sections is null or metadata->>'section_name' = any(sections))
+                and metadata @> filter
+        )
+        select
+            id,
+            url,
+            chunk_number,
+            title,
+            summary,
+            content,
+            metadata,
+            1 - (scoped.embedding <=> query_embedding) as similarity
+        from scoped
+        order by scoped.embedding <=> query_embedding
+        limit match_count;
+    else
+        return query
+        select
+            id,
+            url,
+            chunk_number,
+            title,
+            summary,
+            content,
+            metadata,
+            1 - (stock_info.embedding <=> query_embedding) as similarity
+        from stock_info
+        where metadata @> filter
+            and (sections is null or metadata->>'section_name' = any(sections))
+        order by stock_info.embedding <=> query_embedding
+        limit match_count;
+    end if;
 end;
 $$;
 
@@ -0,0 +1,169 @@
+import asyncio
+import csv
+import difflib
+import os
+import re
+import sys
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from http_fetch import get_http_client, close_http_client
+
+SYMBOL_LISTING_FILE = os.environ.get("SYMBOL_LISTING_FILE", "EQUITY_L.csv")
+NSE_LISTING_URL = "https://nsearchives.nseindia.com/content/equities/EQUITY_L.csv"
+
+MAX_PREFIX_MATCHES = 8
+# A prefix shorter than this ("t", "tata") only resolves when a single listing starts with it
+MIN_PREFIX_LENGTH = 10
+FUZZY_CUTOFF = 0.8
+
+# Column names used by the NSE (EQUITY_L.csv) and BSE equity listing downloads
+SYMBOL_COLUMNS = ("SYMBOL", "Security Id")
+NAME_COLUMNS = ("NAME OF COMPANY", "Security Name", "Issuer Name")
+
+_NAME_SUFFIXES = re.compile(r"\b(limited|ltd|the)\b")
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+
+@dataclass(frozen=True)
+class Listing:
+    symbol: str
+    name: str
+    exchange: str
+
+
+def normalize_name(name: str) -> str:
+    """Lowercases a company name and drops punctuation and "limited"/"ltd" suffixes."""
+    name = _NAME_SUFFIXES.sub(" ", name.lower())
+    return " ".join(_NON_ALNUM.sub(" ", name).split())
+
+
+class _TrieNode:
+    __slots__ = ("children", "listings")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.listings: List[Listing] = []
+
+
+class SymbolIndex:
+    """
+    In-memory lookup from user input ("engineers india", "ENGINERSIN") to an exchange listing.
+
+    Resolution order: exact symbol, exact normalized name, name/symbol prefix (via a trie whose
+    nodes keep the shortest few names passing through them), then fuzzy name matching. A short
+    prefix shared by several listings is ambiguous: `lookup` returns all of them to choose from
+    and `resolve` returns None.
+    """
+
+    def __init__(self, listings: List[Listing]):
+        self.by_symbol: Dict[str, Listing] = {}
+        self.by_name: Dict[str, Listing] = {}
+        self.root = _TrieNode()
+        # Shorter names first, so each trie node keeps the closest completions
+        for listing in sorted(listings, key=lambda l: len(l.name)):
+            self.by_symbol.setdefault(listing.symbol, listing)
+            key = normalize_name(listing.name)
+            self.by_name.setdefault(key, listing)
+            self._insert(key, listing)
+            self._insert(listing.symbol.lower(), listing)
+        self._names = list(self.by_name)
+
+    def _insert(self, key: str, listing: Listing):
+        node = self.root
+        for char in key:
+            node = node.children.setdefault(char, _TrieNode())
+            if len(node.listings) < MAX_PREFIX_MATCHES and listing not in node.listings:
+                node.listings.append(listing)
+
+    def complete(self, prefix: str) -> List[Listing]:
+        """Returns up to MAX_PREFIX_MATCHES listings whose name or symbol starts with prefix."""
+        node = self.root
+        for char in normalize_name(prefix):
+            node = node.children.get(char)
+            if node is None:
+                return []
+        return list(node.listings)
+
+    def lookup(self, user_input: str) -> List[Listing]:
+        """
+        Returns the listings a symbol or company name may refer to. One listing means the input
+        resolved; several (e.g. every "tata" company) mean the caller has to choose.
+        """
+        query = user_input.strip()
+        if not query:
+            return []
+        listing = self.by_symbol.get(query.replace(" ", "").upper())
+        if listing:
+            return [listing]
+        key = normalize_name(query)
+        listing = self.by_name.get(key)
+        if listing:
+            return [listing]
+        completions = self.complete(key)
+        if len(completions) > 1 and len(key) < MIN_PREFIX_LENGTH:
+            return completions
+        if completions:
+            return completions[:1]
+        close = difflib.get_close_matches(key, self._names, n=1, cutoff=FUZZY_CUTOFF)
+        return [self.by_name[close[0]]] if close else []
+
+    def resolve(self, user_input: str) -> Optional[Listing]:
+        """Returns the listing a symbol or company name unambiguously refers to, or None."""
+        matches = self.lookup(user_input)
+        return matches[0] if len(matches) == 1 else None
+
+
+def load_listings(path: str, exchange: str = "NSE") -> List[Listing]:
+    """Reads an NSE or BSE equity listing CSV into Listing records."""
+    listings = []
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        columns = {name.strip(): name for name in reader.fieldnames or []}
+        symbol_column = next((columns[c] for c in SYMBOL_COLUMNS if c in columns), None)
+        name_column = next((columns[c] for c in NAME_COLUMNS if c in columns), None)
+        if not symbol_column or not name_column:
+            raise ValueError(f"{path} has no recognisable symbol/name columns: {reader.fieldnames}")
+        for row in reader:
+            symbol = (row.get(symbol_column) or "").strip().upper()
+            name = (row.get(name_column) or "").strip()
+            if symbol and name:
+                listings.append(Listing(symbol=symbol, name=name, exchange=exchange))
+    return listings
+
+
+_index: Optional[SymbolIndex] = None
+
+
+def get_symbol_index() -> Optional[SymbolIndex]:
+    """Returns the process-wide index built from SYMBOL_LISTING_FILE, or None if it is missing."""
+    global _index
+    if _index is None and os.path.exists(SYMBOL_LISTING_FILE):
+        try:
+            _index = SymbolIndex(load_listings(SYMBOL_LISTING_FILE))
+        except (OSError, ValueError) as e:
+            print(f"Unable to load symbol listing: {e}")
+    return _index
+
+
+async def download_listing(path: str = SYMBOL_LISTING_FILE, url: str = NSE_LISTING_URL):
+    """Downloads the current NSE equity listing to `path`."""
+    try:
+        response = await get_http_client().get(url)
+        response.raise_for_status()
+        with open(path, "wb") as f:
+            f.write(response.content)
+        print(f"Saved {url} to {path}")
+    finally:
+        await close_http_client()
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ["--download"]:
+        asyncio.run(download_listing())
+    else:
+        index = get_symbol_index()
+        if index is None:
+            sys.exit(f"No listing file at {SYMBOL_LISTING_FILE}; run with --download first")
+        for listing in index.lookup(" ".join(sys.argv[1:]) or input("Enter a stock symbol or company name: ")):
+            print(listing)
@@ -0,0 +1,75 @@
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+# A markdown table separator row with any number of columns, e.g. "---|---|---" or "|:---|---:|"
+SEPARATOR_RE = re.compile(r"^\|?\s*:?-{3,}:?\s*(\|\s*:?-{3,}:?\s*)*\|?$")
+
+
+@dataclass(frozen=True)
+class TableSpec:
+    """Describes how one screener.in table section maps onto its JSON structure."""
+    periods_key: str = "Years"  # Key holding the column headers (periods)
+    exclude_rows: Tuple[str, ...] = ()  # Rows whose metric name contains any of these are dropped
+    group_titles: Tuple[str, ...] = ()  # Titles of trailing "label: value" blocks after the table
+    groups_key: str = "Growth Ratios"  # Key the trailing blocks are collected under
+
+
+def is_separator(line: str) -> bool:
+    return bool(SEPARATOR_RE.match(line))
+
+
+def split_row(line: str):
+    """Splits a table row into cells; outer pipes ("| a | b |") don't add empty cells."""
+    line = line.strip()
+    if line.startswith('|'):
+        line = line[1:]
+    if line.endswith('|'):
+        line = line[:-1]
+    return [part.strip() for part in line.split('|')]
+
+
+def parse_markdown_table(markdown_text: str, spec: TableSpec) -> Optional[Dict[str, Any]]:
+    """
+    Parses a screener.in table section (as markdown) in a single pass.
+
+    The header row is whichever line precedes the first separator row, so any period range
+    and column count is handled. Each following row becomes `metric: [values...]`. Blocks
+    titled with one of `spec.group_titles` (profit & loss growth ratios) are collected as
+    `{title: {label: value}}` under `spec.groups_key`. Returns None if there is no table.
+    """
+    data: Dict[str, Any] = {}
+    groups: Dict[str, Dict[str, str]] = {}
+    current_group = None
+    in_table = False
+    previous = ""
+
+    for raw_line in markdown_text.split('\n'):
+        line = raw_line.strip()
+        if not line:
+            continue
+
+        title = next((t for t in spec.group_titles if t in line), None)
+        if title:
+            current_group = title
+            groups[title] = {}
+        elif current_group:
+            if ":" in line and not is_separator(line):
+                label, value = line.split(':', 1)
+                groups[current_group][label.strip(' |')] = value.strip(' |')
+        elif is_separator(line):
+            if not in_table and previous:
+                data[spec.periods_key] = [h for h in split_row(previous) if h]
+                in_table = True
+        elif in_table and '|' in line:
+            parts = split_row(line)
+            metric_name = parts[0]
+            if metric_name and not any(excluded in metric_name for excluded in spec.exclude_rows):
+                data[metric_name] = parts[1:]
+        previous = line
+
+    if not in_table:
+        return None
+    if spec.group_titles:
+        data[spec.groups_key] = groups
+    return data
@@ -0,0 +1,91 @@
+import asyncio
+import json
+from contextlib import asynccontextmanager
+
+from bulk_load import COLUMNS, STAGING_TABLE, BulkLoader, copy_record, merge_sql
+
+
+class FakeConnection:
+    def __init__(self, fail_copy=False):
+        self.fail_copy = fail_copy
+        self.copied = []
+        self.statements = []
+
+    async def copy_records_to_table(self, table, records, columns):
+        if self.fail_copy:
+            raise ValueError("invalid input for embedding")
+        assert table == STAGING_TABLE and columns == COLUMNS
+        self.copied.append(records)
+
+    async def execute(self, sql):
+        self.statements.append(sql)
+        return "INSERT 0 3"
+
+    @asynccontextmanager
+    async def transaction(self):
+        yield
+
+
+class FakePool:
+    def __init__(self, conn):
+        self.conn = conn
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield self.conn
+
+
+def chunk(url, chunk_number, content="text"):
+    return {
+        "url": url, "chunk_number": chunk_number, "title": "Ratios", "summary": "s", "content": content,
+        "metadata": {"company_symbol": "INFY", "section": "ratios"}, "embedding": [0.1, 0.2],
+    }
+
+
+def test_copy_record_matches_columns():
+    record = copy_record(chunk("u", 1))
+    assert len(record) == len(COLUMNS)
+    assert record[:5] == ("u", 1, "Ratios", "s", "text")
+    assert json.loads(record[COLUMNS.index("metadata")]) == {"company_symbol": "INFY", "section": "ratios"}
+    assert record[COLUMNS.index("embedding")] == [0.1, 0.2]
+
+
+def test_merge_keeps_newest_staged_row_per_key():
+    sql = merge_sql()
+    assert f"select distinct on (url, chunk_number) {', '.join(COLUMNS)} from {STAGING_TABLE}" in sql
+    assert "order by url, chunk_number, id desc" in sql
+    assert "on conflict (url, chunk_number) do update set title = excluded.title" in sql
+    assert "url = excluded" not in sql
+
+
+def test_stages_batches_and_merges():
+    conn = FakeConnection()
+    loader = BulkLoader(FakePool(conn), batch_rows=2, flush_seconds=60)
+
+    async def run():
+        await loader.prepare()
+        results = await asyncio.gather(*(loader.write(chunk("u", n)) for n in (1, 2, 1)), loader.finish())
+        return results
+
+    *results, merged = asyncio.run(run())
+    assert [(r.chunk_number, r.ok) for r in results] == [(1, True), (2, True), (1, True)]
+    assert [len(records) for records in conn.copied] == [2, 1]
+    assert merged == 3
+    assert conn.statements[0] == f"drop table if exists {STAGING_TABLE}"
+    assert conn.statements[1].startswith(f"create unlogged table {STAGING_TABLE} (like stock_info")
+    assert conn.statements[2:] == [merge_sql(), f"drop table {STAGING_TABLE}"]
+
+
+def test_failed_copy_fails_its_rows():
+    loader = BulkLoader(FakePool(FakeConnection(fail_copy=True)), batch_rows=10, flush_seconds=60)
+
+    async def run():
+        writes = asyncio.gather(loader.write(chunk("u", 1)), loader.write(chunk("u", 2)))
+        await asyncio.sleep(0)  # let both writes queue
+        await loader.flush()
+        return await writes
+
+    results = asyncio.run(run())
+    assert [r.ok for r in results] == [False, False]
+    assert results[0].error == "invalid input for embedding"
+    assert (loader.written, loader.failed) == (0, 2)
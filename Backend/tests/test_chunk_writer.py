@@ -0,0 +1,84 @@
+import asyncio
+
+from chunk_writer import ChunkWriter
+
+
+class FakeChunkWriter(ChunkWriter):
+    """Records upserts instead of sending them; rows whose content is "bad" are rejected."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.upserts = []
+
+    async def _upsert(self, rows):
+        self.upserts.append([(row["url"], row["chunk_number"], row["content"]) for row in rows])
+        if any(row["content"] == "bad" for row in rows):
+            raise ValueError("invalid row")
+
+
+def chunk(url, chunk_number, content="text"):
+    return {"url": url, "chunk_number": chunk_number, "content": content}
+
+
+def test_flushes_on_batch_size():
+    writer = FakeChunkWriter(flush_rows=2, flush_seconds=60)
+
+    async def run():
+        return await asyncio.wait_for(asyncio.gather(writer.write(chunk("a", 1)), writer.write(chunk("a", 2))), 1)
+
+    results = asyncio.run(run())
+    assert [r.ok for r in results] == [True, True]
+    assert writer.upserts == [[("a", 1, "text"), ("a", 2, "text")]]
+
+
+def test_flushes_on_timer():
+    writer = FakeChunkWriter(flush_rows=100, flush_seconds=0.01)
+
+    async def run():
+        return await asyncio.wait_for(asyncio.gather(writer.write(chunk("a", 1)), writer.write(chunk("b", 1))), 1)
+
+    results = asyncio.run(run())
+    assert [r.ok for r in results] == [True, True]
+    assert len(writer.upserts) == 1
+
+
+def test_flush_writes_what_is_queued():
+    writer = FakeChunkWriter(flush_rows=100, flush_seconds=60)
+
+    async def run():
+        write = asyncio.ensure_future(writer.write(chunk("a", 1)))
+        await asyncio.sleep(0)
+        await writer.flush()
+        return write.result()
+
+    assert asyncio.run(run()).ok
+    assert writer.written == 1
+
+
+def test_newest_row_per_key_wins():
+    writer = FakeChunkWriter(flush_rows=3, flush_seconds=60)
+
+    async def run():
+        return await asyncio.gather(
+            writer.write(chunk("a", 1, "old")), writer.write(chunk("a", 2)), writer.write(chunk("a", 1, "new")),
+        )
+
+    old, other, new = asyncio.run(run())
+    assert (old.ok, old.error) == (False, "superseded")
+    assert other.ok and new.ok
+    assert writer.upserts == [[("a", 1, "new"), ("a", 2, "text")]]
+
+
+def test_rejected_batch_retries_row_by_row():
+    writer = FakeChunkWriter(flush_rows=3, flush_seconds=60)
+
+    async def run():
+        return await asyncio.gather(
+            writer.write(chunk("a", 1)), writer.write(chunk("a", 2, "bad")), writer.write(chunk("b", 1)),
+        )
+
+    results = asyncio.run(run())
+    assert [(r.url, r.chunk_number, r.ok) for r in results] == [("a", 1, True), ("a", 2, False), ("b", 1, True)]
+    assert results[1].error == "invalid row"
+    assert [len(rows) for rows in writer.upserts] == [3, 1, 1, 1]
+    assert (writer.written, writer.failed) == (2, 1)
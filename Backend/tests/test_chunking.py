@@ -0,0 +1,77 @@
+import json
+
+from chunking import chunk_section, chunk_text, count_tokens
+
+
+def quarterly_table(metrics, quarters):
+    table = {"Quarters": [f"Q{i} 20{10 + i // 4}" for i in range(quarters)]}
+    for m in range(metrics):
+        table[f"Metric {m}"] = [str(1000 + m * quarters + i) for i in range(quarters)]
+    table["Upcoming result date"] = "12 Nov 2026"
+    return table
+
+
+def test_small_section_is_one_chunk():
+    chunks = chunk_section("INFY", "basic_data", {"Market Cap": "6,12,345", "Stock P/E": "25.4"})
+    assert [json.loads(chunk) for chunk in chunks] == [{
+        "company_symbol": "INFY",
+        "section": "basic_data",
+        "data": {"Market Cap": "6,12,345", "Stock P/E": "25.4"},
+    }]
+
+
+def test_table_chunks_fit_budget_and_repeat_header():
+    table = quarterly_table(metrics=30, quarters=4)
+    chunks = chunk_section("INFY", "quarterly_results", table, max_tokens=300)
+    assert len(chunks) > 1
+    metrics = {}
+    for chunk in chunks:
+        assert count_tokens(chunk) <= 300
+        data = json.loads(chunk)["data"]
+        assert data["Quarters"] == table["Quarters"]
+        assert data["Upcoming result date"] == "12 Nov 2026"
+        metrics.update((k, v) for k, v in data.items() if k.startswith("Metric"))
+    # Every row survives the split, whole and in order
+    assert metrics == {k: v for k, v in table.items() if k.startswith("Metric")}
+
+
+def test_wide_table_is_cut_into_period_windows():
+    table = quarterly_table(metrics=2, quarters=60)
+    chunks = chunk_section("INFY", "quarterly_results", table, max_tokens=150)
+    periods = []
+    for chunk in chunks:
+        assert count_tokens(chunk) <= 150
+        data = json.loads(chunk)["data"]
+        assert len(data["Quarters"]) < 60
+        for metric in ("Metric 0", "Metric 1"):
+            assert len(data.get(metric, data["Quarters"])) == len(data["Quarters"])
+        if "Metric 0" in data:
+            periods.extend(data["Quarters"])
+    assert periods == table["Quarters"]
+
+
+def test_lists_split_by_entry():
+    entries = [{"description": f"Announcement {i} about the board meeting", "url": f"/a/{i}"} for i in range(40)]
+    chunks = chunk_section("INFY", "documents", {"Announcements": entries}, max_tokens=120)
+    collected = []
+    for chunk in chunks:
+        assert count_tokens(chunk) <= 120
+        part = json.loads(chunk)
+        assert part["table"] == "Announcements"
+        collected.extend(part["data"])
+    assert collected == entries
+
+
+def test_chunk_text_fits_budget():
+    text = "\n\n".join(f"Paragraph {i}. " + "Revenue grew on strong demand. " * (i % 3 + 1) for i in range(30))
+    chunks = chunk_text(text, max_tokens=80)
+    assert len(chunks) > 1
+    assert all(count_tokens(chunk) <= 80 for chunk in chunks)
+    assert " ".join(" ".join(chunks).split()) == " ".join(text.split())
+
+
+def test_chunk_text_slices_text_without_breaks():
+    text = "x" * 5000
+    chunks = chunk_text(text, max_tokens=100)
+    assert all(count_tokens(chunk) <= 100 for chunk in chunks)
+    assert "".join(chunks).replace("\n\n", "") == text
@@ -0,0 +1,168 @@
+import asyncio
+import gzip
+import json
+import os
+
+import httpx
+import pytest
+
+from document_store import DocumentStore
+
+URL = "https://www.bseindia.com/reports/annual-2026.pdf"
+BODY = bytes(range(256)) * 1000
+ETAG = '"v1"'
+
+
+class Body(httpx.AsyncByteStream):
+    """A streamed response body, so the store reads it with aiter_raw as it would off the network."""
+
+    def __init__(self, data, block=16 * 1024, fail_after=None):
+        self.data = data
+        self.block = block
+        self.fail_after = fail_after  # Drop the connection after this many bytes
+
+    async def __aiter__(self):
+        for start in range(0, len(self.data), self.block):
+            if self.fail_after is not None and start >= self.fail_after:
+                raise httpx.ReadError("connection reset")
+            yield self.data[start:start + self.block]
+
+
+class Server:
+    """A MockTransport handler serving one document; `respond` can be swapped per test."""
+
+    def __init__(self):
+        self.requests = []
+        self.respond = self.full
+
+    def __call__(self, request):
+        self.requests.append(request)
+        return self.respond(request)
+
+    def full(self, request):
+        return httpx.Response(200, headers={"ETag": ETAG}, stream=Body(BODY))
+
+
+@pytest.fixture
+def server():
+    return Server()
+
+
+@pytest.fixture
+def store(tmp_path, server):
+    return DocumentStore(str(tmp_path), transport=httpx.MockTransport(server))
+
+
+def fetch(store, **kwargs):
+    return asyncio.run(store.fetch(URL, **kwargs))
+
+
+def stored(download):
+    with open(download.path, "rb") as f:
+        return f.read()
+
+
+def write_partial(store, body, validators):
+    part_path = store._partial_path(URL)
+    os.makedirs(os.path.dirname(part_path), exist_ok=True)
+    with open(part_path, "wb") as f:
+        f.write(body)
+    with open(part_path[:-len(".part")] + ".json", "w", encoding="utf-8") as f:
+        json.dump(validators, f)
+    return part_path
+
+
+def test_full_download(store, server):
+    download = fetch(store)
+    assert stored(download) == BODY
+    assert (download.size, download.bytes_transferred, download.changed) == (len(BODY), len(BODY), True)
+    assert store.lookup(URL)["etag"] == ETAG
+    assert not os.path.exists(store._partial_path(URL))
+
+
+def test_resumes_partial_download(store, server):
+    write_partial(store, BODY[:1000], {"etag": ETAG, "last_modified": None})
+
+    def resume(request):
+        assert request.headers["Range"] == "bytes=1000-"
+        assert request.headers["If-Range"] == ETAG
+        return httpx.Response(206, headers={"ETag": ETAG}, stream=Body(BODY[1000:]))
+
+    server.respond = resume
+    download = fetch(store)
+    assert stored(download) == BODY
+    assert download.bytes_transferred == len(BODY) - 1000
+
+
+def test_full_body_in_answer_to_range_restarts(store, server):
+    write_partial(store, b"stale bytes from an older version", {"etag": '"v0"', "last_modified": None})
+    download = fetch(store)
+    assert "Range" in server.requests[0].headers
+    assert stored(download) == BODY
+    assert download.size == len(BODY)
+
+
+def test_not_modified_reuses_stored_copy(store, server):
+    first = fetch(store)
+
+    def not_modified(request):
+        assert request.headers["If-None-Match"] == ETAG
+        return httpx.Response(304)
+
+    server.respond = not_modified
+    again = fetch(store)
+    assert (again.changed, again.bytes_transferred, again.content_hash) == (False, 0, first.content_hash)
+
+
+def test_not_modified_without_stored_copy_refetches(store, server):
+    def cache_in_between(request):
+        if request.headers.get("Cache-Control") == "no-cache":
+            return server.full(request)
+        return httpx.Response(304)
+
+    server.respond = cache_in_between
+    download = fetch(store)
+    assert stored(download) == BODY
+    assert len(server.requests) == 2
+
+
+def test_forced_not_modified_without_stored_copy_fails(store, server):
+    server.respond = lambda request: httpx.Response(304)
+    assert fetch(store, force=True) is None
+    assert len(server.requests) == 1
+
+
+def test_aborts_over_max_bytes(store, server):
+    assert fetch(store, max_bytes=len(BODY) - 1) is None
+    assert not os.path.exists(store._partial_path(URL))
+    assert store.lookup(URL) is None
+
+
+def test_interrupted_download_resumes_on_next_fetch(store, server):
+    server.respond = lambda request: httpx.Response(200, headers={"ETag": ETAG}, stream=Body(BODY, fail_after=len(BODY) // 2))
+    assert fetch(store) is None
+    kept = os.path.getsize(store._partial_path(URL))
+    assert 0 < kept < len(BODY)
+
+    server.respond = lambda request: httpx.Response(206, headers={"ETag": ETAG}, stream=Body(BODY[kept:]))
+    download = fetch(store)
+    assert server.requests[-1].headers["Range"] == f"bytes={kept}-"
+    assert stored(download) == BODY
+    assert download.bytes_transferred == len(BODY) - kept
+
+
+def test_encoded_body_is_decoded_and_not_resumable(store, server):
+    body = os.urandom(len(BODY))  # Incompressible, so the encoded body spans many blocks
+    encoded = gzip.compress(body)
+    server.respond = lambda request: httpx.Response(
+        200, headers={"ETag": ETAG, "Content-Encoding": "gzip"}, stream=Body(encoded, fail_after=len(encoded) // 2)
+    )
+    assert fetch(store) is None
+    assert server.requests[0].headers["Accept-Encoding"] == "identity"
+
+    server.respond = lambda request: httpx.Response(
+        200, headers={"ETag": ETAG, "Content-Encoding": "gzip"}, stream=Body(encoded)
+    )
+    download = fetch(store)
+    assert "Range" not in server.requests[-1].headers
+    assert stored(download) == body
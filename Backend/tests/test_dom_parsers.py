@@ -0,0 +1,170 @@
+from dom_parsers import (
+    parse_basic_data_dom, parse_concalls_dom, parse_documents_dom, parse_html, parse_peer_comparison_dom,
+    parse_quarterly_results_dom, parse_shareholding_dom, parse_table_dom, select_first,
+)
+from table_parser import TableSpec
+
+TOP_RATIOS = """
+<ul id="top-ratios">
+  <li><span class="name">Market Cap</span><span class="value">&#8377; 6,12,345 Cr.</span></li>
+  <li><span class="name">Stock P/E</span><span class="value">25.4</span></li>
+  <li><span class="name">No value</span></li>
+</ul>
+"""
+
+PROFIT_LOSS = """
+<section id="profit-loss">
+  <table class="data-table">
+    <thead><tr><th></th><th>Mar 2022</th><th>Mar 2023</th></tr></thead>
+    <tbody>
+      <tr><td>Sales&nbsp;+</td><td>100</td><td>120</td></tr>
+      <tr><td>Net Profit</td><td>10</td><td>12</td></tr>
+      <tr><td>Raw PDF</td><td></td><td></td></tr>
+    </tbody>
+  </table>
+  <table class="ranges-table">
+    <tr><th>Compounded Sales Growth</th></tr>
+    <tr><td>10 Years:</td><td>12%</td></tr>
+    <tr><td>5 Years:</td><td>9%</td></tr>
+  </table>
+  <table class="ranges-table">
+    <tr><th>Something Else</th></tr>
+    <tr><td>TTM:</td><td>1%</td></tr>
+  </table>
+</section>
+"""
+
+QUARTERS = """
+<section id="quarters">
+  <p>Upcoming result date: <strong>12 Nov 2026</strong></p>
+  <table class="data-table">
+    <tr><th></th><th>Jun 2026</th><th>Sep 2026</th></tr>
+    <tr><td>Sales</td><td>30</td><td>32</td></tr>
+  </table>
+</section>
+"""
+
+PEERS = """
+<section id="peers">
+  <table class="data-table">
+    <tr><th>S.No.</th><th>Name</th><th>CMP Rs.</th></tr>
+    <tr><td>1.</td><td>Infosys</td><td>1500</td></tr>
+    <tr><td>2.</td><td>TCS</td><td>3900</td></tr>
+    <tr><td></td><td>Median: 2 Co.</td><td>2700</td></tr>
+    <tr><td>Incomplete</td></tr>
+  </table>
+</section>
+"""
+
+SHAREHOLDING = """
+<section id="shareholding">
+  <div id="quarterly-shp">
+    <table class="data-table">
+      <tr><th></th><th>Jun 2026</th></tr>
+      <tr><td>Promoters</td><td>45.00%</td></tr>
+    </table>
+  </div>
+</section>
+"""
+
+DOCUMENTS = """
+<section id="documents">
+  <div class="documents">
+    <h3>Announcements</h3>
+    <ul>
+      <li><a href="/a/1">Board Meeting<div>2 Oct 2026 - Outcome of the meeting</div></a></li>
+      <li><a>No link</a></li>
+    </ul>
+  </div>
+  <div class="documents">
+    <h3>Annual Reports</h3>
+    <ul><li><a href="https://example.com/ar.pdf">Financial Year 2026 from bse</a></li></ul>
+  </div>
+  <div class="documents">
+    <h3>Credit ratings</h3>
+    <ul><li><a href="/r/1">Rating update</a></li></ul>
+  </div>
+  <div class="documents concalls">
+    <h3>Concalls</h3>
+    <ul>
+      <li>
+        <div>Oct 2026</div>
+        <a href="/t.pdf">Transcript</a>
+        <button>Notes</button>
+        <a href="/p.pdf">PPT</a>
+        <a>REC</a>
+      </li>
+      <li><a href="/x.pdf">Transcript</a></li>
+    </ul>
+  </div>
+</section>
+"""
+
+
+def section(html_text, selector, base_url=None):
+    return select_first(parse_html(html_text, base_url), selector)
+
+
+def test_basic_data_pairs():
+    assert parse_basic_data_dom(section(TOP_RATIOS, "#top-ratios")) == {
+        "Market Cap": "₹ 6,12,345 Cr.",
+        "Stock P/E": "25.4",
+    }
+
+
+def test_table_with_growth_groups():
+    spec = TableSpec(exclude_rows=("Raw PDF",), group_titles=("Compounded Sales Growth",))
+    assert parse_table_dom(section(PROFIT_LOSS, "#profit-loss"), spec) == {
+        "Years": ["Mar 2022", "Mar 2023"],
+        "Sales +": ["100", "120"],
+        "Net Profit": ["10", "12"],
+        "Growth Ratios": {"Compounded Sales Growth": {"10 Years": "12%", "5 Years": "9%"}},
+    }
+
+
+def test_table_missing():
+    assert parse_table_dom(section(TOP_RATIOS, "#top-ratios"), TableSpec()) is None
+
+
+def test_quarterly_results_with_upcoming_date():
+    assert parse_quarterly_results_dom(section(QUARTERS, "#quarters")) == {
+        "Quarters": ["Jun 2026", "Sep 2026"],
+        "Sales": ["30", "32"],
+        "Upcoming result date": "12 Nov 2026",
+    }
+
+
+def test_peer_rows_match_headers():
+    peers = parse_peer_comparison_dom(section(PEERS, "#peers"))
+    assert [peer["Name"] for peer in peers] == ["Infosys", "TCS", "Median: 2 Co."]
+    assert peers[0] == {"S.No.": "1.", "Name": "Infosys", "CMP Rs.": "1500"}
+
+
+def test_shareholding_skips_missing_tabs():
+    assert parse_shareholding_dom(section(SHAREHOLDING, "#shareholding")) == {
+        "Quarterly Shareholding": {"Quarters": ["Jun 2026"], "Promoters": ["45.00%"]},
+    }
+    assert parse_shareholding_dom(section(TOP_RATIOS, "#top-ratios")) is None
+
+
+def test_documents_by_heading():
+    documents = parse_documents_dom(section(DOCUMENTS, "#documents", "https://www.screener.in/company/INFY/"))
+    assert documents == {
+        "Announcements": [{
+            "description": "Board Meeting - Outcome of the meeting",
+            "date": "2 Oct 2026",
+            "url": "https://www.screener.in/a/1",
+        }],
+        "Annual Reports": [{
+            "description": "Financial Year 2026",
+            "source": "bse",
+            "url": "https://example.com/ar.pdf",
+        }],
+        "Credit Ratings": [{"description": "Rating update", "url": "https://www.screener.in/r/1"}],
+    }
+
+
+def test_concalls_need_a_date():
+    assert parse_concalls_dom(section(DOCUMENTS, ".concalls")) == [
+        {"Date": "Oct 2026", "Transcript": "/t.pdf", "Notes": True, "PPT": "/p.pdf"},
+    ]
@@ -0,0 +1,81 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import embedding_batcher
+from embedding_batcher import EmbeddingBatcher
+
+
+class WordEncoding:
+    """One token per word, so token budgets are easy to reason about."""
+
+    def encode(self, text, disallowed_special=()):
+        return text.split()
+
+    def decode(self, tokens):
+        return " ".join(tokens)
+
+
+class FakeEmbeddings:
+    """Embeds a text as [its word count, its first word's length]; rejects any request containing "bad"."""
+
+    def __init__(self):
+        self.requests = []
+
+    async def create(self, model, input, **options):
+        self.requests.append(list(input))
+        if "bad" in input:
+            raise ValueError("invalid input")
+        data = [SimpleNamespace(index=i, embedding=[float(len(text.split())), float(len(text.split()[0]))])
+                for i, text in enumerate(input)]
+        return SimpleNamespace(data=data[::-1])  # Results are matched by index, not position
+
+
+@pytest.fixture(autouse=True)
+def word_tokens(monkeypatch):
+    monkeypatch.setattr(embedding_batcher, "get_encoding", lambda model: WordEncoding())
+
+
+def batcher(**kwargs):
+    client = SimpleNamespace(embeddings=FakeEmbeddings())
+    return EmbeddingBatcher(client, **{"delay": 0.01, **kwargs}), client.embeddings
+
+
+def embed_all(batcher, texts):
+    async def run():
+        return await asyncio.wait_for(asyncio.gather(*(batcher.embed(text) for text in texts)), 1)
+
+    return asyncio.run(run())
+
+
+def test_results_reach_their_callers():
+    embedder, embeddings = batcher()
+    vectors = embed_all(embedder, ["a", "bb cc", "ddd eee fff"])
+    assert vectors == [[1.0, 1.0], [2.0, 2.0], [3.0, 3.0]]
+    assert embeddings.requests == [["a", "bb cc", "ddd eee fff"]]
+
+
+def test_batches_capped_by_count():
+    embedder, embeddings = batcher(max_inputs=3)
+    embed_all(embedder, [f"text {i}" for i in range(7)])
+    assert [len(request) for request in embeddings.requests] == [3, 3, 1]
+
+
+def test_batches_capped_by_tokens():
+    embedder, embeddings = batcher(max_tokens=10)
+    embed_all(embedder, ["one two three four"] * 5)
+    assert [len(request) for request in embeddings.requests] == [2, 2, 1]
+
+
+def test_rejected_batch_retries_one_by_one():
+    embedder, embeddings = batcher()
+    vectors = embed_all(embedder, ["good one", "bad", "another good one"])
+    assert vectors == [[2.0, 4.0], None, [3.0, 7.0]]
+    assert embeddings.requests == [["good one", "bad", "another good one"], ["good one"], ["bad"], ["another good one"]]
+
+
+def test_long_input_is_truncated():
+    embedder, embeddings = batcher()
+    [vector] = embed_all(embedder, ["word " * (embedding_batcher.MAX_INPUT_TOKENS + 10)])
+    assert vector[0] == embedding_batcher.MAX_INPUT_TOKENS
@@ -0,0 +1,86 @@
+import math
+
+import pandas as pd
+
+from normalize import COLUMNS, normalize_batch, normalize_company, normalize_frame
+
+
+def normalize_rows(*rows):
+    return normalize_frame(pd.DataFrame(list(rows), columns=COLUMNS))
+
+
+def test_indian_grouped_numbers():
+    df = normalize_rows(
+        ("INFY", "profit_loss", "", "Sales +", "Mar 2026", "1,23,456"),
+        ("INFY", "profit_loss", "", "Net Profit +", "Mar 2025", "-1,234.5"),
+        ("INFY", "basic_data", "", "Market Cap", "", "₹ 6,12,345 Cr."),
+        ("INFY", "profit_loss", "", "Raw", "Mar 2024", ""),
+    )
+    assert df["value"].tolist()[:3] == [123456.0, -1234.5, 612345.0]
+    assert math.isnan(df["value"].iloc[3])
+    assert df["metric"].tolist()[:2] == ["Sales", "Net Profit"]
+
+
+def test_unit_inference():
+    df = normalize_rows(
+        ("INFY", "profit_loss", "", "Sales", "Mar 2026", "100"),
+        ("INFY", "profit_loss", "", "OPM %", "Mar 2026", "24"),
+        ("INFY", "ratios", "", "Debtor Days", "Mar 2026", "62"),
+        ("INFY", "ratios", "", "ROCE", "Mar 2026", "38%"),
+        ("INFY", "basic_data", "", "Stock P/E", "", "25.4"),
+        ("INFY", "basic_data", "", "Current Price", "", "₹ 1,500"),
+        ("INFY", "profit_loss", "Growth Ratios", "Compounded Sales Growth", "10 Years", "12"),
+    )
+    assert df["unit"].tolist() == ["Cr", "%", "days", "%", None, "Rs", "%"]
+
+
+def test_shareholder_count_is_not_a_percentage():
+    df = normalize_rows(
+        ("INFY", "shareholding_pattern", "Quarterly Shareholding", "Promoters +", "Jun 2026", "14.43%"),
+        ("INFY", "shareholding_pattern", "Quarterly Shareholding", "No. of Shareholders", "Jun 2026", "25,81,543"),
+    )
+    assert df["unit"].tolist() == ["%", None]
+    assert df["value"].tolist() == [14.43, 2581543.0]
+
+
+def test_high_low_split():
+    df = normalize_rows(("INFY", "basic_data", "", "High / Low", "", "₹ 2,007 / 1,307"))
+    assert df["metric"].tolist() == ["High", "Low"]
+    assert df["value"].tolist() == [2007.0, 1307.0]
+    assert df["unit"].tolist() == ["Rs", "Rs"]
+
+
+def test_period_parsing():
+    df = normalize_rows(
+        ("INFY", "quarterly_results", "", "Sales", "Sep 2026", "1"),
+        ("INFY", "profit_loss", "", "Sales", "Mar 2026", "1"),
+        ("INFY", "profit_loss", "", "Sales", "TTM", "1"),
+    )
+    assert df["period"].iloc[0] == pd.Timestamp("2026-09-30")
+    assert df["period"].iloc[1] == pd.Timestamp("2026-03-31")
+    assert pd.isna(df["period"].iloc[2])
+
+
+def test_normalize_batch_skips_errors_and_text_sections():
+    df = normalize_batch({
+        "INFY": {
+            "ratios": {"Years": ["Mar 2026"], "ROCE %": ["38%"]},
+            "cash_flow": {"error": "Unable to parse cash flow data"},
+            "concalls": [{"Date": "Oct 2026"}],
+        },
+    })
+    assert df[["symbol", "section", "metric", "value"]].values.tolist() == [["INFY", "ratios", "ROCE %", 38.0]]
+
+
+def test_normalize_company_json():
+    normalized = normalize_company({"profit_loss": {
+        "Years": ["Mar 2025", "Mar 2026", "TTM"],
+        "Sales +": ["90", "100", ""],
+        "Growth Ratios": {"Compounded Sales Growth": {"10 Years": "12%"}},
+    }})
+    assert normalized["profit_loss"][""] == {
+        "period_labels": ["Mar 2025", "Mar 2026", "TTM"],
+        "periods": ["2025-03-31", "2026-03-31", None],
+        "metrics": {"Sales": {"unit": "Cr", "values": [90.0, 100.0, None]}},
+    }
+    assert normalized["profit_loss"]["Growth Ratios"]["metrics"]["Compounded Sales Growth"]["values"] == [12.0]
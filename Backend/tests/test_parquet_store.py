@@ -0,0 +1,42 @@
+from datetime import datetime, timezone
+
+from normalize import normalize_batch
+from parquet_store import FinancialsStore
+
+FIRST_FETCH = datetime(2026, 10, 1, tzinfo=timezone.utc)
+SECOND_FETCH = datetime(2026, 10, 2, tzinfo=timezone.utc)
+
+
+def ratios(roce):
+    return normalize_batch({
+        "INFY": {"ratios": {"Years": ["Mar 2026"], "ROCE %": [roce], "Debtor Days": ["62"]}},
+        "TCS": {"ratios": {"Years": ["Mar 2026"], "ROCE %": ["60%"]}},
+    })
+
+
+def test_buffers_until_flush(tmp_path):
+    store = FinancialsStore(str(tmp_path / "financials"), flush_rows=100, flush_seconds=3600)
+    store.add(ratios("38%"), fetched_at=FIRST_FETCH)
+    assert store.read().empty
+    store.flush()
+    assert len(store.read()) == 3
+    assert (tmp_path / "financials" / "section=ratios" / "fetch_date=2026-10-01").is_dir()
+
+
+def test_flushes_on_row_count(tmp_path):
+    store = FinancialsStore(str(tmp_path), flush_rows=3, flush_seconds=3600)
+    store.add(ratios("38%"), fetched_at=FIRST_FETCH)
+    assert len(store.read()) == 3
+
+
+def test_read_filters_and_keeps_latest(tmp_path):
+    store = FinancialsStore(str(tmp_path), flush_rows=100, flush_seconds=3600)
+    store.add(ratios("38%"), fetched_at=FIRST_FETCH)
+    store.add(ratios("40%"), fetched_at=SECOND_FETCH)
+    store.flush()
+
+    roce = store.read(metrics=["ROCE %"], symbols=["INFY"])
+    assert roce["value"].tolist() == [40.0]
+    assert roce["fetch_date"].tolist() == ["2026-10-02"]
+    assert len(store.read(metrics=["ROCE %"], symbols=["INFY"], latest_only=False)) == 2
+    assert store.read(sections=["cash_flow"]).empty
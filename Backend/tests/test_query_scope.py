@@ -0,0 +1,55 @@
+import pytest
+
+import query_scope
+from query_scope import QueryScope, infer_scope, infer_sections, infer_symbols
+from symbol_index import Listing, SymbolIndex
+
+
+@pytest.fixture(autouse=True)
+def index(monkeypatch):
+    index = SymbolIndex([
+        Listing("INFY", "Infosys Limited", "NSE"),
+        Listing("HDFCBANK", "HDFC Bank Limited", "NSE"),
+        Listing("M&M", "Mahindra & Mahindra Limited", "NSE"),
+        Listing("DEBT", "Debt Limited", "NSE"),
+    ])
+    monkeypatch.setattr(query_scope, "get_symbol_index", lambda: index)
+    return index
+
+
+def test_infer_sections():
+    assert infer_sections("What was the net profit last quarter?") == ["quarterly_results", "profit_loss"]
+    assert infer_sections("Promoter pledged shares") == ["shareholding_pattern"]
+    assert infer_sections("Is the cash flow positive?") == ["cash_flow"]
+    # Keywords only match whole words
+    assert infer_sections("Is it a reprofitable business?") == []
+
+
+def test_infer_symbols_from_tickers_and_names():
+    assert infer_symbols("Compare INFY with HDFC Bank") == ["INFY", "HDFCBANK"]
+    assert infer_symbols("How did M&M do?") == ["M&M"]
+    assert infer_symbols("infosys and infosys again") == ["INFY"]
+
+
+def test_section_keywords_are_not_companies():
+    assert infer_symbols("How much debt does Infosys carry?") == ["INFY"]
+    assert infer_symbols("What is the DEBT level?") == []
+
+
+def test_infer_symbols_caps_the_scope():
+    assert len(infer_symbols("INFY HDFCBANK M&M infosys " * 3)) <= query_scope.MAX_SCOPED_SYMBOLS
+
+
+def test_no_listing_means_no_symbols(monkeypatch):
+    monkeypatch.setattr(query_scope, "get_symbol_index", lambda: None)
+    assert infer_symbols("Compare INFY with HDFC Bank") == []
+
+
+def test_widening_drops_duplicate_attempts():
+    assert infer_scope("INFY balance sheet").widening() == [
+        (["INFY"], ["balance_sheet"]),
+        (["INFY"], None),
+        (None, None),
+    ]
+    assert QueryScope().widening() == [(None, None)]
+    assert QueryScope(sections=["ratios"]).widening() == [(None, ["ratios"]), (None, None)]
@@ -0,0 +1,91 @@
+from datetime import datetime
+
+from refresh_scheduler import (
+    DAY, HOUR, RESULTS_SEASON_INTERVAL, RESULTS_WINDOW, SECTION_INTERVALS, RefreshScheduler, parse_result_date,
+)
+
+RESULT_DATE = datetime(2025, 2, 12)
+
+
+def at(day_offset: float) -> float:
+    """Timestamp `day_offset` days from RESULT_DATE."""
+    return RESULT_DATE.timestamp() + day_offset * DAY
+
+
+def scheduler_with_result_date() -> RefreshScheduler:
+    scheduler = RefreshScheduler()
+    scheduler.result_dates["TCS"] = RESULT_DATE
+    return scheduler
+
+
+def test_parse_result_date():
+    assert parse_result_date("12 Feb 2025") == RESULT_DATE
+    assert parse_result_date("2025-02-12") == RESULT_DATE
+    assert parse_result_date("soon") is None
+
+
+def test_normal_interval_without_result_date():
+    assert RefreshScheduler().interval("TCS", "profit_loss", at(0)) == SECTION_INTERVALS["profit_loss"]
+
+
+def test_results_season_interval_inside_window():
+    scheduler = scheduler_with_result_date()
+    assert scheduler.interval("TCS", "profit_loss", at(-2)) == RESULTS_SEASON_INTERVAL
+    assert scheduler.interval("TCS", "profit_loss", at(2)) == RESULTS_SEASON_INTERVAL
+
+
+def test_interval_clamped_to_window_start():
+    scheduler = scheduler_with_result_date()
+    now = at(-5)
+    window_opens = (RESULT_DATE - RESULTS_WINDOW).timestamp()
+    assert scheduler.interval("TCS", "ratios", now) == window_opens - now
+
+
+def test_non_result_section_is_not_clamped():
+    scheduler = scheduler_with_result_date()
+    assert scheduler.interval("TCS", "balance_sheet", at(-5)) == SECTION_INTERVALS["balance_sheet"]
+
+
+def test_past_result_date_uses_normal_interval():
+    scheduler = scheduler_with_result_date()
+    assert scheduler.interval("TCS", "ratios", at(10)) == SECTION_INTERVALS["ratios"]
+
+
+def test_record_refresh_picks_up_result_date_and_retries_errors():
+    scheduler = RefreshScheduler()
+    now = at(-10)
+    scheduler.record_refresh("TCS", ["quarterly_results", "cash_flow", "concalls", "ratios"], {
+        "quarterly_results": {"Upcoming result date": "12 Feb 2025"},
+        "cash_flow": {"error": "Unable to parse cash flow data"},
+        "concalls": [],
+    }, now=now)
+    assert scheduler.result_dates["TCS"] == RESULT_DATE
+    due = {section: due_at for due_at, _, section in scheduler._queue}
+    assert due["cash_flow"] == now + HOUR
+    assert due["ratios"] == now + HOUR
+    assert due["concalls"] == now + SECTION_INTERVALS["concalls"]
+    assert due["quarterly_results"] == (RESULT_DATE - RESULTS_WINDOW).timestamp()
+
+
+def test_pop_due_coalesces_sections_of_one_symbol():
+    scheduler = RefreshScheduler(intervals={"basic_data": DAY, "ratios": DAY})
+    scheduler.add_symbol("TCS", due_at=100)
+    scheduler.add_symbol("INFY", due_at=200)
+    assert scheduler.pop_due(now=50) is None
+    symbol, sections = scheduler.pop_due(now=150)
+    assert symbol == "TCS" and sorted(sections) == ["basic_data", "ratios"]
+    assert len(scheduler) == 2
+
+
+def test_crawl_cost_counts_rendered_page():
+    assert RefreshScheduler.crawl_cost(["basic_data", "ratios"]) == 1
+    assert RefreshScheduler.crawl_cost(["peer_comparison"]) == 1
+    assert RefreshScheduler.crawl_cost(["basic_data", "peer_comparison"]) == 2
+
+
+def test_budget_delays_next_crawl():
+    scheduler = RefreshScheduler(budget_per_hour=2)
+    scheduler.add_symbol("TCS", due_at=0)
+    scheduler._crawls.extend([1000, 1000])
+    assert scheduler.seconds_until_next(now=1500) == HOUR - 500
+    assert scheduler.seconds_until_next(now=1000 + HOUR) == 0
@@ -0,0 +1,88 @@
+import pytest
+
+import section_parsers
+from dom_parsers import parse_html
+from section_parsers import (
+    COMPANY_SECTIONS, build_section_data, company_url, extract_section, extract_section_markdown, parse_max_age,
+)
+
+
+def test_no_max_age():
+    assert parse_max_age([]) == {}
+
+
+def test_bare_number_applies_to_every_section():
+    assert parse_max_age(["3600"]) == dict.fromkeys(COMPANY_SECTIONS, 3600.0)
+
+
+def test_section_override_wins_in_any_order():
+    expected = {**dict.fromkeys(COMPANY_SECTIONS, 3600.0), "basic_data": 60.0}
+    assert parse_max_age(["3600", "basic_data=60"]) == expected
+    assert parse_max_age(["basic_data=60", "3600"]) == expected
+
+
+def test_override_alone():
+    assert parse_max_age(["ratios=86400", "cash_flow=0.5"]) == {"ratios": 86400.0, "cash_flow": 0.5}
+
+
+def test_unknown_section():
+    with pytest.raises(ValueError, match="unknown section 'prices'"):
+        parse_max_age(["prices=60"])
+
+
+def test_bad_seconds():
+    with pytest.raises(ValueError):
+        parse_max_age(["ratios=soon"])
+
+
+PROFIT_LOSS_HTML = """
+<html><body>
+<section id="profit-loss">
+  <h2>Profit &amp; Loss</h2>
+  <table class="data-table">
+    <tr><th></th><th>Mar 2025</th><th>Mar 2026</th></tr>
+    <tr><td>Sales</td><td>30</td><td>32</td></tr>
+  </table>
+</section>
+</body></html>
+"""
+
+
+def test_markdown_fallback_converts_section():
+    pytest.importorskip("crawl4ai")
+    markdown = extract_section_markdown(PROFIT_LOSS_HTML, "#profit-loss", company_url("INFY"))
+    parsed = build_section_data("profit_loss", markdown)
+    assert parsed["Years"] == ["Mar 2025", "Mar 2026"]
+    assert parsed["Sales"] == ["30", "32"]
+
+
+def test_markdown_fallback_without_match():
+    pytest.importorskip("crawl4ai")
+    assert extract_section_markdown(PROFIT_LOSS_HTML, "#peers", company_url("INFY")) == ""
+
+
+def test_empty_dom_result_is_data(monkeypatch):
+    def no_fallback(*args):
+        raise AssertionError("markdown fallback used")
+
+    monkeypatch.setattr(section_parsers, "extract_section_markdown", no_fallback)
+    html = '<div class="documents concalls"><h3>Concalls</h3><ul></ul></div><section id="documents"></section>'
+    root = parse_html(html)
+    assert extract_section("concalls", root, html, company_url("INFY")) == []
+    assert extract_section("documents", root, html, company_url("INFY")) == {}
+
+
+def test_failed_fallback_is_an_error(monkeypatch):
+    def broken(*args):
+        raise AttributeError("no cleaned_html")
+
+    monkeypatch.setattr(section_parsers, "extract_section_markdown", broken)
+    html = '<section id="profit-loss"><p>Loading...</p></section>'
+    assert extract_section("profit_loss", parse_html(html), html, company_url("INFY")) == {
+        "error": "Unable to parse profit & loss data",
+    }
+
+
+def test_missing_section():
+    html = "<section id=\"quarters\"></section>"
+    assert extract_section("ratios", parse_html(html), html, company_url("INFY")) == {"error": "No ratios data found."}
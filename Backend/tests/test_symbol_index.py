@@ -0,0 +1,51 @@
+import pytest
+
+from symbol_index import Listing, SymbolIndex, load_listings, normalize_name
+
+LISTINGS = [
+    Listing("TATAMOTORS", "Tata Motors Limited", "NSE"),
+    Listing("TATASTEEL", "Tata Steel Limited", "NSE"),
+    Listing("TCS", "Tata Consultancy Services Limited", "NSE"),
+    Listing("ENGINERSIN", "Engineers India Limited", "NSE"),
+    Listing("INFY", "Infosys Limited", "NSE"),
+]
+
+
+@pytest.fixture
+def index():
+    return SymbolIndex(LISTINGS)
+
+
+def test_normalize_name():
+    assert normalize_name("Engineers India Ltd.") == "engineers india"
+    assert normalize_name("The Tata Power Co. Limited") == "tata power co"
+
+
+def test_exact_symbol_and_name(index):
+    assert index.resolve("infy").symbol == "INFY"
+    assert index.resolve("Engineers India").symbol == "ENGINERSIN"
+
+
+def test_unique_prefix_resolves(index):
+    assert index.resolve("engin").symbol == "ENGINERSIN"
+
+
+def test_short_ambiguous_prefix_returns_candidates(index):
+    assert index.resolve("tata") is None
+    assert {listing.symbol for listing in index.lookup("tata")} == {"TATAMOTORS", "TATASTEEL", "TCS"}
+    assert index.resolve("t") is None
+
+
+def test_long_prefix_resolves_to_shortest_name(index):
+    assert index.resolve("tata consul").symbol == "TCS"
+
+
+def test_fuzzy_match(index):
+    assert index.resolve("infosis").symbol == "INFY"
+    assert index.lookup("zzzz") == []
+
+
+def test_load_listings(tmp_path):
+    path = tmp_path / "EQUITY_L.csv"
+    path.write_text("SYMBOL,NAME OF COMPANY,SERIES\nINFY,Infosys Limited,EQ\n,Blank,EQ\n", encoding="utf-8")
+    assert load_listings(str(path)) == [Listing("INFY", "Infosys Limited", "NSE")]
@@ -0,0 +1,47 @@
+from table_parser import TableSpec, is_separator, parse_markdown_table, split_row
+
+
+def test_split_row_ignores_outer_pipes():
+    assert split_row("| Sales | 1 | 2 |") == ["Sales", "1", "2"]
+    assert split_row("Sales | 1 | 2") == ["Sales", "1", "2"]
+    assert split_row("| Sales | | 2 |") == ["Sales", "", "2"]
+
+
+def test_is_separator():
+    assert is_separator("---|---|---")
+    assert is_separator("|:---|---:|")
+    assert not is_separator("Sales | 1 | 2")
+
+
+def test_parses_table_without_outer_pipes():
+    text = " | Mar 2021 | Mar 2022\n---|---|---\nSales | 1 | 2\nExpenses | 3 | 4"
+    assert parse_markdown_table(text, TableSpec()) == {
+        "Years": ["Mar 2021", "Mar 2022"],
+        "Sales": ["1", "2"],
+        "Expenses": ["3", "4"],
+    }
+
+
+def test_parses_table_with_outer_pipes():
+    text = "| | Mar 2021 | Mar 2022 |\n|---|---|---|\n| Sales | 1 | 2 |"
+    assert parse_markdown_table(text, TableSpec()) == {
+        "Years": ["Mar 2021", "Mar 2022"],
+        "Sales": ["1", "2"],
+    }
+
+
+def test_excluded_rows_and_growth_blocks():
+    spec = TableSpec(exclude_rows=("Raw PDF",), group_titles=("Compounded Sales Growth",))
+    text = (
+        "| | Mar 2022 |\n|---|---|\n| Sales | 2 |\n| Raw PDF | |\n"
+        "Compounded Sales Growth\n10 Years: | 12%\n5 Years: | 9%"
+    )
+    assert parse_markdown_table(text, spec) == {
+        "Years": ["Mar 2022"],
+        "Sales": ["2"],
+        "Growth Ratios": {"Compounded Sales Growth": {"10 Years": "12%", "5 Years": "9%"}},
+    }
+
+
+def test_no_table():
+    assert parse_markdown_table("just text", TableSpec()) is None
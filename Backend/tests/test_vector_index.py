@@ -0,0 +1,43 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+from vector_index import update_match_function
+from vector_schema import SCOPE_INDEX, scope_index_sql
+
+
+class FakeConnection:
+    """Records each statement with whether it ran inside a transaction."""
+
+    def __init__(self, scope_index_invalid=None):
+        self.scope_index_invalid = scope_index_invalid
+        self.in_transaction = False
+        self.statements = []
+
+    async def fetchval(self, sql, *args):
+        assert args == (SCOPE_INDEX,)
+        return self.scope_index_invalid
+
+    async def execute(self, sql):
+        self.statements.append((sql, self.in_transaction))
+
+    @asynccontextmanager
+    async def transaction(self):
+        self.in_transaction = True
+        try:
+            yield
+        finally:
+            self.in_transaction = False
+
+
+def test_scope_index_is_built_outside_the_function_swap():
+    conn = FakeConnection()
+    asyncio.run(update_match_function(conn))
+    assert conn.statements[0] == (scope_index_sql(), False)
+    assert [in_transaction for _, in_transaction in conn.statements[1:]] == [True, True]
+    assert conn.statements[1][0] == "drop function if exists match_stock_info"
+
+
+def test_invalid_scope_index_is_dropped_first():
+    conn = FakeConnection(scope_index_invalid=True)
+    asyncio.run(update_match_function(conn))
+    assert conn.statements[:2] == [(f"drop index concurrently {SCOPE_INDEX}", False), (scope_index_sql(), False)]
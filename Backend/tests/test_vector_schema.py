@@ -0,0 +1,71 @@
+import pytest
+
+from vector_schema import (
+    SCHEMA_FILE, column_dimensions, column_type, cosine_ops, match_function_sql, migration_sql, schema_statement, scope_index_sql,
+)
+
+
+def test_column_type():
+    assert column_type(1536, "vector") == "vector(1536)"
+    assert column_type(512, "halfvec") == "halfvec(512)"
+    with pytest.raises(ValueError):
+        column_type(512, "bit")
+    assert cosine_ops("halfvec") == "halfvec_cosine_ops"
+
+
+def test_match_function_comes_from_schema_file():
+    schema_function = schema_statement("create function match_stock_info")
+    with open(SCHEMA_FILE, encoding="utf-8") as f:
+        assert schema_function in f.read()
+    assert match_function_sql(1536, "vector") == schema_function.replace(
+        "create function", "create or replace function", 1
+    )
+
+
+def test_match_function_uses_configured_column_type():
+    sql = match_function_sql(512, "halfvec")
+    assert sql.startswith("create or replace function match_stock_info (")
+    assert "query_embedding halfvec(512)," in sql
+    assert "vector(1536)" not in sql
+    assert sql.endswith("$$;")
+    for argument in ("ef_search int", "probes int", "symbols text[]", "sections text[]"):
+        assert argument in sql
+
+
+def test_scope_index_sql():
+    assert scope_index_sql() == (
+        "create index concurrently if not exists stock_info_scope_idx on stock_info"
+        " ((metadata->>'company_symbol'), (metadata->>'section_name'));"
+    )
+
+
+def test_migration_clears_vectors_by_default():
+    sql = migration_sql(512, "halfvec")
+    assert "alter column embedding type halfvec(512) using null;" in sql
+    assert "metadata - 'content_hash'" in sql
+    assert "using hnsw (embedding halfvec_cosine_ops)" in sql
+    assert sql.startswith("begin;") and sql.endswith("commit;")
+
+
+def test_column_dimensions():
+    assert column_dimensions("vector(1536)") == 1536
+    assert column_dimensions("halfvec(512)") == 512
+    assert column_dimensions("vector") is None
+
+
+def test_migration_keeps_vectors_when_asked():
+    sql = migration_sql(1536, "halfvec", keep_vectors=True, current_type="vector(1536)")
+    assert "using embedding::halfvec(1536);" in sql
+    assert "content_hash" not in sql
+    # The migration re-checks the dimensions before altering anything
+    assert sql.index("!~ '\\(1536\\)$'") < sql.index("alter table")
+
+
+def test_migration_refuses_to_keep_vectors_across_dimensions():
+    with pytest.raises(ValueError):
+        migration_sql(512, "halfvec", keep_vectors=True, current_type="vector(1536)")
+
+
+def test_migration_rejects_unindexable_dimensions():
+    with pytest.raises(ValueError):
+        migration_sql(3072, "vector")
@@ -0,0 +1,125 @@
+import argparse
+import asyncio
+import os
+from typing import Optional
+
+import asyncpg
+from dotenv import load_dotenv
+
+# Settings are read at import, so .env has to be loaded before the local modules
+load_dotenv()
+
+from vector_schema import SCOPE_INDEX, VECTOR_INDEX, cosine_ops, match_function_sql, scope_index_sql
+
+VECTOR_INDEX_TYPE = os.environ.get("VECTOR_INDEX_TYPE", "hnsw")  # hnsw | ivfflat
+HNSW_M = int(os.environ.get("HNSW_M", "16"))
+HNSW_EF_CONSTRUCTION = int(os.environ.get("HNSW_EF_CONSTRUCTION", "64"))
+INDEX_MAINTENANCE_WORK_MEM = os.environ.get("INDEX_MAINTENANCE_WORK_MEM", "1GB")
+
+INDEX_TYPES = ("hnsw", "ivfflat")
+
+
+def ivfflat_lists(rows: int) -> int:
+    """pgvector's sizing advice: rows / 1000 lists up to a million rows, sqrt(rows) beyond."""
+    return max(1, rows // 1000) if rows <= 1_000_000 else int(rows ** 0.5)
+
+
+async def drop_index(conn: asyncpg.Connection):
+    await conn.execute(f"drop index concurrently if exists {VECTOR_INDEX}")
+
+
+async def build_index(conn: asyncpg.Connection, index_type: str = VECTOR_INDEX_TYPE,
+                      m: int = HNSW_M, ef_construction: int = HNSW_EF_CONSTRUCTION,
+                      lists: Optional[int] = None) -> str:
+    """
+    (Re)builds the vector index on stock_info and returns its definition.
+
+    HNSW needs no training data, so it can be built on an empty table and keeps its recall
+    as rows arrive. ivfflat clusters the rows present at build time, so it is sized from the
+    current row count (unless `lists` is given) and should be rebuilt after large loads.
+
+    The new index is built concurrently under a temporary name and swapped in with a quick
+    drop-and-rename, so searches keep using the old index (and writes continue) meanwhile.
+    """
+    if index_type == "hnsw":
+        options = f"m = {m}, ef_construction = {ef_construction}"
+    elif index_type == "ivfflat":
+        if lists is None:
+            lists = ivfflat_lists(await conn.fetchval("select count(*) from stock_info"))
+        options = f"lists = {lists}"
+    else:
+        raise ValueError(f"Unknown index type: {index_type}")
+
+    building = f"{VECTOR_INDEX}_new"
+    await conn.execute(f"set maintenance_work_mem = '{INDEX_MAINTENANCE_WORK_MEM}'")
+    # An interrupted concurrent build leaves an invalid index behind under the temporary name
+    await conn.execute(f"drop index concurrently if exists {building}")
+    await conn.execute(
+        f"create index concurrently {building} on stock_info using {index_type} (embedding {cosine_ops()}) with ({options})"
+    )
+    async with conn.transaction():
+        await conn.execute(f"drop index if exists {VECTOR_INDEX}")
+        await conn.execute(f"alter index {building} rename to {VECTOR_INDEX}")
+    await conn.execute("analyze stock_info")
+    return await conn.fetchval("select indexdef from pg_indexes where indexname = $1", VECTOR_INDEX)
+
+
+async def update_match_function(conn: asyncpg.Connection):
+    """
+    Replaces match_stock_info with the current definition (per-query ef_search / probes,
+    symbol / section scoping) and creates the btree index its scoped searches rely on.
+
+    The index is built concurrently before the function swap, like build_index, so writes
+    to stock_info continue while it builds.
+    """
+    # An interrupted concurrent build leaves an invalid index that "if not exists" would keep
+    invalid = await conn.fetchval("select not indisvalid from pg_index where indexrelid = to_regclass($1)", SCOPE_INDEX)
+    if invalid:
+        await conn.execute(f"drop index concurrently {SCOPE_INDEX}")
+    await conn.execute(scope_index_sql())
+    async with conn.transaction():
+        await conn.execute("drop function if exists match_stock_info")
+        await conn.execute(match_function_sql())
+
+
+async def show_index(conn: asyncpg.Connection):
+    row = await conn.fetchrow(
+        "select indexdef, pg_size_pretty(pg_relation_size(indexname::regclass)) as size"
+        " from pg_indexes where indexname = $1",
+        VECTOR_INDEX,
+    )
+    rows = await conn.fetchval("select count(*) from stock_info")
+    if row is None:
+        print(f"No {VECTOR_INDEX} ({rows} rows)")
+    else:
+        print(f"{row['indexdef']}\n{row['size']}, {rows} rows")
+
+
+async def run_cli():
+    parser = argparse.ArgumentParser(description="Manage the stock_info vector index.")
+    parser.add_argument("action", choices=("show", "build", "drop", "migrate"),
+                        help="migrate = install the current match_stock_info (ef_search/probes, symbol/section scoping)")
+    parser.add_argument("--type", choices=INDEX_TYPES, default=VECTOR_INDEX_TYPE)
+    parser.add_argument("--m", type=int, default=HNSW_M, help="HNSW: links per node")
+    parser.add_argument("--ef-construction", type=int, default=HNSW_EF_CONSTRUCTION, help="HNSW: build-time candidate list")
+    parser.add_argument("--lists", type=int, help="ivfflat: number of lists (default: sized from the row count)")
+    parser.add_argument("--dsn", default=os.environ.get("DATABASE_URL"), help="Postgres connection string (default: DATABASE_URL)")
+    args = parser.parse_args()
+    if not args.dsn:
+        parser.error("no database: set DATABASE_URL or pass --dsn")
+
+    conn = await asyncpg.connect(args.dsn)
+    try:
+        if args.action == "build":
+            print(await build_index(conn, args.type, args.m, args.ef_construction, args.lists))
+        elif args.action == "drop":
+            await drop_index(conn)
+        elif args.action == "migrate":
+            await update_match_function(conn)
+        await show_index(conn)
+    finally:
+        await conn.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(run_cli())
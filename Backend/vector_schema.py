@@ -0,0 +1,161 @@
+import argparse
+import asyncio
+import os
+import re
+from typing import Optional
+
+import asyncpg
+from dotenv import load_dotenv
+
+# Settings are read at import, so .env has to be loaded before the local modules
+load_dotenv()
+
+from embedding_batcher import EMBEDDING_DIMENSIONS
+
+EMBEDDING_STORAGE = os.environ.get("EMBEDDING_STORAGE", "vector")  # vector | halfvec
+
+STORAGE_TYPES = ("vector", "halfvec")
+VECTOR_INDEX = "stock_info_embedding_idx"
+SCOPE_INDEX = "stock_info_scope_idx"
+# stock_info.sql is the one definition of the table, its indexes and match_stock_info
+SCHEMA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "stock_info.sql")
+# Most dimensions pgvector can index for each storage type
+MAX_INDEXED_DIMENSIONS = {"vector": 2000, "halfvec": 4000}
+
+
+def column_type(dimensions: int = EMBEDDING_DIMENSIONS, storage: str = EMBEDDING_STORAGE) -> str:
+    """The SQL type of stock_info.embedding, e.g. vector(1536) or halfvec(512)."""
+    if storage not in STORAGE_TYPES:
+        raise ValueError(f"Unknown embedding storage: {storage}")
+    return f"{storage}({dimensions})"
+
+
+def cosine_ops(storage: str = EMBEDDING_STORAGE) -> str:
+    """The operator class for cosine-distance indexes on the embedding column."""
+    return f"{storage}_cosine_ops"
+
+
+def schema_statement(prefix: str) -> str:
+    """Returns the statement of stock_info.sql starting with `prefix`, up to its terminating semicolon."""
+    with open(SCHEMA_FILE, encoding="utf-8") as f:
+        schema = f.read()
+    start = schema.index(prefix)
+    # A function body is dollar-quoted and contains semicolons of its own
+    terminator = "\n$$;" if "$$" in schema[start:schema.find(";", start)] else ";"
+    return schema[start:schema.index(terminator, start) + len(terminator)]
+
+
+def match_function_sql(dimensions: int = EMBEDDING_DIMENSIONS, storage: str = EMBEDDING_STORAGE) -> str:
+    """The match_stock_info function of stock_info.sql, for the given embedding column type."""
+    function = schema_statement("create function match_stock_info")
+    function = re.sub(r"query_embedding \w+\(\d+\)", f"query_embedding {column_type(dimensions, storage)}", function, count=1)
+    return function.replace("create function", "create or replace function", 1)
+
+
+def scope_index_sql() -> str:
+    """
+    The btree index match_stock_info uses for company/section-scoped searches, built
+    concurrently (so outside any transaction) to keep stock_info writable meanwhile.
+    """
+    return schema_statement(f"create index {SCOPE_INDEX}").replace(
+        "create index", "create index concurrently if not exists", 1
+    )
+
+
+def column_dimensions(type_name: str) -> Optional[int]:
+    """The dimensions of a pgvector column type as format_type prints it, e.g. 1536 for "vector(1536)"."""
+    match = re.fullmatch(r"\w+\((\d+)\)", type_name.strip())
+    return int(match.group(1)) if match else None
+
+
+def migration_sql(dimensions: int = EMBEDDING_DIMENSIONS, storage: str = EMBEDDING_STORAGE,
+                  keep_vectors: bool = False, current_type: Optional[str] = None) -> str:
+    """
+    SQL that switches stock_info.embedding to `storage(dimensions)`.
+
+    With `keep_vectors` (only valid when the dimensions are unchanged, e.g. vector -> halfvec)
+    existing embeddings are cast in place; the migration checks the column's dimensions before
+    changing anything, and `current_type` (the column's type now) is checked up front. Otherwise
+    embeddings are cleared along with each chunk's content_hash, so the next ingest re-embeds
+    every section at the new size.
+    """
+    target = column_type(dimensions, storage)
+    if dimensions > MAX_INDEXED_DIMENSIONS[storage]:
+        raise ValueError(f"pgvector can't index {storage} columns over {MAX_INDEXED_DIMENSIONS[storage]} dimensions")
+    if keep_vectors and current_type is not None and column_dimensions(current_type) != dimensions:
+        raise ValueError(f"--keep-vectors can't change the dimensions: stock_info.embedding is {current_type}, not {dimensions}-dimensional")
+    statements = ["begin;"]
+    if keep_vectors:
+        statements.append(f"""do $$
+begin
+    if (select format_type(atttypid, atttypmod) from pg_attribute
+        where attrelid = 'stock_info'::regclass and attname = 'embedding') !~ '\\({dimensions}\\)$' then
+        raise exception 'stock_info.embedding is not {dimensions}-dimensional; migrate without keep_vectors';
+    end if;
+end;
+$$;""")
+    statements += [
+        f"drop index if exists {VECTOR_INDEX};",
+        "drop function if exists match_stock_info;",
+    ]
+    if keep_vectors:
+        statements.append(f"alter table stock_info alter column embedding type {target} using embedding::{target};")
+    else:
+        statements += [
+            f"alter table stock_info alter column embedding type {target} using null;",
+            "update stock_info set metadata = metadata - 'content_hash';",
+        ]
+    statements += [
+        match_function_sql(dimensions, storage),
+        f"create index {VECTOR_INDEX} on stock_info using hnsw (embedding {cosine_ops(storage)});",
+        "commit;",
+    ]
+    return "\n".join(statements)
+
+
+async def current_column_type(dsn: str) -> Optional[str]:
+    """Returns the type of stock_info.embedding in the database, e.g. "vector(1536)"."""
+    conn = await asyncpg.connect(dsn)
+    try:
+        return await conn.fetchval(
+            "select format_type(atttypid, atttypmod) from pg_attribute"
+            " where attrelid = 'stock_info'::regclass and attname = 'embedding'"
+        )
+    finally:
+        await conn.close()
+
+
+async def apply_sql(sql: str, dsn: str):
+    conn = await asyncpg.connect(dsn)
+    try:
+        await conn.execute(sql)
+    finally:
+        await conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Print (or apply) the migration that resizes stock_info.embedding to the configured settings."
+    )
+    parser.add_argument("--dimensions", type=int, default=EMBEDDING_DIMENSIONS)
+    parser.add_argument("--storage", choices=STORAGE_TYPES, default=EMBEDDING_STORAGE)
+    parser.add_argument("--keep-vectors", action="store_true",
+                        help="Cast existing embeddings instead of clearing them (same dimensions only)")
+    parser.add_argument("--apply", action="store_true", help="Run the migration against DATABASE_URL")
+    args = parser.parse_args()
+    dsn = os.environ.get("DATABASE_URL")
+    # Without a database the printed migration still checks the dimensions when it runs
+    current_type = asyncio.run(current_column_type(dsn)) if args.keep_vectors and dsn else None
+    try:
+        sql = migration_sql(args.dimensions, args.storage, args.keep_vectors, current_type)
+    except ValueError as e:
+        parser.error(str(e))
+    if not args.apply:
+        print(sql)
+    else:
+        if not dsn:
+            parser.error("--apply needs DATABASE_URL")
+        asyncio.run(apply_sql(sql, dsn))
+        print(f"stock_info.embedding is now {column_type(args.dimensions, args.storage)}")
+    if not args.keep_vectors:
+        print("-- Re-ingest to re-embed: sections re-embed automatically; run document_ingest.py with --force for documents.")